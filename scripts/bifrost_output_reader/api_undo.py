@@ -0,0 +1,77 @@
+"""
+Description:
+    Makes OpenMaya modifiers undoable. This file is both a helper module and the plugin
+    registering the command that puts modifiers on Maya's undo queue.
+
+Usage:
+    modifier = OpenMaya.MDagModifier()
+    ...
+    modifier.doIt()
+    api_undo.commit(modifier)
+"""
+
+import os
+
+import maya.cmds as cmds
+from maya.api import OpenMaya
+
+
+command_name = "bifrostOutputReaderApiUndo"
+
+# Modifiers waiting for the command to pick them up.
+pending = []
+
+
+def maya_useNewAPI():
+    pass
+
+
+class ApiUndoCommand(OpenMaya.MPxCommand):
+
+    def __init__(self):
+        super(ApiUndoCommand, self).__init__()
+        self.modifier = None
+
+    # Maya loads this file as the plugin under its own module name, so the pending modifiers
+    # are taken from the package's module, which is the one commit() added them to.
+    def doIt(self, args):
+        from bifrost_output_reader import api_undo
+        self.modifier = api_undo.pending.pop(0)
+
+    def undoIt(self):
+        self.modifier.undoIt()
+
+    def redoIt(self):
+        self.modifier.doIt()
+
+    def isUndoable(self):
+        return True
+
+
+def create_command():
+    return ApiUndoCommand()
+
+
+def initializePlugin(plugin):
+    OpenMaya.MFnPlugin(plugin).registerCommand(command_name, create_command)
+
+
+def uninitializePlugin(plugin):
+    OpenMaya.MFnPlugin(plugin).deregisterCommand(command_name)
+
+
+def get_plugin_path():
+    return os.path.splitext(os.path.abspath(__file__))[0] + ".py"
+
+
+def load_plugin():
+    path = get_plugin_path()
+    if not cmds.pluginInfo(path, q=True, loaded=True):
+        cmds.loadPlugin(path, quiet=True)
+
+
+# Puts a modifier whose doIt was already called on the undo queue.
+def commit(modifier):
+    load_plugin()
+    pending.append(modifier)
+    getattr(cmds, command_name)()
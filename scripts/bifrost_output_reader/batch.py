@@ -0,0 +1,247 @@
+"""
+Description:
+    Dumps every port of every Bifrost graph of a list of scenes to disk, spreading the scenes
+    over a pool of mayapy processes.
+
+Usage:
+    python -m bifrost_output_reader.batch shot_010.ma shot_020.ma -o /tmp/dumps -j 8
+
+    Each scene gets its own folder, named after it and a hash of its path, with one file per port
+    and a result.json with its timings, and summary.json in the output folder aggregates them.
+    The orchestrating process doesn't need Maya, only the workers run in mayapy.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import subprocess
+from multiprocessing.pool import ThreadPool
+
+
+package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+slowest_port_count = 10
+
+
+def find_mayapy():
+    name = "mayapy.exe" if sys.platform == "win32" else "mayapy"
+
+    maya_location = os.environ.get("MAYA_LOCATION")
+    if maya_location:
+        path = os.path.join(maya_location, "bin", name)
+        if os.path.exists(path):
+            return path
+
+    return name
+
+
+# Scenes can share a name across folders, so the folder also holds a hash of the scene's full path.
+def get_scene_output_dir(output_dir, scene_path):
+    name = os.path.splitext(os.path.basename(scene_path))[0]
+    path_hash = hashlib.md5(os.path.normcase(os.path.abspath(scene_path)).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(output_dir, "{}_{}".format(name, path_hash))
+
+
+# Runs in mayapy. Opens the scene and exports all of its ports, timing each one.
+# Ports the format can't hold, like strings in npy, are written to csv instead.
+def dump_scene(scene_path, output_dir, export_format="npy", backend=None):
+    import maya.cmds as cmds
+
+    from bifrost_output_reader import core
+    from bifrost_output_reader import exporter
+
+    result = {
+        "scene": scene_path,
+        "outputDir": output_dir,
+        "openTime": 0.0,
+        "totalTime": 0.0,
+        "ports": [],
+        "error": None
+    }
+
+    start_time = time.time()
+    cmds.file(scene_path, open=True, force=True)
+    result["openTime"] = time.time() - start_time
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    for bf_graph in cmds.ls(type="bifrostGraphShape") or []:
+        for plug_name in core.get_ports_from_bf_graph(bf_graph):
+            entry = {
+                "graph": bf_graph,
+                "port": plug_name,
+                "path": None,
+                "elements": 0,
+                "seconds": 0.0,
+                "error": None
+            }
+
+            port_start_time = time.time()
+            path = os.path.join(output_dir, exporter.get_port_file_name(bf_graph, plug_name, export_format))
+
+            try:
+                try:
+                    elements = exporter.export_port(bf_graph, plug_name, path, backend=backend)
+                except ValueError:
+                    path = os.path.splitext(path)[0] + ".csv"
+                    elements = exporter.export_port(bf_graph, plug_name, path, backend=backend)
+
+                if elements is not None:
+                    entry["path"] = path
+                    entry["elements"] = elements
+            except Exception as err:
+                entry["error"] = str(err)
+
+            entry["seconds"] = time.time() - port_start_time
+            result["ports"].append(entry)
+
+    result["totalTime"] = time.time() - start_time
+
+    return result
+
+
+def run_worker(scene_path, output_dir, export_format="npy", backend=None):
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    try:
+        import maya.cmds as cmds
+        cmds.loadPlugin("bifrostGraph", quiet=True)
+
+        try:
+            result = dump_scene(scene_path, output_dir, export_format, backend)
+        except Exception as err:
+            result = {"scene": scene_path, "outputDir": output_dir, "ports": [], "error": str(err)}
+
+        with open(os.path.join(output_dir, "result.json"), "w") as result_file:
+            json.dump(result, result_file, indent=2)
+    finally:
+        maya.standalone.uninitialize()
+
+
+# Runs one scene in its own mayapy process and returns its result.
+def run_scene_process(task):
+    scene_path, output_dir, export_format, backend, mayapy = task
+
+    scene_output_dir = get_scene_output_dir(output_dir, scene_path)
+    if not os.path.exists(scene_output_dir):
+        os.makedirs(scene_output_dir)
+
+    result_path = os.path.join(scene_output_dir, "result.json")
+    if os.path.exists(result_path):
+        os.remove(result_path)
+
+    command = [
+        mayapy, "-m", "bifrost_output_reader.batch", "--worker", scene_path,
+        "--output", scene_output_dir, "--format", export_format]
+    if backend is not None:
+        command.extend(["--backend", backend])
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([package_root] + [path for path in [env.get("PYTHONPATH")] if path])
+
+    start_time = time.time()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = process.communicate()[0]
+
+    if os.path.exists(result_path):
+        with open(result_path) as result_file:
+            result = json.load(result_file)
+    else:
+        result = {
+            "scene": scene_path,
+            "outputDir": scene_output_dir,
+            "ports": [],
+            "error": "Worker exited with code {}".format(process.returncode),
+            "log": output.decode("utf-8", "replace")[-4000:]
+        }
+
+    result["processTime"] = time.time() - start_time
+
+    return result
+
+
+def aggregate_results(results, wall_time):
+    ports = [port for result in results for port in result.get("ports", [])]
+
+    slowest_ports = sorted([
+        {"scene": result["scene"], "graph": port["graph"], "port": port["port"], "seconds": port["seconds"]}
+        for result in results for port in result.get("ports", [])],
+        key=lambda port: port["seconds"], reverse=True)
+
+    return {
+        "scenes": len(results),
+        "failedScenes": [result["scene"] for result in results if result.get("error")],
+        "ports": len(ports),
+        "failedPorts": len([port for port in ports if port["error"]]),
+        "elements": sum([port["elements"] for port in ports]),
+        "wallTime": wall_time,
+        "processTime": sum([result.get("processTime", 0.0) for result in results]),
+        "openTime": sum([result.get("openTime", 0.0) for result in results]),
+        "exportTime": sum([port["seconds"] for port in ports]),
+        "slowestPorts": slowest_ports[:slowest_port_count],
+        "results": results
+    }
+
+
+# Dumps the scenes with a pool of mayapy processes and writes summary.json to the output folder.
+def run_batch(scene_paths, output_dir, processes=4, export_format="npy", backend=None, mayapy=None):
+    if mayapy is None:
+        mayapy = find_mayapy()
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    # A scene listed twice would have two workers writing to the same folder.
+    tasks = []
+    for scene_path in scene_paths:
+        task = (os.path.abspath(scene_path), os.path.abspath(output_dir), export_format, backend, mayapy)
+        if task not in tasks:
+            tasks.append(task)
+
+    start_time = time.time()
+
+    # Threads are enough to drive the pool since the work happens in the mayapy processes.
+    pool = ThreadPool(max(1, min(processes, len(tasks))))
+    try:
+        results = pool.map(run_scene_process, tasks)
+    finally:
+        pool.close()
+        pool.join()
+
+    summary = aggregate_results(results, time.time() - start_time)
+
+    with open(os.path.join(output_dir, "summary.json"), "w") as summary_file:
+        json.dump(summary, summary_file, indent=2)
+
+    return summary
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Dumps the ports of every Bifrost graph of the scenes to disk.")
+    parser.add_argument("scenes", nargs="+", help="Scene files to dump")
+    parser.add_argument("-o", "--output", required=True, help="Folder to write the dumps to")
+    parser.add_argument("-j", "--processes", type=int, default=4, help="Number of mayapy processes to run at once")
+    parser.add_argument("--format", default="npy", choices=["csv", "npy", "bin"], help="File format of the dumps")
+    parser.add_argument("--backend", choices=["openmaya", "cmds"], help="API used to read the ports")
+    parser.add_argument("--mayapy", help="Path to mayapy, found from MAYA_LOCATION by default")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(args)
+
+    if args.worker:
+        run_worker(args.scenes[0], args.output, args.format, args.backend)
+        return
+
+    summary = run_batch(args.scenes, args.output, args.processes, args.format, args.backend, args.mayapy)
+
+    print("{} scenes, {} ports, {} elements in {:.1f}s ({:.1f}s of mayapy time)".format(
+        summary["scenes"], summary["ports"], summary["elements"], summary["wallTime"], summary["processTime"]))
+    print("Failed scenes: {}, failed ports: {}".format(len(summary["failedScenes"]), summary["failedPorts"]))
+
+
+if __name__ == "__main__":
+    main()
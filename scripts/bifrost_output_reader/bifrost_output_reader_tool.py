@@ -17,35 +17,65 @@ Limitations:
         - Any 3D arrays
 """
 
+import os
+import json
+import time
+from collections import deque
+
 from PySide2 import QtCore
 from PySide2 import QtWidgets
 
 import maya.cmds as cmds
+from maya.api import OpenMaya
 
 from bifrost_output_reader import utils
 from bifrost_output_reader import custom_button
 from bifrost_output_reader import data_view
+from bifrost_output_reader import column_store
+from bifrost_output_reader import port_stats
 
 from . import __version__, __version_info__
 
 
+last_state_option_var = "bifrostOutputReaderLastState"
+
+tool = None
+
+open_times = {"cold": None, "warm": None}
+
+
 class BifrostOutputReaderTool(QtWidgets.QWidget):
 
     def __init__(self, parent=None):
         self.bf_graph = None
+        self.bf_graphs = []
+        self.time_callback_id = None
+        self.snapshot_store = None
+        self.is_stale = False
+        self.pending_scroll = None
+        self.sampling_cancelled = False
+        self.filtered_rows = None
+        self.sort_column = 0
+        self.batch_loads = deque()
+        self.batch_view = None
+        self.evaluation_count = 0
 
         if parent is None:
             parent = utils.get_maya_window()
         super(self.__class__, self).__init__(parent=parent)
 
         self.setWindowFlags(QtCore.Qt.Window)
-        self.setAttribute(QtCore.Qt.WA_DeleteOnClose, True)
         self.setObjectName("bifrostOutputReaderTool")
 
         self.create_gui()
-        self.get_attrs_from_selection()
+
+        if not self.restore_last_state():
+            self.get_attrs_from_selection()
 
     def create_gui(self):
+        from bifrost_output_reader import live_refresh
+        from bifrost_output_reader import histogram_view
+
         self.setStyleSheet("""
             QToolTip {
                 background-color: rgb(30, 30, 30);
@@ -63,15 +93,19 @@ class BifrostOutputReaderTool(QtWidgets.QWidget):
         self.setWindowTitle("Bifrost Output Reader v{}".format(__version__))
         self.resize(900, 500)
 
-        self.attrs_list = QtWidgets.QListWidget(parent=self)
-        self.attrs_list.setAlternatingRowColors(True)
-        self.attrs_list.itemSelectionChanged.connect(self.on_attrs_list_selection_changed)
+        self.attrs_tree = QtWidgets.QTreeWidget(parent=self)
+        self.attrs_tree.setHeaderHidden(True)
+        self.attrs_tree.setAlternatingRowColors(True)
+        self.attrs_tree.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.attrs_tree.itemSelectionChanged.connect(self.on_attrs_tree_selection_changed)
 
-        self.load_ports_button = custom_button.CustomButton("Load output ports", tooltip="Loads output ports from selected Bifrost graph", parent=self)
+        self.load_ports_button = custom_button.CustomButton(
+            "Load output ports", tooltip="Loads output ports from selected Bifrost graphs.\n"
+                                         "Selecting many ports reads them all in one pass and shows each in its own tab.", parent=self)
         self.load_ports_button.clicked.connect(self.on_load_ports_clicked)
 
         self.attrs_layout = utils.wrap_layout(
-            [self.attrs_list, self.load_ports_button])
+            [self.attrs_tree, self.load_ports_button])
 
         self.attrs_groupbox = QtWidgets.QGroupBox("Ports", parent=self)
         self.attrs_groupbox.setLayout(self.attrs_layout)
@@ -94,8 +128,14 @@ class BifrostOutputReaderTool(QtWidgets.QWidget):
         self.length_value.setObjectName("valueLabel")
         self.length_value.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
 
+        self.evaluations_label = QtWidgets.QLabel("Evaluations:", parent=self)
+
+        self.evaluations_value = QtWidgets.QLabel("0", parent=self)
+        self.evaluations_value.setObjectName("valueLabel")
+        self.evaluations_value.setToolTip("How many times the graph was evaluated by the last refresh")
+
         self.length_layout = utils.wrap_layout(
-            [self.length_label, self.length_value, "stretch"],
+            [self.length_label, self.length_value, "stretch", self.evaluations_label, self.evaluations_value],
             QtCore.Qt.Horizontal)
 
         self.min_value_label = QtWidgets.QLabel("Min:", parent=self)
@@ -126,11 +166,127 @@ class BifrostOutputReaderTool(QtWidgets.QWidget):
             [self.max_value_label, self.max_value],
             QtCore.Qt.Horizontal)
 
+        self.mean_value_label, self.mean_value, self.mean_value_layout = self.create_stat_widgets("Mean:")
+        self.std_dev_label, self.std_dev_value, self.std_dev_layout = self.create_stat_widgets("Std dev:")
+        self.non_finite_label, self.non_finite_value, self.non_finite_layout = self.create_stat_widgets("NaN / Inf:")
+        self.arg_min_label, self.arg_min_value, self.arg_min_layout = self.create_stat_widgets("Min at:")
+        self.arg_max_label, self.arg_max_value, self.arg_max_layout = self.create_stat_widgets("Max at:")
+        self.selection_stats_label, self.selection_stats_value, self.selection_stats_layout = self.create_stat_widgets("Selection:")
+
         self.data_view = data_view.DataView(parent=self)
         self.data_view.table_model.plug_type_updated.connect(self.on_plug_type_updated)
         self.data_view.table_model.length_updated.connect(self.on_length_updated)
         self.data_view.table_model.min_value_updated.connect(self.on_min_value_updated)
         self.data_view.table_model.max_value_updated.connect(self.on_max_value_updated)
+        self.data_view.table_model.stats_updated.connect(self.on_stats_updated)
+        self.data_view.table_model.load_progress.connect(self.on_load_progress)
+        self.data_view.table_model.load_finished.connect(self.on_load_finished)
+        self.data_view.table_model.load_failed.connect(self.on_load_failed)
+        self.data_view.table_model.evaluations_updated.connect(self.on_evaluations_updated)
+        self.data_view.selectionModel().selectionChanged.connect(self.on_data_selection_changed)
+        self.data_view.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.data_view.customContextMenuRequested.connect(self.on_data_view_context_menu)
+
+        self.snapshot_view = data_view.DataView(parent=self)
+        self.snapshot_view.hide()
+
+        self.data_view.verticalScrollBar().valueChanged.connect(self.snapshot_view.verticalScrollBar().setValue)
+        self.snapshot_view.verticalScrollBar().valueChanged.connect(self.data_view.verticalScrollBar().setValue)
+        self.data_view.horizontalScrollBar().valueChanged.connect(self.snapshot_view.horizontalScrollBar().setValue)
+        self.snapshot_view.horizontalScrollBar().valueChanged.connect(self.data_view.horizontalScrollBar().setValue)
+
+        self.views_splitter = QtWidgets.QSplitter(QtCore.Qt.Horizontal, parent=self)
+        self.views_splitter.addWidget(self.data_view)
+        self.views_splitter.addWidget(self.snapshot_view)
+
+        self.views_tabs = QtWidgets.QTabWidget(parent=self)
+        self.views_tabs.setTabBarAutoHide(True)
+        self.views_tabs.addTab(self.views_splitter, "")
+        self.views_tabs.currentChanged.connect(self.on_views_tab_changed)
+
+        self.histogram = None
+        self.histogram_store = None
+
+        self.histogram_label = QtWidgets.QLabel("Histogram:", parent=self)
+        self.histogram_label.setMinimumWidth(40)
+
+        self.histogram_combo_box = QtWidgets.QComboBox(parent=self)
+        self.histogram_combo_box.setToolTip("Component whose distribution is shown, over every array")
+        self.histogram_combo_box.currentIndexChanged.connect(self.on_histogram_key_changed)
+
+        self.histogram_view = histogram_view.HistogramView(parent=self)
+        self.histogram_view.bin_clicked.connect(self.on_histogram_bin_clicked)
+
+        self.data_view.table_model.plug_type_updated.connect(self.update_histogram_keys)
+        self.data_view.table_model.values_appended.connect(self.on_values_appended)
+
+        self.histogram_layout = utils.wrap_layout(
+            [self.histogram_label, self.histogram_combo_box, self.histogram_view],
+            QtCore.Qt.Horizontal)
+
+        self.filter_label = QtWidgets.QLabel("Filter:", parent=self)
+        self.filter_label.setMinimumWidth(40)
+
+        self.filter_line_edit = QtWidgets.QLineEdit(parent=self)
+        self.filter_line_edit.setPlaceholderText("e.g. y < 0 and x > 1, nan(z) or mag > 10")
+        self.filter_line_edit.setToolTip(
+            "Only shows the rows matching a query, press Enter to apply it.\n"
+            "Compare components (x, y, z, w, value, mag, tx, ty, tz, m00 to m33) with <, <=, >, >=, == or !=,\n"
+            "test them with nan(), inf() or finite(), and combine terms with 'and' and 'or'.")
+        self.filter_line_edit.returnPressed.connect(self.apply_filter)
+
+        self.filter_result_label = QtWidgets.QLabel(parent=self)
+
+        self.sort_label = QtWidgets.QLabel("Sort:", parent=self)
+
+        self.sort_combo_box = QtWidgets.QComboBox(parent=self)
+        self.sort_combo_box.setToolTip("Sorts the rows of the array whose header was last clicked")
+        self.sort_combo_box.addItem("None")
+        self.sort_combo_box.currentIndexChanged.connect(self.on_sort_changed)
+
+        self.sort_descending_checkbox = QtWidgets.QCheckBox("Descending", parent=self)
+        self.sort_descending_checkbox.toggled.connect(self.on_sort_changed)
+
+        self.data_view.table_model.plug_type_updated.connect(self.update_sort_keys)
+        self.data_view.horizontalHeader().sectionClicked.connect(self.on_header_clicked)
+
+        self.filter_layout = utils.wrap_layout(
+            [self.filter_label, self.filter_line_edit, self.filter_result_label, 10,
+             self.sort_label, self.sort_combo_box, self.sort_descending_checkbox],
+            QtCore.Qt.Horizontal)
+
+        self.diff_label = QtWidgets.QLabel(parent=self)
+        self.diff_label.setObjectName("valueLabel")
+        self.diff_label.setWordWrap(True)
+        self.diff_label.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
+        self.diff_label.hide()
+
+        self.preview_label = QtWidgets.QLabel(parent=self)
+        self.preview_label.setObjectName("valueLabel")
+        self.preview_label.setWordWrap(True)
+        self.preview_label.hide()
+
+        self.stale_label = QtWidgets.QLabel(
+            "Live: only the rows in view are up to date. The stats, the histogram and the other rows "
+            "are read again when they're scrolled to or when Live is turned off.", parent=self)
+        self.stale_label.setObjectName("valueLabel")
+        self.stale_label.setWordWrap(True)
+        self.stale_label.hide()
+        self.data_view.table_model.stale_changed.connect(self.stale_label.setVisible)
+
+        self.load_progress_bar = QtWidgets.QProgressBar(parent=self)
+        self.load_progress_bar.setTextVisible(False)
+        self.load_progress_bar.setFixedHeight(8)
+
+        self.load_rate_label = QtWidgets.QLabel(parent=self)
+
+        self.load_cancel_button = custom_button.CustomButton("Cancel", tooltip="Stops loading the current port", parent=self)
+        self.load_cancel_button.clicked.connect(self.on_load_cancel_clicked)
+
+        self.load_progress_layout = utils.wrap_layout(
+            [self.load_progress_bar, self.load_rate_label, self.load_cancel_button],
+            QtCore.Qt.Horizontal)
+        self.set_load_progress_visible(False)
 
         self.refresh_data_button = custom_button.CustomButton("Refresh data", tooltip="Fetches current port's data", parent=self)
         self.refresh_data_button.clicked.connect(self.on_refresh_data_clicked)
@@ -142,12 +298,152 @@ class BifrostOutputReaderTool(QtWidgets.QWidget):
             "Create locators", tooltip="Creates locators from selected cells\n(only supports vector3 and matrix types)", parent=self)
         self.create_loc_button.clicked.connect(self.on_create_loc_clicked)
 
+        self.particles_checkbox = QtWidgets.QCheckBox("As particles", parent=self)
+        self.particles_checkbox.setToolTip("Creates one particle node holding every selected position instead of a locator each.\n"
+                                           "Use this for many thousands of points.")
+
+        self.export_button = custom_button.CustomButton(
+            "Export", tooltip="Writes the selected ports to csv, npy or binary files", parent=self)
+        self.export_button.clicked.connect(self.on_export_clicked)
+
+        self.take_snapshot_button = custom_button.CustomButton(
+            "Take snapshot", tooltip="Saves the current port's values to a file to compare against later", parent=self)
+        self.take_snapshot_button.clicked.connect(self.on_take_snapshot_clicked)
+
+        self.compare_button = custom_button.CustomButton(
+            "Compare", tooltip="Shows the current port next to a snapshot and highlights the cells that differ", parent=self)
+        self.compare_button.setCheckable(True)
+        self.compare_button.toggled.connect(self.on_compare_toggled)
+
+        self.find_nearest_button = custom_button.CustomButton(
+            "Find nearest", tooltip="Selects the position closest to the selected transform\n"
+                                    "(only supports vector3 and matrix types)", parent=self)
+        self.find_nearest_button.clicked.connect(self.on_find_nearest_clicked)
+
+        self.radius_label = QtWidgets.QLabel("Radius:", parent=self)
+
+        self.radius_spinbox = QtWidgets.QDoubleSpinBox(parent=self)
+        self.radius_spinbox.setToolTip("Distance from the selected transform to select positions within")
+        self.radius_spinbox.setRange(0, 1000000)
+        self.radius_spinbox.setDecimals(3)
+        self.radius_spinbox.setValue(1)
+
+        self.select_within_radius_button = custom_button.CustomButton(
+            "Select within radius", tooltip="Selects every position within the radius of the selected transform", parent=self)
+        self.select_within_radius_button.clicked.connect(self.on_select_within_radius_clicked)
+
+        self.spatial_result_label = QtWidgets.QLabel(parent=self)
+
+        self.spatial_layout = utils.wrap_layout(
+            [self.find_nearest_button, 10, self.radius_label, self.radius_spinbox, self.select_within_radius_button,
+             "stretch", self.spatial_result_label],
+            QtCore.Qt.Horizontal)
+
+        self.windowed_checkbox = QtWidgets.QCheckBox("Windowed", parent=self)
+        self.windowed_checkbox.setToolTip("Only reads the rows that are in view.\nUse this to open very large ports instantly (stats are skipped).")
+        self.windowed_checkbox.toggled.connect(self.on_windowed_toggled)
+
+        self.preview_checkbox = QtWidgets.QCheckBox("Preview", parent=self)
+        self.preview_checkbox.setToolTip(
+            "Only shows an evenly spread sample of the rows of large ports, labelled with their row in the port.\n"
+            "Stats are still computed over every row.")
+        self.preview_checkbox.toggled.connect(self.on_preview_toggled)
+
+        self.live_refresher = live_refresh.LiveRefresher(parent=self)
+        self.live_refresher.refresh_requested.connect(self.on_live_refresh_requested)
+        self.live_refresher.inputs_changed.connect(self.on_port_inputs_changed)
+
+        # Drops the port's sampled frames when its inputs change, even when Live is off.
+        self.frame_cache_watcher = live_refresh.LiveRefresher(parent=self)
+        self.frame_cache_watcher.inputs_changed.connect(self.on_port_inputs_changed)
+
+        # Notes whether the port changed while the tool was closed, so reopening it only reads the port if needed.
+        self.stale_watcher = live_refresh.LiveRefresher(parent=self)
+        self.stale_watcher.refresh_requested.connect(self.on_stale)
+
+        self.live_checkbox = QtWidgets.QCheckBox("Live", parent=self)
+        self.live_checkbox.setToolTip("Refreshes the rows in view whenever the port changes or the time changes")
+        self.live_checkbox.toggled.connect(self.on_live_toggled)
+
+        self.exact_sizing_checkbox = QtWidgets.QCheckBox("Exact widths", parent=self)
+        self.exact_sizing_checkbox.setToolTip("Sizes columns by measuring every row instead of a sample.\nThis can be slow on large ports.")
+        self.exact_sizing_checkbox.toggled.connect(self.on_exact_sizing_toggled)
+
+        self.precision_label = QtWidgets.QLabel("Precision:", parent=self)
+
+        self.precision_spinbox = QtWidgets.QSpinBox(parent=self)
+        self.precision_spinbox.setToolTip("Number of decimals to display floating point values with")
+        self.precision_spinbox.setRange(-1, 15)
+        self.precision_spinbox.setSpecialValueText("Full")
+        self.precision_spinbox.setValue(-1)
+        self.precision_spinbox.valueChanged.connect(self.on_precision_changed)
+
+        self.backend_label = QtWidgets.QLabel("Reader:", parent=self)
+
+        self.backend_combo_box = QtWidgets.QComboBox(parent=self)
+        self.backend_combo_box.setToolTip("API used to read the port's data")
+        self.backend_combo_box.addItems(utils.backends)
+        self.backend_combo_box.setCurrentIndex(utils.backends.index(utils.get_default_backend()))
+        self.backend_combo_box.currentIndexChanged.connect(self.on_backend_changed)
+
+        self.sample_start_label = QtWidgets.QLabel("Frames:", parent=self)
+
+        self.sample_start_spinbox = QtWidgets.QSpinBox(parent=self)
+        self.sample_start_spinbox.setToolTip("First frame to sample")
+        self.sample_start_spinbox.setRange(-100000, 100000)
+        self.sample_start_spinbox.setValue(cmds.playbackOptions(q=True, minTime=True))
+
+        self.sample_end_label = QtWidgets.QLabel("to", parent=self)
+
+        self.sample_end_spinbox = QtWidgets.QSpinBox(parent=self)
+        self.sample_end_spinbox.setToolTip("Last frame to sample")
+        self.sample_end_spinbox.setRange(-100000, 100000)
+        self.sample_end_spinbox.setValue(cmds.playbackOptions(q=True, maxTime=True))
+
+        self.sample_step_label = QtWidgets.QLabel("step", parent=self)
+
+        self.sample_step_spinbox = QtWidgets.QDoubleSpinBox(parent=self)
+        self.sample_step_spinbox.setToolTip("Number of frames between each sample")
+        self.sample_step_spinbox.setRange(0.01, 1000)
+        self.sample_step_spinbox.setValue(1)
+
+        self.sample_range_button = custom_button.CustomButton(
+            "Sample range", tooltip="Reads the current port at every frame of the range without changing the current time.\n"
+                                    "Sampled frames are then shown instantly when scrubbing the time slider.", parent=self)
+        self.sample_range_button.clicked.connect(self.on_sample_range_clicked)
+
+        self.frame_label = QtWidgets.QLabel("Frame:", parent=self)
+
+        self.frame_spinbox = QtWidgets.QDoubleSpinBox(parent=self)
+        self.frame_spinbox.setToolTip("Shows the port's values at a sampled frame")
+        self.frame_spinbox.setRange(-100000, 100000)
+        self.frame_spinbox.setEnabled(False)
+        self.frame_spinbox.valueChanged.connect(self.on_frame_changed)
+
+        self.frame_cache_label = QtWidgets.QLabel(parent=self)
+        self.update_frame_cache_label()
+
+        self.frames_layout = utils.wrap_layout(
+            [self.sample_start_label, self.sample_start_spinbox, self.sample_end_label, self.sample_end_spinbox,
+             self.sample_step_label, self.sample_step_spinbox, self.sample_range_button, 10,
+             self.frame_label, self.frame_spinbox, "stretch", self.frame_cache_label],
+            QtCore.Qt.Horizontal)
+
         self.list_buttons_layout = utils.wrap_layout(
-            [self.refresh_data_button, self.go_to_button, self.create_loc_button],
+            [self.refresh_data_button, self.go_to_button, self.create_loc_button, self.particles_checkbox, self.export_button,
+             self.take_snapshot_button, self.compare_button],
+            QtCore.Qt.Horizontal)
+
+        self.options_layout = utils.wrap_layout(
+            [self.live_checkbox, self.windowed_checkbox, self.preview_checkbox, self.exact_sizing_checkbox, "stretch",
+             self.precision_label, self.precision_spinbox, 10, self.backend_label, self.backend_combo_box],
             QtCore.Qt.Horizontal)
 
         self.data_layout = utils.wrap_layout(
-            [self.plug_type_layout, self.length_layout, self.min_value_layout, self.max_value_layout, self.data_view, self.list_buttons_layout])
+            [self.plug_type_layout, self.length_layout, self.min_value_layout, self.max_value_layout,
+             self.mean_value_layout, self.std_dev_layout, self.non_finite_layout, self.arg_min_layout, self.arg_max_layout,
+             self.selection_stats_layout, self.histogram_layout,
+             self.filter_layout, self.views_tabs, self.diff_label, self.preview_label, self.stale_label, self.load_progress_layout, self.list_buttons_layout, self.spatial_layout, self.options_layout, self.frames_layout])
 
         self.data_groupbox = QtWidgets.QGroupBox("Output Values", parent=self)
         self.data_groupbox.setLayout(self.data_layout)
@@ -162,43 +458,349 @@ class BifrostOutputReaderTool(QtWidgets.QWidget):
             [self.splitter])
         self.setLayout(self.main_layout)
 
+    def create_stat_widgets(self, caption):
+        label = QtWidgets.QLabel(caption, parent=self)
+        label.setMinimumWidth(40)
+
+        value = QtWidgets.QLabel("0", parent=self)
+        value.setObjectName("valueLabel")
+        value.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Preferred)
+        value.setWordWrap(True)
+        value.setCursor(QtCore.Qt.CursorShape.IBeamCursor)
+        value.setTextInteractionFlags(QtCore.Qt.TextSelectableByMouse)
+
+        layout = utils.wrap_layout(
+            [label, value],
+            QtCore.Qt.Horizontal)
+
+        return label, value, layout
+
     def showEvent(self, event):
         self.splitter.setSizes([self.width() * 0.25, self.width() * 0.75])
 
+    def closeEvent(self, event):
+        # A port that didn't finish loading needs to be read again when the tool is reopened.
+        self.is_stale = self.data_view.table_model.is_loading()
+
+        self.live_refresher.stop()
+        self.remove_time_callback()
+        self.sampling_cancelled = True
+        self.data_view.table_model.cancel_loading()
+
+        self.save_last_state()
+
+        plug_name = self.get_selected_port()
+        if plug_name is not None and self.bf_graph is not None and cmds.objExists(self.bf_graph):
+            self.stale_watcher.watch(self.bf_graph, plug_name)
+
+        super(self.__class__, self).closeEvent(event)
+
+    def on_stale(self):
+        self.is_stale = True
+        self.stale_watcher.stop()
+
+    def save_last_state(self):
+        plug_name = self.get_selected_port()
+        if plug_name is None or self.bf_graph is None:
+            return
+
+        cmds.optionVar(stringValue=(last_state_option_var, json.dumps({
+            "graph": self.bf_graph,
+            "port": plug_name,
+            "scroll": [self.data_view.horizontalScrollBar().value(), self.data_view.verticalScrollBar().value()]
+        })))
+
+    # Opens the graph and port the tool was last closed with when the selection holds no other graph.
+    # Returns False if there was nothing to restore.
+    def restore_last_state(self):
+        if self.get_selected_graphs() or not cmds.optionVar(exists=last_state_option_var):
+            return False
+
+        try:
+            state = json.loads(cmds.optionVar(q=last_state_option_var))
+        except ValueError:
+            return False
+
+        if not cmds.objExists(state["graph"]) or cmds.nodeType(state["graph"]) != "bifrostGraphShape":
+            return False
+
+        self.load_ports([state["graph"]])
+
+        item = self.find_port_item(state["graph"], state["port"])
+        if item is not None:
+            self.pending_scroll = state["scroll"]
+            item.setSelected(True)
+
+        return True
+
+    # Shows the tool again as it was left. The port is only read again if it changed in the meantime,
+    # or the ports are reloaded if another graph is selected.
+    def restore(self):
+        from bifrost_output_reader import frame_cache
+
+        self.stale_watcher.stop()
+
+        selected_graphs = self.get_selected_graphs()
+        if selected_graphs and selected_graphs != self.bf_graphs:
+            self.data_view.clear_data()
+            self.get_attrs_from_selection()
+            return
+
+        if not all([cmds.objExists(bf_graph) for bf_graph in self.bf_graphs]):
+            self.data_view.clear_data()
+            self.get_attrs_from_selection()
+            return
+
+        plug_name = self.get_selected_port()
+        if plug_name is None:
+            return
+
+        self.update_live_refresher(plug_name)
+        if frame_cache.cache.frames(self.bf_graph, plug_name):
+            self.add_time_callback()
+
+        if self.is_stale:
+            self.fetch_data_from_selected_attr()
+        self.is_stale = False
+
+    def set_load_progress_visible(self, visible):
+        self.load_progress_bar.setVisible(visible)
+        self.load_rate_label.setVisible(visible)
+        self.load_cancel_button.setVisible(visible)
+
     def display_error(self, msg, title="Error!"):
         cmds.confirmDialog(title=title, message=msg, button="OK", icon="critical")
 
+    def get_selected_graphs(self):
+        bf_graphs = cmds.listRelatives(cmds.ls(sl=True), shapes=True, type="bifrostGraphShape") or []
+
+        unique_graphs = []
+        for bf_graph in bf_graphs:
+            if bf_graph not in unique_graphs:
+                unique_graphs.append(bf_graph)
+
+        return unique_graphs
+
     def get_attrs_from_selection(self):
-        self.attrs_list.clear()
+        self.load_ports(self.get_selected_graphs())
+
+    # Lists the ports of each graph under its own item.
+    def load_ports(self, bf_graphs):
+        self.attrs_tree.clear()
+        self.clear_batch_tabs()
+        self.bf_graphs = list(bf_graphs)
         self.bf_graph = None
 
-        bf_graphs = cmds.listRelatives(cmds.ls(sl=True), shapes=True, type="bifrostGraphShape")
-        if not bf_graphs:
-            return
-        self.bf_graph = bf_graphs[0]
+        if self.bf_graphs:
+            self.bf_graph = self.bf_graphs[0]
+
+        for bf_graph in self.bf_graphs:
+            graph_item = QtWidgets.QTreeWidgetItem([bf_graph])
+            graph_item.setFlags(QtCore.Qt.ItemIsEnabled)
+            graph_item.setToolTip(0, bf_graph)
+            self.attrs_tree.addTopLevelItem(graph_item)
+
+            for port in utils.get_ports_from_bf_graph(bf_graph):
+                item = QtWidgets.QTreeWidgetItem([port])
+                item.setData(0, QtCore.Qt.UserRole, bf_graph)
+                item.setToolTip(0, "{}.{}".format(bf_graph, port))
+                item.setSizeHint(0, QtCore.QSize(1, 32))
+                graph_item.addChild(item)
+
+        self.attrs_tree.expandAll()
+
+    def find_port_item(self, bf_graph, plug_name):
+        for i in range(self.attrs_tree.topLevelItemCount()):
+            graph_item = self.attrs_tree.topLevelItem(i)
+            if graph_item.text(0) != bf_graph:
+                continue
+
+            for j in range(graph_item.childCount()):
+                if graph_item.child(j).text(0) == plug_name:
+                    return graph_item.child(j)
+
+    # Returns the selected (graph, port) pairs in the order they're listed.
+    def get_selected_ports(self):
+        ports = []
+
+        for i in range(self.attrs_tree.topLevelItemCount()):
+            graph_item = self.attrs_tree.topLevelItem(i)
+
+            for j in range(graph_item.childCount()):
+                item = graph_item.child(j)
+                if item.isSelected():
+                    ports.append((item.data(0, QtCore.Qt.UserRole), item.text(0)))
 
-        ports = utils.get_ports_from_bf_graph(self.bf_graph)
-        for port in ports:
-            item = QtWidgets.QListWidgetItem(port)
-            item.setToolTip(port)
-            item.setSizeHint(QtCore.QSize(1, 32))
-            self.attrs_list.addItem(item)
+        return ports
+
+    # The first selected port is the one shown in the main tab.
+    def get_selected_port(self):
+        ports = self.get_selected_ports()
+        if ports:
+            return ports[0][1]
 
     def fetch_data_from_selected_attr(self):
-        items = self.attrs_list.selectedItems()
+        from bifrost_output_reader import frame_cache
+
+        ports = self.get_selected_ports()
+        self.clear_batch_tabs()
 
-        if not items:
+        if not ports:
+            self.live_refresher.stop()
             self.data_view.clear_data()
+            self.set_load_progress_visible(False)
+            self.update_preview_label()
+            self.update_frame_spinbox()
+            return
+
+        self.bf_graph, plug_name = ports[0]
+        self.views_tabs.setTabText(0, "{}.{}".format(*ports[0]))
+
+        self.update_live_refresher(plug_name)
+        self.update_frame_spinbox()
+        if frame_cache.cache.frames(self.bf_graph, plug_name):
+            self.add_time_callback()
+
+        if len(ports) > 1:
+            self.fetch_batch(ports)
+            return
+
+        self.data_view.fill_data(
+            self.bf_graph, plug_name,
+            backend=self.backend_combo_box.currentText(),
+            windowed=self.windowed_checkbox.isChecked(),
+            preview=self.preview_checkbox.isChecked())
+        self.update_preview_label()
+
+    # Shows the first port in the main tab and the others in their own tabs. Each port streams in
+    # through its view's loader once the previous one is done, so the UI stays responsive and can cancel.
+    # Ports are read graph by graph: Bifrost computes all of a graph's outputs together,
+    # so only the first port read from a graph evaluates it.
+    def fetch_batch(self, ports):
+        graphs = []
+        for bf_graph, plug_name in ports:
+            if bf_graph not in graphs:
+                graphs.append(bf_graph)
+
+        for bf_graph, plug_name in ports[1:]:
+            view = data_view.DataView(parent=self)
+            view.exact_column_sizing = self.data_view.exact_column_sizing
+            view.table_model.set_precision(self.data_view.table_model.precision)
+            view.table_model.load_progress.connect(self.on_load_progress)
+            view.table_model.load_finished.connect(self.on_batch_load_finished)
+            view.table_model.load_failed.connect(self.on_load_failed)
+            view.table_model.evaluations_updated.connect(self.on_batch_evaluations_updated)
+
+            self.views_tabs.addTab(view, "{}.{}".format(bf_graph, plug_name))
+            self.batch_loads.append((view, bf_graph, plug_name))
+
+        self.batch_loads = deque(sorted(self.batch_loads, key=lambda load: graphs.index(load[1])))
+
+        self.data_view.fill_data(
+            self.bf_graph, ports[0][1],
+            backend=self.backend_combo_box.currentText(),
+            windowed=self.windowed_checkbox.isChecked(),
+            preview=self.preview_checkbox.isChecked())
+        self.update_preview_label()
+
+        # Otherwise the next port starts from on_load_finished.
+        if not self.data_view.table_model.is_loading():
+            self.load_next_batch_port()
+
+    def load_next_batch_port(self):
+        if self.batch_view is not None and self.batch_view.table_model.is_loading():
             return
+        self.batch_view = None
+
+        while self.batch_loads:
+            view, bf_graph, plug_name = self.batch_loads.popleft()
+            view.fill_data(
+                bf_graph, plug_name,
+                backend=self.backend_combo_box.currentText(),
+                windowed=self.windowed_checkbox.isChecked(),
+                preview=self.preview_checkbox.isChecked())
+
+            table_model = view.table_model
+            index = self.views_tabs.indexOf(view)
+
+            if table_model.source is None:
+                self.views_tabs.removeTab(index)
+                view.deleteLater()
+                continue
+
+            self.views_tabs.setTabToolTip(index, "{} ({} elements)".format(
+                table_model.plug_type, table_model.source.sizes[0] if table_model.source.sizes else 0))
+
+            if table_model.is_loading():
+                self.batch_view = view
+                return
+
+    def on_batch_load_finished(self, changed):
+        index = self.views_tabs.currentIndex()
+        if index > 0:
+            self.on_views_tab_changed(index)
+
+        self.load_next_batch_port()
+
+    # Batch ports add their evaluations to the first port's.
+    def on_batch_evaluations_updated(self, count):
+        self.on_evaluations_updated(self.evaluation_count + count)
+
+    def cancel_batch_loads(self):
+        self.batch_loads.clear()
+        if self.batch_view is not None:
+            self.batch_view.table_model.cancel_loading()
+            self.batch_view = None
+
+    def clear_batch_tabs(self):
+        self.cancel_batch_loads()
+        self.views_tabs.setCurrentIndex(0)
+
+        while self.views_tabs.count() > 1:
+            view = self.views_tabs.widget(1)
+            self.views_tabs.removeTab(1)
+            view.deleteLater()
+
+    # Selections, locators and searches act on the current tab's port.
+    # The filter, sort and histogram only act on the main tab's port and are disabled on the others.
+    def get_current_view(self):
+        index = self.views_tabs.currentIndex()
+        if index > 0:
+            return self.views_tabs.widget(index)
+        return self.data_view
+
+    # The stats area follows the port of the current tab.
+    def on_views_tab_changed(self, index):
+        if index == 0:
+            table_model = self.data_view.table_model
+        else:
+            table_model = self.views_tabs.widget(index).table_model
+
+        for widget in [self.filter_line_edit, self.sort_combo_box, self.sort_descending_checkbox,
+                       self.histogram_combo_box, self.histogram_view]:
+            widget.setEnabled(index == 0)
 
-        plug_name = items[0].text()
-        self.data_view.fill_data(self.bf_graph, plug_name)
+        length = 0
+        if table_model.store is not None and table_model.columns:
+            length = table_model.store.array_length(0)
+
+        self.on_plug_type_updated(table_model.plug_type or "n/a")
+        self.on_length_updated(length)
+        self.on_min_value_updated(port_stats.format_stat(table_model.stats.get("minValue")))
+        self.on_max_value_updated(port_stats.format_stat(table_model.stats.get("maxValue")))
+        self.on_stats_updated(table_model.stats)
+
+    def update_live_refresher(self, plug_name):
+        if not self.live_checkbox.isChecked() or self.bf_graph is None:
+            self.live_refresher.stop()
+        elif (self.live_refresher.bf_graph, self.live_refresher.plug_name) != (self.bf_graph, plug_name):
+            self.live_refresher.watch(self.bf_graph, plug_name)
 
     def on_load_ports_clicked(self):
         self.data_view.clear_data()
         self.get_attrs_from_selection()
 
-    def on_attrs_list_selection_changed(self):
+    def on_attrs_tree_selection_changed(self):
         self.fetch_data_from_selected_attr()
 
     def on_plug_type_updated(self, plug_type):
@@ -224,50 +826,777 @@ class BifrostOutputReaderTool(QtWidgets.QWidget):
     def on_max_value_updated(self, value):
         self.max_value.setText(str(value))
 
+    def on_stats_updated(self, stats):
+        if not stats:
+            for label in [self.mean_value, self.std_dev_value, self.non_finite_value, self.arg_min_value, self.arg_max_value]:
+                label.setText("0")
+            return
+
+        self.mean_value.setText(port_stats.format_stat(stats["mean"]))
+        self.std_dev_value.setText(port_stats.format_stat(stats["stdDev"]))
+        self.non_finite_value.setText("{} / {}".format(stats["nanCount"], stats["infCount"]))
+        self.arg_min_value.setText(self.format_cell_indices(stats["argMin"]))
+        self.arg_max_value.setText(self.format_cell_indices(stats["argMax"]))
+
+    def format_cell_indices(self, cells):
+        if cells is None:
+            return "n/a"
+
+        # A single (array, row) cell, or one per component that's None when a component has no finite value.
+        if cells[0] is not None and type(cells[0]) != tuple:
+            cells = [cells]
+
+        if all([cell is None for cell in cells]):
+            return "n/a"
+
+        single_array = self.get_current_view().table_model.columns == 1
+        texts = []
+
+        for cell in cells:
+            if cell is None:
+                texts.append("n/a")
+            elif single_array:
+                texts.append("row {}".format(cell[1]))
+            else:
+                texts.append("array {} row {}".format(*cell))
+
+        return ", ".join(texts)
+
+    def on_load_progress(self, done, total, elapsed):
+        self.set_load_progress_visible(done < total)
+        self.load_progress_bar.setRange(0, max(total, 1))
+        self.load_progress_bar.setValue(done)
+
+        rate = done / max(elapsed, 0.001)
+        self.load_rate_label.setText("{} / {} ({:.1f}s, {:,.0f} elements/s)".format(done, total, elapsed, rate))
+
+    def on_evaluations_updated(self, count):
+        self.evaluation_count = count
+        self.evaluations_value.setText(str(count))
+
+    def on_load_finished(self, changed):
+        self.set_load_progress_visible(False)
+
+        if self.pending_scroll is not None:
+            self.data_view.horizontalScrollBar().setValue(self.pending_scroll[0])
+            self.data_view.verticalScrollBar().setValue(self.pending_scroll[1])
+            self.pending_scroll = None
+
+        if changed and self.snapshot_store is not None:
+            self.update_diff()
+
+        if changed:
+            self.update_histogram()
+
+        self.update_preview_label()
+
+        if changed and (self.filter_line_edit.text().strip() or self.sort_combo_box.currentIndex() > 0):
+            self.apply_filter()
+
+        self.load_next_batch_port()
+
+    def on_load_failed(self, msg):
+        self.set_load_progress_visible(False)
+        self.pending_scroll = None
+        self.display_error("Failed to load the port: {}".format(msg))
+        self.load_next_batch_port()
+
+    # Filters the rows then sorts them, mapping the table's rows to the result.
+    def apply_filter(self):
+        from bifrost_output_reader import query
+
+        text = self.filter_line_edit.text().strip()
+        table_model = self.data_view.table_model
+        self.filtered_rows = None
+
+        if not text:
+            self.filter_result_label.setText("")
+        elif not self.is_fully_loaded():
+            self.filter_result_label.setText("Needs the whole port loaded")
+        else:
+            try:
+                groups = query.parse_query(text, table_model.plug_type)
+            except query.QueryError as err:
+                self.filter_result_label.setText(str(err))
+            else:
+                start_time = time.time()
+                self.filtered_rows = query.filter_rows(table_model.store, groups)
+
+                self.filter_result_label.setText("{} / {} rows ({:.0f} ms)".format(
+                    len(self.filtered_rows), table_model.rows, (time.time() - start_time) * 1000))
+
+        self.update_row_map()
+
+    def is_fully_loaded(self, view=None):
+        table_model = (view or self.data_view).table_model
+        return isinstance(table_model.store, column_store.ColumnStore) and not table_model.is_store_loading()
+
+    def update_row_map(self):
+        from bifrost_output_reader import sorting
+
+        table_model = self.data_view.table_model
+        header = self.data_view.horizontalHeader()
+        permutation = None
+
+        if self.sort_combo_box.currentIndex() > 0 and self.is_fully_loaded() and self.sort_column < table_model.columns:
+            descending = self.sort_descending_checkbox.isChecked()
+            permutation = table_model.get_sort_permutation(self.sort_column, self.sort_combo_box.currentText(), descending)
+
+            header.setSortIndicatorShown(True)
+            header.setSortIndicator(self.sort_column, QtCore.Qt.DescendingOrder if descending else QtCore.Qt.AscendingOrder)
+        else:
+            header.setSortIndicatorShown(False)
+
+        if permutation is None:
+            table_model.set_row_map(self.filtered_rows)
+        elif self.filtered_rows is None:
+            table_model.set_row_map(permutation, ordered=False)
+        else:
+            table_model.set_row_map(sorting.restrict(permutation, self.filtered_rows, table_model.rows), ordered=False)
+
+    def update_sort_keys(self, plug_type):
+        from bifrost_output_reader import sorting
+
+        current_key = self.sort_combo_box.currentText()
+        keys = sorting.get_sort_keys(plug_type)
+
+        self.sort_combo_box.blockSignals(True)
+        self.sort_combo_box.clear()
+        self.sort_combo_box.addItems(["None"] + keys)
+        if current_key in keys:
+            self.sort_combo_box.setCurrentIndex(keys.index(current_key) + 1)
+        self.sort_combo_box.blockSignals(False)
+
+    def update_histogram_keys(self, plug_type):
+        from bifrost_output_reader import sorting
+
+        current_key = self.histogram_combo_box.currentText()
+        keys = sorting.get_sort_keys(plug_type)
+
+        self.histogram_combo_box.blockSignals(True)
+        self.histogram_combo_box.clear()
+        self.histogram_combo_box.addItems(keys)
+        if current_key in keys:
+            self.histogram_combo_box.setCurrentIndex(keys.index(current_key))
+        self.histogram_combo_box.blockSignals(False)
+
+        self.histogram = None
+        self.histogram_view.set_histogram(None)
+
+    # Bins every value again, so the bins fit the exact range once the port is loaded.
+    def update_histogram(self):
+        from bifrost_output_reader import histogram
+
+        table_model = self.data_view.table_model
+        key = self.histogram_combo_box.currentText()
+
+        if not key or not isinstance(table_model.store, column_store.ColumnStore):
+            self.histogram = None
+        else:
+            self.histogram = histogram.compute_histogram(table_model.store, key)
+            self.histogram_store = table_model.store
+
+        self.histogram_view.set_histogram(self.histogram)
+        self.update_histogram_label()
+
+    # Previews only bin their sampled rows, unlike their stats.
+    def update_histogram_label(self):
+        if self.data_view.table_model.sample_rows is not None:
+            self.histogram_label.setText("Histogram (sample):")
+            self.histogram_label.setToolTip("Only counts the rows of the preview, turn off Preview to count every row")
+        else:
+            self.histogram_label.setText("Histogram:")
+            self.histogram_label.setToolTip("")
+
+    # Adds the rows that were just loaded to the histogram, so it fills up as the port streams in.
+    def on_values_appended(self):
+        from bifrost_output_reader import histogram
+
+        table_model = self.data_view.table_model
+        key = self.histogram_combo_box.currentText()
+        if not key or not isinstance(table_model.store, column_store.ColumnStore):
+            return
+
+        if self.histogram is None or self.histogram.key != key or self.histogram_store is not table_model.store:
+            self.histogram = histogram.Histogram(key)
+            self.histogram_store = table_model.store
+
+        histogram.update_histogram(self.histogram, table_model.store)
+        self.histogram_view.set_histogram(self.histogram)
+        self.update_histogram_label()
+
+    def on_histogram_key_changed(self, *args):
+        if not self.data_view.table_model.is_store_loading():
+            self.update_histogram()
+
+    # Filters the table down to the rows with a value in the bin.
+    def on_histogram_bin_clicked(self, low, high, is_last):
+        key = self.histogram_combo_box.currentText()
+        self.filter_line_edit.setText("{key} >= {low!r} and {key} {op} {high!r}".format(
+            key=key, low=low, high=high, op="<=" if is_last else "<"))
+        self.apply_filter()
+
+    def on_sort_changed(self, *args):
+        self.apply_filter()
+
+    # Clicking an array's header sorts it, or flips the order if it's already the sorted one.
+    def on_header_clicked(self, section):
+        if self.sort_combo_box.count() < 2:
+            return
+
+        if self.sort_combo_box.currentIndex() == 0:
+            self.sort_column = section
+            self.sort_combo_box.setCurrentIndex(1)
+        elif section == self.sort_column:
+            self.sort_descending_checkbox.setChecked(not self.sort_descending_checkbox.isChecked())
+        else:
+            self.sort_column = section
+            self.apply_filter()
+
+    def on_load_cancel_clicked(self):
+        self.sampling_cancelled = True
+        self.cancel_batch_loads()
+        self.data_view.table_model.cancel_loading()
+        self.set_load_progress_visible(False)
+
     def on_refresh_data_clicked(self):
+        from bifrost_output_reader import frame_cache
+
+        for bf_graph, plug_name in self.get_selected_ports():
+            frame_cache.cache.invalidate(bf_graph, plug_name)
+        self.fetch_data_from_selected_attr()
+
+    def on_backend_changed(self, index):
+        self.fetch_data_from_selected_attr()
+
+    def on_precision_changed(self, value):
+        if value < 0:
+            value = None
+        self.data_view.table_model.set_precision(value)
+        self.data_view.resize_columns()
+
+    def on_exact_sizing_toggled(self, checked):
+        self.data_view.exact_column_sizing = checked
+        self.data_view.resize_columns()
+
+    def on_live_toggled(self, checked):
+        plug_name = self.get_selected_port()
+        if plug_name is not None:
+            self.update_live_refresher(plug_name)
+        else:
+            self.live_refresher.stop()
+
+        # Brings the rows and stats live refreshes skipped up to date.
+        if not checked and self.data_view.table_model.is_stale():
+            self.fetch_data_from_selected_attr()
+
+    def on_port_inputs_changed(self, bf_graph, plug_name):
+        from bifrost_output_reader import frame_cache
+
+        frame_cache.cache.invalidate(bf_graph, plug_name)
+        if (bf_graph, plug_name) == (self.bf_graph, self.get_selected_port()):
+            self.update_frame_spinbox()
+
+    # Frames sampled before the inputs last changed are dropped, so a cached frame is only shown on time changes.
+    def on_live_refresh_requested(self):
+        from bifrost_output_reader import frame_cache
+
+        if self.show_cached_frame(frame_cache.get_current_frame()):
+            return
+
+        if not self.data_view.refresh_visible_rows():
+            self.fetch_data_from_selected_attr()
+
+    def on_windowed_toggled(self, checked):
+        if checked and self.preview_checkbox.isChecked():
+            self.preview_checkbox.blockSignals(True)
+            self.preview_checkbox.setChecked(False)
+            self.preview_checkbox.blockSignals(False)
+        self.fetch_data_from_selected_attr()
+
+    def on_preview_toggled(self, checked):
+        if checked and self.windowed_checkbox.isChecked():
+            self.windowed_checkbox.blockSignals(True)
+            self.windowed_checkbox.setChecked(False)
+            self.windowed_checkbox.blockSignals(False)
         self.fetch_data_from_selected_attr()
 
+    def update_preview_label(self):
+        table_model = self.data_view.table_model
+        if table_model.sample_rows is None:
+            self.preview_label.hide()
+            return
+
+        self.preview_label.setText(
+            "Preview: showing {} of {} rows, their headers are their row in the port. "
+            "Stats cover every row, the histogram, filter, sort and searches only the shown ones.".format(
+                len(table_model.sample_rows), max(table_model.source.sizes)))
+        self.preview_label.show()
+
+    def on_sample_range_clicked(self):
+        from bifrost_output_reader import frame_cache
+
+        plug_name = self.get_selected_port()
+        if plug_name is None or self.bf_graph is None:
+            return
+
+        start = self.sample_start_spinbox.value()
+        end = self.sample_end_spinbox.value()
+        step = self.sample_step_spinbox.value()
+        frame_count = len(frame_cache.get_frame_range(start, end, step))
+
+        self.sampling_cancelled = False
+        self.data_view.table_model.cancel_loading()
+        start_time = time.time()
+
+        samples = frame_cache.sample_frame_range(
+            self.bf_graph, plug_name, start, end, step, backend=self.backend_combo_box.currentText())
+
+        # Keeps the UI responsive so the sampling can be cancelled.
+        for index, frame in enumerate(samples):
+            self.on_load_progress(index + 1, frame_count, time.time() - start_time)
+            self.load_rate_label.setText("Frame {} ({} / {})".format(frame, index + 1, frame_count))
+            QtWidgets.QApplication.processEvents()
+
+            if self.sampling_cancelled:
+                break
+
+        self.set_load_progress_visible(False)
+        self.update_frame_spinbox()
+        self.add_time_callback()
+
+        if not self.show_cached_frame(frame_cache.get_current_frame()):
+            frames = frame_cache.cache.frames(self.bf_graph, plug_name)
+            if frames:
+                self.show_cached_frame(frames[0])
+
+    def update_frame_spinbox(self):
+        from bifrost_output_reader import frame_cache
+
+        frames = []
+
+        plug_name = self.get_selected_port()
+        if plug_name is not None and self.bf_graph is not None:
+            frames = frame_cache.cache.frames(self.bf_graph, plug_name)
+
+        self.frame_spinbox.setEnabled(bool(frames))
+        if frames:
+            self.frame_spinbox.blockSignals(True)
+            self.frame_spinbox.setRange(frames[0], frames[-1])
+            self.frame_spinbox.setSingleStep(self.sample_step_spinbox.value())
+            self.frame_spinbox.blockSignals(False)
+
+        self.update_frame_cache_label()
+
+    def update_frame_cache_label(self):
+        from bifrost_output_reader import frame_cache
+
+        stats = frame_cache.cache.get_stats()
+
+        self.frame_cache_label.setText("{} frames, {:.1f} / {:.0f} MB".format(
+            stats["frames"], stats["bytes"] / 1048576.0, stats["maxBytes"] / 1048576.0))
+        self.frame_cache_label.setToolTip("Hits: {}\nMisses: {}\nHit rate: {:.0%}\nEvictions: {} ({:.1f} MB)".format(
+            stats["hits"], stats["misses"], stats["hitRate"], stats["evictions"], stats["evictedBytes"] / 1048576.0))
+
+    # Displays the port's values at a sampled frame, returning False if the frame isn't cached.
+    def show_cached_frame(self, frame):
+        from bifrost_output_reader import frame_cache
+
+        plug_name = self.get_selected_port()
+        if plug_name is None or self.bf_graph is None:
+            return False
+
+        if not frame_cache.cache.contains(self.bf_graph, plug_name, frame):
+            return False
+
+        store = frame_cache.cache.get(self.bf_graph, plug_name, frame)
+        self.data_view.table_model.show_store(self.bf_graph, plug_name, store)
+
+        self.frame_spinbox.blockSignals(True)
+        self.frame_spinbox.setValue(frame)
+        self.frame_spinbox.blockSignals(False)
+
+        self.update_frame_cache_label()
+        return True
+
+    def add_time_callback(self):
+        if self.time_callback_id is None:
+            self.time_callback_id = OpenMaya.MDGMessage.addTimeChangeCallback(self.on_time_changed)
+
+        plug_name = self.get_selected_port()
+        if plug_name is not None and (self.frame_cache_watcher.bf_graph, self.frame_cache_watcher.plug_name) != (self.bf_graph, plug_name):
+            self.frame_cache_watcher.watch(self.bf_graph, plug_name)
+
+    def remove_time_callback(self):
+        if self.time_callback_id is not None:
+            OpenMaya.MMessage.removeCallback(self.time_callback_id)
+            self.time_callback_id = None
+        self.frame_cache_watcher.stop()
+
+    def on_time_changed(self, current_time, client_data):
+        self.show_cached_frame(current_time.asUnits(OpenMaya.MTime.uiUnit()))
+
+    def on_frame_changed(self, value):
+        if not self.show_cached_frame(value):
+            self.update_frame_cache_label()
+
+    def on_export_clicked(self):
+        from bifrost_output_reader import exporter
+
+        ports = self.get_selected_ports()
+        if not ports:
+            return
+
+        file_filters = "CSV (*.csv);;NumPy (*.npy);;Binary (*.bin)"
+
+        if len(ports) == 1:
+            path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
+                self, "Export port", exporter.get_port_file_name(ports[0][0], ports[0][1], "csv"), file_filters)
+            if not path:
+                return
+            paths = [path]
+        else:
+            directory = QtWidgets.QFileDialog.getExistingDirectory(self, "Export ports")
+            if not directory:
+                return
+
+            export_format, ok = QtWidgets.QInputDialog.getItem(self, "Export ports", "Format:", exporter.formats, 0, False)
+            if not ok:
+                return
+
+            paths = [
+                os.path.join(directory, exporter.get_port_file_name(bf_graph, plug_name, export_format))
+                for bf_graph, plug_name in ports]
+
+        start_time = time.time()
+
+        def report_progress(done, total):
+            self.on_load_progress(done, total, time.time() - start_time)
+            QtWidgets.QApplication.processEvents()
+
+        try:
+            for (bf_graph, plug_name), path in zip(ports, paths):
+                exporter.export_port(
+                    bf_graph, plug_name, path,
+                    backend=self.backend_combo_box.currentText(), progress=report_progress)
+        except (ValueError, IOError, OSError) as err:
+            self.display_error(str(err))
+        finally:
+            self.set_load_progress_visible(False)
+
+    def on_take_snapshot_clicked(self):
+        from bifrost_output_reader import snapshot
+
+        table_model = self.data_view.table_model
+        if table_model.store is None or table_model.is_loading():
+            return
+
+        if table_model.sample_rows is not None:
+            self.display_error("Snapshots need every row, turn off Preview first")
+            return
+
+        bf_graph, plug_name = table_model.port
+        path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Take snapshot", "{}.bfsnap".format(plug_name), "Snapshots (*.bfsnap)")
+        if not path:
+            return
+
+        try:
+            snapshot.take_snapshot(table_model.store, path, bf_graph, plug_name)
+        except (ValueError, IOError, OSError) as err:
+            self.display_error(str(err))
+
+    def on_compare_toggled(self, checked):
+        from bifrost_output_reader import snapshot
+
+        if checked:
+            path, selected_filter = QtWidgets.QFileDialog.getOpenFileName(
+                self, "Compare with snapshot", "", "Snapshots (*.bfsnap)")
+
+            if path:
+                try:
+                    self.snapshot_store = snapshot.load_snapshot(path)
+                except (ValueError, IOError, OSError) as err:
+                    self.display_error(str(err))
+
+            if self.snapshot_store is None:
+                self.compare_button.blockSignals(True)
+                self.compare_button.setChecked(False)
+                self.compare_button.blockSignals(False)
+                return
+
+            header = self.snapshot_store.header
+            self.snapshot_view.table_model.show_store(header["graph"], header["port"], self.snapshot_store)
+            self.snapshot_view.show()
+            self.diff_label.show()
+            self.update_diff()
+        else:
+            self.snapshot_store = None
+            self.snapshot_view.clear_data()
+            self.snapshot_view.hide()
+            self.diff_label.hide()
+            self.data_view.table_model.set_diff_mask(None)
+
+    def update_diff(self):
+        from bifrost_output_reader import snapshot
+
+        store = self.data_view.table_model.store
+
+        if self.data_view.table_model.sample_rows is not None:
+            self.diff_label.setText("Diff: previews can't be compared, turn off Preview to compare every row")
+            self.data_view.table_model.set_diff_mask(None)
+            self.snapshot_view.table_model.set_diff_mask(None)
+            return
+
+        if not isinstance(store, column_store.ColumnStore) or store.width != self.snapshot_store.width:
+            self.diff_label.setText("Diff: the port can't be compared with this snapshot")
+            self.data_view.table_model.set_diff_mask(None)
+            self.snapshot_view.table_model.set_diff_mask(None)
+            return
+
+        diff = snapshot.compare_stores(store, self.snapshot_store)
+        self.data_view.table_model.set_diff_mask(diff["mask"])
+        self.snapshot_view.table_model.set_diff_mask(diff["otherMask"])
+
+        if not diff["mismatchCount"]:
+            self.diff_label.setText("Diff: identical to the snapshot")
+            return
+
+        self.diff_label.setText("Diff: {} mismatches, max abs error {}, first at {}".format(
+            diff["mismatchCount"], diff["maxAbsError"],
+            ", ".join(["[{}][{}]".format(*cell) for cell in diff["firstMismatches"][:10]])))
+
+    def on_data_view_context_menu(self, pos):
+        menu = QtWidgets.QMenu(self)
+        menu.addAction("Copy", self.data_view.copy_selection)
+        menu.addAction("Create locators", self.on_create_loc_clicked)
+        menu.addAction("Export selection...", self.on_export_selection_clicked)
+        menu.exec_(self.data_view.viewport().mapToGlobal(pos))
+
+    # Shows the stats of the selected cells, only when the values are in memory so
+    # selecting a whole windowed port doesn't read all of it.
+    def on_data_selection_changed(self, *args):
+        table_model = self.data_view.table_model
+
+        if not self.is_fully_loaded() or not table_model.store.is_numeric():
+            self.selection_stats_value.setText("n/a")
+            return
+
+        store = self.data_view.get_selected_store()
+        if not store.total_length():
+            self.selection_stats_value.setText("0")
+            return
+
+        stats = port_stats.compute_stats(store)
+        self.selection_stats_value.setText("{} values, min {}, max {}, mean {}".format(
+            store.total_length(), port_stats.format_stat(stats["minValue"]),
+            port_stats.format_stat(stats["maxValue"]), port_stats.format_stat(stats["mean"])))
+
+    def on_export_selection_clicked(self):
+        from bifrost_output_reader import exporter
+
+        store = self.data_view.get_selected_store()
+        if store is None or not store.total_length():
+            return
+
+        path, selected_filter = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export selection", "selection.csv", "CSV (*.csv);;NumPy (*.npy);;Binary (*.bin)")
+        if not path:
+            return
+
+        try:
+            exporter.export_store(store, path)
+        except (ValueError, IOError, OSError) as err:
+            self.display_error(str(err))
+
+    # Returns the port's spatial index, or None with an error if its positions can't be searched.
+    def get_spatial_grid(self):
+        from bifrost_output_reader import spatial_index
+
+        view = self.get_current_view()
+        table_model = view.table_model
+        if table_model.plug_type is None:
+            return
+
+        if table_model.plug_type not in spatial_index.position_types:
+            self.display_error("Can only search positions of the following plug types: {}".format(", ".join(spatial_index.position_types)))
+            return
+
+        if not self.is_fully_loaded(view):
+            self.display_error("Positions can only be searched once the port is fully loaded (not windowed)")
+            return
+
+        return table_model.get_spatial_grid()
+
+    def get_selected_transform_position(self):
+        transforms = cmds.ls(selection=True, type="transform")
+        if not transforms:
+            self.display_error("Select a transform to search around")
+            return
+        return cmds.xform(transforms[0], q=True, ws=True, t=True)
+
+    def on_find_nearest_clicked(self):
+        from bifrost_output_reader import spatial_index
+
+        grid = self.get_spatial_grid()
+        if grid is None:
+            return
+
+        position = self.get_selected_transform_position()
+        if position is None:
+            return
+
+        nearest = grid.nearest(position)
+        if nearest is None:
+            self.spatial_result_label.setText("No finite positions")
+            return
+
+        index, distance = nearest
+        table_model = self.get_current_view().table_model
+        cells = spatial_index.get_cells(table_model.store, [index])
+        port_cell = (cells[0][0], table_model.port_row(cells[0][1]))
+
+        if self.select_cells(cells):
+            self.spatial_result_label.setText("Nearest at {}, {} away".format(self.format_cell_indices(port_cell), distance))
+        else:
+            self.spatial_result_label.setText("Nearest at {}, {} away (hidden by the filter)".format(self.format_cell_indices(port_cell), distance))
+
+    def on_select_within_radius_clicked(self):
+        from bifrost_output_reader import spatial_index
+
+        grid = self.get_spatial_grid()
+        if grid is None:
+            return
+
+        position = self.get_selected_transform_position()
+        if position is None:
+            return
+
+        cells = spatial_index.get_cells(
+            self.get_current_view().table_model.store, grid.within_radius(position, self.radius_spinbox.value()))
+        shown = self.select_cells(cells)
+
+        text = "{} within radius".format(len(cells))
+        if shown < len(cells):
+            text += ", {} hidden by the filter".format(len(cells) - shown)
+        self.spatial_result_label.setText(text)
+
+    # Selects cells given by their source rows and scrolls to the first one, returning how many are shown.
+    def select_cells(self, cells):
+        view = self.get_current_view()
+        table_model = view.table_model
+
+        view_cells = []
+        for column, row in cells:
+            view_row = table_model.view_row(row)
+            if view_row is not None:
+                view_cells.append((column, view_row))
+
+        # Neighbouring rows of a column are merged so the selection stays a few ranges.
+        ranges = []
+        for column, row in sorted(view_cells):
+            if ranges and ranges[-1][0] == column and ranges[-1][2] == row - 1:
+                ranges[-1][2] = row
+            else:
+                ranges.append([column, row, row])
+
+        item_selection = QtCore.QItemSelection()
+        for column, first_row, last_row in ranges:
+            item_selection.append(QtCore.QItemSelectionRange(
+                table_model.index(first_row, column), table_model.index(last_row, column)))
+
+        view.selectionModel().select(item_selection, QtCore.QItemSelectionModel.ClearAndSelect)
+
+        if view_cells:
+            column, row = min(view_cells, key=lambda cell: (cell[1], cell[0]))
+            view.scrollTo(table_model.index(row, column), QtWidgets.QAbstractItemView.PositionAtCenter)
+
+        return len(view_cells)
+
     def on_go_to_clicked(self):
         row, ok = QtWidgets.QInputDialog.getInt(self, "Go to row", "Row to scroll to:")
         if not ok:
             return
 
-        self.data_view.scrollTo(
-            self.data_view.table_model.index(row, 0),
-            QtWidgets.QAbstractItemView.PositionAtCenter)
-        self.data_view.selectRow(row)
+        view = self.get_current_view()
+        table_model = view.table_model
+
+        # Previews only hold some of the rows, so this goes to the closest one that was sampled.
+        store_row = table_model.store_row(row, nearest=True)
+        if store_row is None:
+            return
+
+        if table_model.port_row(store_row) != row:
+            self.preview_label.setText("Row {} isn't part of the preview, scrolled to the closest sampled row {}".format(
+                row, table_model.port_row(store_row)))
+
+        view.prefetch_row(store_row)
+
+        # Rows are given by their index in the port, which can differ from the table's when filtering.
+        view_row = table_model.view_row(store_row)
+        if view_row is None:
+            self.display_error("Row {} is hidden by the filter".format(row))
+            return
+
+        view.scrollTo(table_model.index(view_row, 0), QtWidgets.QAbstractItemView.PositionAtCenter)
+        view.selectRow(view_row)
 
     def on_create_loc_clicked(self):
-        plug_type = self.data_view.table_model.plug_type
+        from bifrost_output_reader import locators
+        from bifrost_output_reader import selection
+
+        view = self.get_current_view()
+        plug_type = view.table_model.plug_type
         if plug_type is None:
             return
 
         valid_plug_types = ["float3", "double3", "short3", "long3", "matrix"]
-        if self.data_view.table_model.plug_type not in valid_plug_types:
+        if plug_type not in valid_plug_types:
             self.display_error("Can only create locators for the following plug types: {}".format(", ".join(valid_plug_types)))
             return
 
-        indices = self.data_view.selectedIndexes()
+        values = selection.get_values(view.get_selected_store())
 
-        locs = []
-
-        for index in indices:
-            values = self.data_view.table_model.data(index, QtCore.Qt.EditRole)
-            if values is not None:
-                loc = cmds.spaceLocator()[0]
-
-                if self.data_view.table_model.plug_type == "matrix":
-                    cmds.xform(loc, ws=True, matrix=eval(values))
-                else:
-                    cmds.xform(loc, ws=True, t=eval(values))
+        if not values:
+            return
 
-                locs.append(loc)
+        is_matrix = plug_type == "matrix"
 
-        if locs:
-            cmds.select(locs)
+        # Keeps the creation and the selection in one undo step.
+        cmds.undoInfo(openChunk=True, chunkName="bifrostOutputReaderCreateLocators")
+        try:
+            if self.particles_checkbox.isChecked():
+                if is_matrix:
+                    values = [locators.get_translation(value) for value in values]
+                cmds.select(locators.create_point_cloud(values))
+            else:
+                cmds.select(locators.create_locators(values, is_matrix))
+        finally:
+            cmds.undoInfo(closeChunk=True)
 
 
+# Reopening the tool reuses the hidden instance instead of rebuilding it.
 def launch():
     global tool
-    tool = BifrostOutputReaderTool()
+
+    start_time = time.time()
+
+    if tool is not None and utils.is_valid_widget(tool):
+        tool.restore()
+        open_kind = "warm"
+    else:
+        tool = BifrostOutputReaderTool()
+        open_kind = "cold"
+
     tool.show()
+    tool.raise_()
+    tool.activateWindow()
+
+    open_times[open_kind] = time.time() - start_time
+
+    return tool
+
+
+# Seconds the last cold (new instance) and warm (reused instance) opens took.
+def get_open_times():
+    return dict(open_times)
@@ -0,0 +1,272 @@
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+index_typecode = "q" if "q" in getattr(array, "typecodes", "") else "l"
+int64_typecode = "q" if "q" in getattr(array, "typecodes", "") else "d"
+
+# Plug type -> (array typecode, component count)
+# Types missing from here are kept as plain Python objects.
+plug_layouts = {
+    "bool": ("b", 1),
+    "char": ("b", 1),
+    "short": ("h", 1),
+    "short2": ("h", 2),
+    "short3": ("h", 3),
+    "long": ("i", 1),
+    "long2": ("i", 2),
+    "long3": ("i", 3),
+    "long long int": (int64_typecode, 1),
+    "float": ("f", 1),
+    "float2": ("f", 2),
+    "float3": ("f", 3),
+    "double": ("d", 1),
+    "double2": ("d", 2),
+    "double3": ("d", 3),
+    "matrix": ("d", 16)
+}
+
+
+# Holds a port's values with one contiguous buffer per component.
+# Every array of a 2D port is appended to the same buffers, and offsets marks where each one starts.
+class ColumnStore(object):
+
+    def __init__(self, plug_type=None):
+        self.plug_type = plug_type
+        self.typecode, self.width = plug_layouts.get(plug_type, (None, 1))
+        self.components = [self.new_buffer() for i in range(self.width)]
+        self.offsets = array.array(index_typecode, [0])
+
+    def __len__(self):
+        return self.array_count()
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.array_count()
+        if index < 0 or index >= self.array_count():
+            raise IndexError(index)
+        return ArrayView(self, index)
+
+    def new_buffer(self):
+        if self.typecode is None:
+            return []
+        return array.array(self.typecode)
+
+    def is_numeric(self):
+        return self.typecode is not None
+
+    def array_count(self):
+        return len(self.offsets) - 1
+
+    def array_length(self, index):
+        return self.offsets[index + 1] - self.offsets[index]
+
+    def max_length(self):
+        return max([self.array_length(i) for i in range(self.array_count())] or [0])
+
+    def total_length(self):
+        return self.offsets[-1]
+
+    def value(self, column, row):
+        index = self.offsets[column] + row
+
+        if self.width == 1:
+            value = self.components[0][index]
+            if self.plug_type == "bool":
+                return bool(value)
+            return value
+
+        return tuple([component[index] for component in self.components])
+
+    def component_slice(self, component, column):
+        return self.components[component][self.offsets[column]:self.offsets[column + 1]]
+
+    def reserve_array(self, count):
+        start = self.offsets[-1]
+
+        for i in range(self.width):
+            if self.typecode is None:
+                self.components[i].extend([None] * count)
+            else:
+                self.components[i].extend(array.array(self.typecode, [0]) * count)
+
+        self.offsets.append(start + count)
+        return start
+
+    def begin_array(self):
+        self.offsets.append(self.offsets[-1])
+
+    # Grows the last array with the values of another store's first array.
+    def extend_last_array(self, store):
+        for i in range(self.width):
+            self.components[i].extend(store.components[i])
+        self.offsets[-1] += store.total_length()
+
+    # Overwrites rows of an array with the values of another store's first array.
+    def write_range(self, column, start, store):
+        first = self.offsets[column] + start
+        last = first + store.total_length()
+        for i in range(self.width):
+            self.components[i][first:last] = store.components[i]
+
+    def append_values(self, values):
+        if self.width == 1:
+            self.components[0].extend(values)
+        else:
+            for i in range(self.width):
+                self.components[i].extend([value[i] for value in values])
+
+        self.offsets.append(self.offsets[-1] + len(values))
+
+    def nbytes(self):
+        if self.typecode is None:
+            return 0
+        return sum([len(component) * component.itemsize for component in self.components])
+
+    @classmethod
+    def from_values(cls, arrays, plug_type):
+        store = cls(plug_type)
+        for values in arrays:
+            store.append_values(values)
+        return store
+
+
+# Read-only sequence over one array of a store, so callers can keep indexing data[column][row].
+class ArrayView(object):
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    def __len__(self):
+        return self.store.array_length(self.index)
+
+    def __getitem__(self, row):
+        length = len(self)
+        if row < 0:
+            row += length
+        if row < 0 or row >= length:
+            raise IndexError(row)
+        return self.store.value(self.index, row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.store.value(self.index, row)
+
+
+# Returns a function turning the store's values into text.
+# Floating point values can be formatted with a fixed precision, which is faster than repr.
+def get_formatter(store, precision=None):
+    if precision is None or store.typecode not in ["f", "d"]:
+        return str
+
+    value_format = "%.{}f".format(precision)
+
+    if store.width == 1:
+        return value_format.__mod__
+
+    return ("(" + ", ".join([value_format] * store.width) + ")").__mod__
+
+
+def buffer_bytes(buffer):
+    if hasattr(buffer, "tobytes"):
+        return buffer.tobytes()
+    return buffer.tostring()
+
+
+# Compares an array of two stores chunk by chunk, up to the shorter of the two,
+# and returns the [start, end) row ranges that differ, merging neighbouring chunks.
+# Numeric values are compared bitwise so NaNs that didn't change don't count as changes.
+def find_changed_ranges(old_store, new_store, column, chunk_size=4096):
+    length = min(old_store.array_length(column), new_store.array_length(column))
+    old_start = old_store.offsets[column]
+    new_start = new_store.offsets[column]
+
+    if numpy is not None and old_store.is_numeric() and length:
+        chunk_flags = find_changed_chunks_numpy(old_store, new_store, old_start, new_start, length, chunk_size)
+    else:
+        chunk_flags = []
+        for start in range(0, length, chunk_size):
+            end = min(start + chunk_size, length)
+            chunk_flags.append(any([
+                chunk_differs(old_component, new_component, old_start + start, new_start + start, end - start)
+                for old_component, new_component in zip(old_store.components, new_store.components)]))
+
+    ranges = []
+
+    for chunk_index, changed in enumerate(chunk_flags):
+        if not changed:
+            continue
+
+        start = chunk_index * chunk_size
+        end = min(start + chunk_size, length)
+
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+
+    return ranges
+
+
+def chunk_differs(old_component, new_component, old_start, new_start, count):
+    old_values = old_component[old_start:old_start + count]
+    new_values = new_component[new_start:new_start + count]
+
+    if isinstance(old_values, list):
+        return old_values != new_values
+
+    return buffer_bytes(old_values) != buffer_bytes(new_values)
+
+
+def find_changed_chunks_numpy(old_store, new_store, old_start, new_start, length, chunk_size):
+    changed = numpy.zeros(length, dtype=bool)
+
+    for old_component, new_component in zip(old_store.components, new_store.components):
+        dtype = "u{}".format(old_component.itemsize)
+        old_values = numpy.frombuffer(old_component, dtype=dtype)[old_start:old_start + length]
+        new_values = numpy.frombuffer(new_component, dtype=dtype)[new_start:new_start + length]
+        changed |= old_values != new_values
+
+    padded = numpy.zeros(-(-length // chunk_size) * chunk_size, dtype=bool)
+    padded[:length] = changed
+
+    return padded.reshape(-1, chunk_size).any(axis=1).tolist()
+
+
+# Returns the parts of rows first to last (excluded) that aren't covered by sorted, non-overlapping spans.
+def subtract_spans(spans, first, last):
+    missing = []
+
+    for span_first, span_last in spans:
+        if span_last <= first:
+            continue
+        if span_first >= last:
+            break
+        if span_first > first:
+            missing.append((first, span_first))
+        first = max(first, span_last)
+
+    if first < last:
+        missing.append((first, last))
+
+    return missing
+
+
+# Adds a span of rows to sorted, non-overlapping spans, merging the ones it touches.
+def merge_span(spans, first, last):
+    merged = []
+
+    for span_first, span_last in spans:
+        if span_last < first or span_first > last:
+            merged.append((span_first, span_last))
+        else:
+            first = min(first, span_first)
+            last = max(last, span_last)
+
+    merged.append((first, last))
+    return sorted(merged)
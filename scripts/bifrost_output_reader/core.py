@@ -0,0 +1,264 @@
+import maya.cmds as cmds
+
+from bifrost_output_reader import port_stats
+from bifrost_output_reader import schema_cache
+from bifrost_output_reader import evaluation
+
+try:
+    from bifrost_output_reader import openmaya_reader
+except ImportError:
+    openmaya_reader = None
+
+
+array_types = [
+    "TdataCompound",
+    "float2",
+    "float3",
+    "double2",
+    "double3",
+    "long2",
+    "long3",
+    "short2",
+    "short3"]
+
+# Types that can be fetched with a single range query on their multi plug.
+bulk_read_types = [
+    "bool",
+    "char",
+    "short",
+    "short2",
+    "short3",
+    "long",
+    "long2",
+    "long3",
+    "long long int",
+    "float",
+    "float2",
+    "float3",
+    "double",
+    "double2",
+    "double3"]
+
+bulk_read_chunk_size = 100000
+
+backends = ["openmaya", "cmds"]
+
+
+def get_ports_from_bf_graph(bf_graph):
+    cached_ports = schema_cache.cache.get_ports(bf_graph)
+    if cached_ports is not None:
+        return list(cached_ports)
+
+    invalid_attrs = ["message", "mesh", "dirtyFlag"]
+    invalid_attr_types = ["bifData"]
+    attrs = cmds.listAttr(bf_graph, hasData=True, userDefined=True, readOnly=True) or []
+
+    ports = []
+
+    for attr in sorted(attrs):
+        if attr in invalid_attrs or "." in attr:
+            continue
+
+        if cmds.attributeQuery(attr, node=bf_graph, listParent=True):
+            continue
+
+        if cmds.getAttr("{}.{}".format(bf_graph, attr), type=True) in invalid_attr_types:
+            continue
+
+        ports.append(attr)
+
+    schema_cache.cache.set_ports(bf_graph, ports)
+
+    return ports
+
+
+# Returns the port's cached schema, discovering it on the first call.
+# Returns None if the port doesn't exist.
+def get_port_schema(bf_graph, plug_name):
+    schema = schema_cache.cache.get_schema(bf_graph, plug_name)
+    if schema is not None:
+        return schema
+
+    if not cmds.attributeQuery(plug_name, node=bf_graph, exists=True):
+        return
+
+    plug = "{}.{}".format(bf_graph, plug_name)
+    evaluation.counter.check(plug)
+    attr_type = cmds.getAttr(plug, type=True)
+
+    # Determine if it's a 2D array.
+    sub_multi_plug = None
+    for sub_plug in cmds.listAttr(plug)[1:]:
+        sub_plug_name = sub_plug.split(".")[-1]
+        if cmds.attributeQuery(sub_plug_name, node=bf_graph, multi=True):
+            sub_multi_plug = sub_plug_name
+            break
+
+    is_multi_plug = cmds.attributeQuery(plug_name, node=bf_graph, multi=True)
+
+    schema = schema_cache.PortSchema(attr_type, is_multi_plug, sub_multi_plug)
+    if not is_multi_plug and not sub_multi_plug:
+        schema.element_type = attr_type
+
+    schema_cache.cache.set_schema(bf_graph, plug_name, schema)
+
+    return schema
+
+
+def get_default_backend():
+    if openmaya_reader is not None:
+        return "openmaya"
+    return "cmds"
+
+
+# With preview, only an evenly spread sample of rows is kept if the port is large, while the stats
+# are still computed exactly by streaming over every row. "sampleRows" then holds the port row
+# of each row that was kept.
+def extract_data_from_port(bf_graph, plug_name, backend=None, preview=False):
+    evaluation.counter.begin_refresh()
+
+    result = None
+    if preview:
+        result = read_port_preview(bf_graph, plug_name, backend)
+    if result is None:
+        result = read_port_data(bf_graph, plug_name, backend)
+
+    evaluations = evaluation.counter.end_refresh()
+
+    if result is not None:
+        result["evaluations"] = evaluations
+
+    return result
+
+
+# Reads the whole port through a port source, the same reader the tool streams ports with.
+# Opening the source is what evaluates the graph, the reads after it find the plugs clean.
+def read_port_data(bf_graph, plug_name, backend=None):
+    from bifrost_output_reader import port_source
+
+    source = port_source.open_port_source(bf_graph, plug_name, backend=backend)
+    if source is None:
+        return
+
+    data = port_source.read_all(source)
+
+    data_length = 0
+    if data.array_count():
+        data_length = data.array_length(0)
+
+    stats = port_stats.compute_stats(data)
+
+    return {
+        "data": data,
+        "plugType": data.plug_type,
+        "dataLength": data_length,
+        "minValue": stats["minValue"],
+        "maxValue": stats["maxValue"],
+        "stats": stats,
+        "sampleRows": None
+    }
+
+
+# Returns None if the port can't be read in ranges or is small enough to be read whole.
+def read_port_preview(bf_graph, plug_name, backend=None):
+    from bifrost_output_reader import port_source
+
+    source = port_source.open_port_source(bf_graph, plug_name, backend=backend)
+    if source is None:
+        return
+
+    rows = port_source.get_preview_rows(max(source.sizes or [0]))
+    if rows is None:
+        return
+
+    data = port_source.read_preview(source, rows)
+
+    stats = port_source.read_all(source, port_stats.StreamingStats(source.plug_type)).get_stats()
+
+    return {
+        "data": data,
+        "plugType": data.plug_type,
+        "dataLength": source.sizes[0] if source.sizes else 0,
+        "minValue": stats["minValue"],
+        "maxValue": stats["maxValue"],
+        "stats": stats,
+        "sampleRows": rows
+    }
+
+
+# Returns the multi plugs holding the port's arrays, one per array for 2D arrays.
+# Returns None if the port holds a single value.
+def get_port_sub_plugs(bf_graph, plug_name):
+    plug = "{}.{}".format(bf_graph, plug_name)
+    schema = get_port_schema(bf_graph, plug_name)
+
+    if schema.sub_multi_plug:
+        array_size = cmds.getAttr(plug, size=True)
+        return [
+            "{}[{}].{}".format(plug, index, schema.sub_multi_plug)
+            for index in range(array_size)]
+
+    if schema.is_multi:
+        return [plug]
+
+
+def read_plug_range(plug, start, end, plug_type):
+    if plug_type in bulk_read_types:
+        values = read_plug_range_bulk(plug, start, end, plug_type)
+        if values is not None:
+            return values
+
+    return [
+        serialize_data(cmds.getAttr("{}[{}]".format(plug, index)), plug_type)
+        for index in range(start, end)]
+
+
+# Reads a range of a multi plug with one query instead of one query per element.
+# Returns None when the plug can't be read this way so the caller can fall back.
+def read_plug_range_bulk(plug, start, end, plug_type):
+    try:
+        values = cmds.getAttr("{}[{}:{}]".format(plug, start, end - 1))
+    except (RuntimeError, ValueError):
+        return
+
+    return normalize_bulk_values(values, end - start, plug_type)
+
+
+# Turns the result of a query over many elements into one value per element.
+# Returns None if the result doesn't hold the expected number of elements.
+def normalize_bulk_values(values, count, plug_type):
+    width = get_type_width(plug_type)
+
+    if type(values) != list:
+        values = [values]
+
+    if len(values) == count:
+        if width > 1 and count:
+            if type(values[0]) not in (list, tuple):
+                return
+            values = [tuple(value) for value in values]
+    elif width > 1 and len(values) == count * width:
+        # Compounds can come back flattened, so re-group them per element.
+        values = list(zip(*[iter(values)] * width))
+    else:
+        return
+
+    return values
+
+
+def get_type_width(plug_type):
+    if plug_type in array_types and plug_type[-1].isdigit():
+        return int(plug_type[-1])
+    return 1
+
+
+def serialize_data(data, data_type):
+    if data_type in array_types:
+        value = data[0]
+    else:
+        value = data
+
+    if type(value) == list:
+        value = tuple(value)
+
+    return value
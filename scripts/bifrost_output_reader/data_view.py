@@ -1,8 +1,19 @@
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
 from PySide2 import QtGui
 from PySide2 import QtCore
 from PySide2 import QtWidgets
 
 from bifrost_output_reader import utils
+from bifrost_output_reader import port_source
+from bifrost_output_reader import port_stats
+from bifrost_output_reader import column_store
+from bifrost_output_reader import load_scheduler
+from bifrost_output_reader import evaluation
+from bifrost_output_reader import sorting
+from bifrost_output_reader import selection
+from bifrost_output_reader import spatial_index
 
 
 class DataView(QtWidgets.QTableView):
@@ -15,10 +26,27 @@ class DataView(QtWidgets.QTableView):
         self.setShowGrid(True)
         self.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         self.verticalHeader().setDefaultSectionSize(25)
+        self.exact_column_sizing = False
+        self.column_sample_size = 50
+
+        self.table_model.load_finished.connect(self.on_load_finished)
+
+        # Scrolling only reads the stale rows once it settles.
+        self.scroll_timer = QtCore.QTimer(self)
+        self.scroll_timer.setSingleShot(True)
+        self.scroll_timer.setInterval(100)
+        self.scroll_timer.timeout.connect(self.refresh_stale_rows)
+
+        self.verticalScrollBar().valueChanged.connect(self.on_scrolled)
+        self.horizontalScrollBar().valueChanged.connect(self.on_scrolled)
 
     def paintEvent(self, paint_event):
         if self.model().rowCount(self.rootIndex()) == 0:
-            if len(self.table_model.values) > 0:
+            if self.table_model.is_loading():
+                msg = "Loading..."
+            elif self.table_model.row_map is not None:
+                msg = "No rows match the filter"
+            elif self.table_model.columns > 0:
                 msg = "This port has empty data"
             else:
                 msg = "<- Load ports from selected Bifrost graph"
@@ -40,14 +68,124 @@ class DataView(QtWidgets.QTableView):
 
         QtWidgets.QTableView.paintEvent(self, paint_event)
 
+    def keyPressEvent(self, event):
+        if event.matches(QtGui.QKeySequence.Copy):
+            self.copy_selection()
+            return
+
+        QtWidgets.QTableView.keyPressEvent(self, event)
+
+    def get_selection_spans(self):
+        return selection.get_spans(self.selectionModel().selection())
+
+    # Returns the selected cells' values as a new store, or None if nothing is shown.
+    def get_selected_store(self):
+        if self.table_model.store is None:
+            return
+        return selection.get_selected_store(self.table_model.store, self.table_model.row_map, self.get_selection_spans())
+
+    def copy_selection(self):
+        if self.table_model.store is None:
+            return
+
+        text = selection.get_text(
+            self.table_model.store, self.table_model.row_map, self.get_selection_spans(), self.table_model.formatter)
+        QtWidgets.QApplication.clipboard().setText(text)
+
     def clear_data(self):
         self.table_model.clear_data()
 
-    def fill_data(self, bf_graph, plug_name):
-        self.table_model.get_data(bf_graph, plug_name)
+    # Refreshes keep the current widths, on_load_finished resizes the columns if the values changed.
+    def fill_data(self, bf_graph, plug_name, backend=None, windowed=False, preview=False):
+        if not self.table_model.get_data(bf_graph, plug_name, backend, windowed, preview):
+            self.resize_columns()
+
+    def on_load_finished(self, changed):
+        if changed:
+            self.resize_columns()
+
+    def get_visible_range(self):
+        viewport = self.viewport().rect()
+
+        first_row = max(self.rowAt(viewport.top()), 0)
+        last_row = self.rowAt(viewport.bottom())
+        if last_row == -1:
+            last_row = self.table_model.rowCount() - 1
+
+        first_column = max(self.columnAt(viewport.left()), 0)
+        last_column = self.columnAt(viewport.right())
+        if last_column == -1:
+            last_column = self.table_model.columns - 1
+
+        return first_row, last_row, first_column, last_column
+
+    # Only reads the row in the arrays that are in view, the others get read if they're scrolled to.
+    def prefetch_row(self, row):
+        first_row, last_row, first_column, last_column = self.get_visible_range()
+        self.table_model.prefetch_row(row, first_column, last_column)
+
+    def refresh_visible_rows(self):
+        return self.table_model.refresh_range(*self.get_visible_range())
+
+    # Cells a live refresh skipped are read again once they're scrolled into view.
+    def on_scrolled(self, value):
+        if self.table_model.is_stale():
+            self.scroll_timer.start()
+
+    def refresh_stale_rows(self):
+        if self.table_model.is_stale():
+            self.table_model.refresh_range(*self.get_visible_range(), stale_only=True)
+
+    def resize_columns(self):
+        if self.exact_column_sizing:
+            for i in range(self.table_model.columns):
+                self.resizeColumnToContents(i)
+            return
+
+        if isinstance(self.table_model.store, port_source.WindowedStore):
+            self.resize_windowed_columns()
+            return
+
+        for i in range(self.table_model.columns):
+            self.setColumnWidth(i, self.estimate_column_width(i))
+
+    # Sampling rows of every column would read a chunk of each from the port, so only the cells in view,
+    # which get read to be shown anyway, are measured. Columns out of view get the widest of their widths.
+    def resize_windowed_columns(self):
+        first_row, last_row, first_column, last_column = self.get_visible_range()
+        rows = range(first_row, min(last_row + 1, first_row + self.column_sample_size))
+
+        widths = {}
+        for column in range(first_column, min(last_column + 1, self.table_model.columns)):
+            widths[column] = self.estimate_column_width(column, rows)
 
-        for i in range(len(self.table_model.values)):
-            self.resizeColumnToContents(i)
+        value_width = max(widths.values() or [0])
+
+        for i in range(self.table_model.columns):
+            self.setColumnWidth(i, widths.get(i, max(value_width, self.get_header_width(i))))
+
+    def get_cell_margin(self):
+        return (self.style().pixelMetric(QtWidgets.QStyle.PM_FocusFrameHMargin, None, self) + 1) * 2
+
+    def get_header_width(self, column):
+        header_text = self.table_model.headerData(column, QtCore.Qt.Horizontal, QtCore.Qt.DisplayRole)
+        return self.horizontalHeader().fontMetrics().width(header_text) + self.get_cell_margin() * 4
+
+    # Measures a bounded sample of rows instead of every row like resizeColumnToContents does.
+    def estimate_column_width(self, column, rows=None):
+        metrics = self.fontMetrics()
+        margin = self.get_cell_margin()
+        width = self.get_header_width(column)
+
+        if rows is None:
+            rows = self.table_model.get_sample_rows(column, self.column_sample_size)
+
+        for row in rows:
+            text = self.table_model.data(self.table_model.index(row, column), QtCore.Qt.DisplayRole)
+            if text is not None:
+                width = max(width, metrics.width(text) + margin)
+
+        return width
 
 
 class DataModel(QtCore.QAbstractTableModel):
@@ -56,20 +194,58 @@ class DataModel(QtCore.QAbstractTableModel):
     length_updated = QtCore.Signal(int)
     min_value_updated = QtCore.Signal(str)
     max_value_updated = QtCore.Signal(str)
+    stats_updated = QtCore.Signal(dict)
+    load_progress = QtCore.Signal(int, int, float)
+    load_finished = QtCore.Signal(bool)
+    load_failed = QtCore.Signal(str)
+    evaluations_updated = QtCore.Signal(int)
+    values_appended = QtCore.Signal()
+    stale_changed = QtCore.Signal(bool)
 
     def __init__(self, parent=None):
         super(DataModel, self).__init__(parent)
-        self.values = []
+        self.store = None
+        self.pending_store = None
+        self.source = None
+        self.port = None
         self.rows = 0
         self.columns = 0
+        self.row_map = None
+        self.row_map_ordered = True
+        self.row_lookup = None
+        self.sort_cache = {}
+        self.spatial_grid = None
+        self.sample_rows = None
+        self.stats_sink = None
+        self.fresh_spans = None
         self.plug_type = None
+        self.chunk_size = 2000
+        self.max_chunks = 64
+        self.precision = None
+        self.formatter = str
+        self.max_cached_cells = 50000
+        self.cell_cache = OrderedDict()
+        self.fg_brush = None
+        self.stats = {}
+        self.diff_mask = None
+        self.diff_brush = QtGui.QBrush(QtGui.QColor(120, 45, 45))
+
+        self.loader = load_scheduler.PortLoader(parent=self)
+        self.loader.chunks_loaded.connect(self.on_chunks_loaded)
+        self.loader.progress_updated.connect(self.load_progress)
+        self.loader.finished.connect(self.on_load_finished)
+        self.loader.failed.connect(self.on_load_failed)
 
         temp_widget = QtWidgets.QWidget()
         self.bg_color = temp_widget.palette().color(QtGui.QPalette.Active, QtGui.QPalette.Base)
         self.bg_alt_color = self.bg_color.lighter(115)
+        self.bg_brush = QtGui.QBrush(self.bg_color)
+        self.bg_alt_brush = QtGui.QBrush(self.bg_alt_color)
         temp_widget.deleteLater()
 
-    def rowCount(self, parent):
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if self.row_map is not None:
+            return len(self.row_map)
         return self.rows
 
     def columnCount(self, parent):
@@ -79,35 +255,63 @@ class DataModel(QtCore.QAbstractTableModel):
         if not index.isValid():
             return
 
-        row = index.row()
+        view_row = index.row()
+        row = self.source_row(view_row)
         column = index.column()
 
-        if role == QtCore.Qt.DisplayRole:
-            if column < len(self.values) and row < len(self.values[column]):
-                return "  {}  ".format(self.values[column][row])
-        elif role == QtCore.Qt.EditRole:
-            if column < len(self.values) and row < len(self.values[column]):
-                return str(self.values[column][row])
+        if role == QtCore.Qt.DisplayRole or role == QtCore.Qt.EditRole:
+            texts = self.cell_cache.get((column, row))
+
+            if texts is None:
+                if not self.has_value(column, row):
+                    return
+                texts = self.cache_cell(column, row)
+
+            if role == QtCore.Qt.DisplayRole:
+                return texts[1]
+            return texts[0]
         elif role == QtCore.Qt.ToolTipRole:
-            if column < len(self.values) and row < len(self.values[column]):
-                return str(self.values[column][row])
+            if self.has_value(column, row):
+                return str(self.store.value(column, row))
         elif role == QtCore.Qt.TextAlignmentRole:
             return QtCore.Qt.AlignVCenter
         elif role == QtCore.Qt.BackgroundColorRole:
-            if row % 2 == 0:
-                return self.bg_color
+            if self.diff_mask is not None and self.is_diff_cell(column, row):
+                return self.diff_brush
+            elif view_row % 2 == 0:
+                return self.bg_brush
             else:
-                return self.bg_alt_color
+                return self.bg_alt_brush
         elif role == QtCore.Qt.ForegroundRole:
-            if utils.plug_colors.get(self.plug_type):
-                return utils.plug_colors[self.plug_type]
+            return self.fg_brush
 
         return
 
+    # Keeps the cell's text and its padded display text, dropping the oldest entries once full.
+    def cache_cell(self, column, row):
+        text = self.formatter(self.store.value(column, row))
+        texts = (text, "  {}  ".format(text))
+
+        self.cell_cache[(column, row)] = texts
+        if len(self.cell_cache) > self.max_cached_cells:
+            self.cell_cache.popitem(last=False)
+
+        return texts
+
+    def set_precision(self, precision):
+        self.layoutAboutToBeChanged.emit()
+
+        self.precision = precision
+        if self.store is not None:
+            self.formatter = column_store.get_formatter(self.store, precision)
+        self.cell_cache.clear()
+
+        self.layoutChanged.emit()
+
     def headerData(self, index, orientation, role):
         if role == QtCore.Qt.DisplayRole:
             if orientation == QtCore.Qt.Vertical:
-                return index
+                return self.port_row(self.source_row(index))
             else:
                 return "Array {}".format(index)
         elif role == QtCore.Qt.TextAlignmentRole:
@@ -120,11 +324,159 @@ class DataModel(QtCore.QAbstractTableModel):
         flags = super(DataModel, self).flags(index)
         return flags | QtCore.Qt.ItemIsEditable
 
+    def has_value(self, column, row):
+        return column < self.columns and row < self.store.array_length(column)
+
+    # Flags the cells to highlight as different, from a mask over every element of the store.
+    def set_diff_mask(self, mask):
+        self.diff_mask = mask
+        if self.rowCount() and self.columns:
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, self.columns - 1))
+
+    def is_diff_cell(self, column, row):
+        if not self.has_value(column, row):
+            return False
+        index = self.store.offsets[column] + row
+        return index < len(self.diff_mask) and bool(self.diff_mask[index])
+
+    def get_value(self, index):
+        if not index.isValid():
+            return
+
+        row = self.source_row(index.row())
+        if not self.has_value(index.column(), row):
+            return
+        return self.store.value(index.column(), row)
+
+    # Only shows the given source rows, in the given order. None shows every row.
+    # Rows that aren't in increasing order, like sorted ones, need a lookup to go back to view rows.
+    def set_row_map(self, row_map, ordered=True):
+        self.layoutAboutToBeChanged.emit()
+        self.row_map = row_map
+        self.row_map_ordered = ordered
+        self.row_lookup = None
+        self.layoutChanged.emit()
+
+    # Returns the rows of an array sorted by a key, computing them once until the values change.
+    def get_sort_permutation(self, column, key, descending=False):
+        permutation = self.sort_cache.get((column, key, descending))
+        if permutation is None:
+            permutation = sorting.compute_permutation(self.store, column, key, descending)
+            self.sort_cache[(column, key, descending)] = permutation
+        return permutation
+
+    # Returns the spatial index of the positions, building it once until the values change.
+    def get_spatial_grid(self):
+        if self.spatial_grid is None:
+            self.spatial_grid = spatial_index.SpatialGrid(self.store)
+        return self.spatial_grid
+
+    def source_row(self, row):
+        if self.row_map is None:
+            return row
+        return int(self.row_map[row])
+
+    # Previews only hold a sample of the port's rows, these map them to the port's rows and back.
+    def port_row(self, row):
+        if self.sample_rows is None:
+            return row
+        return self.sample_rows[row]
+
+    # Returns None if the port row isn't part of the preview, or the closest row that is with nearest.
+    def store_row(self, port_row, nearest=False):
+        if self.sample_rows is None:
+            return port_row
+
+        index = bisect_left(self.sample_rows, port_row)
+        if index < len(self.sample_rows) and self.sample_rows[index] == port_row:
+            return index
+
+        if not nearest or not self.sample_rows:
+            return
+
+        if index == len(self.sample_rows) or (index > 0 and port_row - self.sample_rows[index - 1] < self.sample_rows[index] - port_row):
+            index -= 1
+        return index
+
+    # Returns the row showing a source row, or None if it's filtered out.
+    def view_row(self, source_row):
+        if self.row_map is None:
+            return source_row
+
+        if not self.row_map_ordered:
+            if self.row_lookup is None:
+                self.row_lookup = sorting.invert(self.row_map, self.rows)
+
+            if source_row < 0 or source_row >= len(self.row_lookup) or self.row_lookup[source_row] < 0:
+                return
+            return int(self.row_lookup[source_row])
+
+        index = bisect_left(self.row_map, source_row)
+        if index < len(self.row_map) and self.row_map[index] == source_row:
+            return index
+
+    # The first and last rows, along with the rows the stats flagged as extremes.
+    def get_sample_rows(self, column, count):
+        if column >= self.columns:
+            return []
+
+        if self.row_map is not None:
+            return list(range(min(count, len(self.row_map))))
+
+        length = self.store.array_length(column)
+        rows = set(range(min(count, length)))
+
+        if not isinstance(self.store, port_source.WindowedStore):
+            rows.update(range(max(length - count, 0), length))
+
+        for key in ["argMin", "argMax", "argLongest"]:
+            cells = self.stats.get(key)
+            if cells is None:
+                continue
+
+            if cells[0] is not None and type(cells[0]) != tuple:
+                cells = [cells]
+
+            for cell in cells:
+                if cell is not None and cell[0] == column:
+                    rows.add(cell[1])
+
+        return sorted(rows)
+
+    def prefetch_row(self, row, first_column=0, last_column=None):
+        if isinstance(self.store, port_source.WindowedStore):
+            self.store.prefetch(row, first_column, last_column)
+
+    def is_loading(self):
+        return self.loader.is_running()
+
+    # Previews' rows are all in once they're shown, the loader only streams the port through the stats.
+    def is_store_loading(self):
+        return self.is_loading() and self.sample_rows is None
+
+    def cancel_loading(self):
+        self.loader.cancel()
+        self.pending_store = None
+
     def clear_data(self, emit_signals=True):
+        self.cancel_loading()
+
         if emit_signals:
             self.layoutAboutToBeChanged.emit()
 
-        self.values = []
+        self.store = None
+        self.source = None
+        self.port = None
+        self.sample_rows = None
+        self.stats_sink = None
+        self.cell_cache.clear()
+        self.fg_brush = None
+        self.stats = {}
+        self.diff_mask = None
+        self.row_map = None
+        self.sort_cache = {}
+        self.spatial_grid = None
+        self.set_fresh_spans(None)
         self.columns = 0
         self.rows = 0
         self.plug_type = None
@@ -132,28 +484,312 @@ class DataModel(QtCore.QAbstractTableModel):
         self.length_updated.emit(0)
         self.min_value_updated.emit("0")
         self.max_value_updated.emit("0")
+        self.stats_updated.emit({})
 
         if emit_signals:
             self.layoutChanged.emit()
 
-    def get_data(self, bf_graph, plug_name):
+    # Returns True when the port is being refreshed, the current values being kept until the new ones are in.
+    def get_data(self, bf_graph, plug_name, backend=None, windowed=False, preview=False):
+        is_refresh = (
+            not windowed and
+            not preview and
+            self.sample_rows is None and
+            not self.is_loading() and
+            self.port == (bf_graph, plug_name) and
+            isinstance(self.store, column_store.ColumnStore))
+
+        self.cancel_loading()
+
+        evaluation.counter.begin_refresh()
+        source = port_source.open_port_source(bf_graph, plug_name, backend=backend)
+        self.source = source
+        self.port = (bf_graph, plug_name)
+
+        if is_refresh and source is not None and source.plug_type == self.plug_type:
+            # Keep showing the current data while the new one loads, then only update what changed.
+            self.pending_store = column_store.ColumnStore(source.plug_type)
+            self.loader.start(source, self.pending_store)
+            return True
+
         self.layoutAboutToBeChanged.emit()
 
-        data_dict = utils.extract_data_from_port(bf_graph, plug_name)
+        if source is None:
+            self.clear_data(emit_signals=False)
+            self.evaluations_updated.emit(evaluation.counter.end_refresh())
+        elif preview and port_source.get_preview_rows(max(source.sizes or [0])) is not None:
+            # Shows a sample of the rows right away, then streams every row through the stats only.
+            sample_rows = port_source.get_preview_rows(max(source.sizes))
+            self.set_store(port_source.read_preview(source, sample_rows), source.sizes)
+            self.sample_rows = sample_rows
+            self.stats_sink = port_stats.StreamingStats(source.plug_type)
+            self.loader.start(source, self.stats_sink)
+        elif windowed:
+            # Stats would need to read the whole port, so they're left out in windowed mode.
+            self.set_store(port_source.WindowedStore(source, self.chunk_size, self.max_chunks), source.sizes)
+            self.evaluations_updated.emit(evaluation.counter.end_refresh())
+        else:
+            # Rows get streamed in by the loader, see on_chunks_loaded.
+            self.set_store(column_store.ColumnStore(source.plug_type), source.sizes)
+            self.loader.start(source, self.store)
+
+        self.layoutChanged.emit()
+        return False
+
+    def set_store(self, store, sizes):
+        self.store = store
+        self.rows = self.store.max_length()
+        self.columns = self.store.array_count()
+        self.formatter = column_store.get_formatter(self.store, self.precision)
+        self.cell_cache.clear()
+
+        self.plug_type = self.store.plug_type
+        self.fg_brush = None
+        if utils.plug_colors.get(self.plug_type):
+            self.fg_brush = QtGui.QBrush(utils.plug_colors[self.plug_type])
+        self.plug_type_updated.emit(self.plug_type or "n/a")
+
+        if sizes:
+            self.length_updated.emit(sizes[0])
+        else:
+            self.length_updated.emit(0)
+
+        self.stats = {}
+        self.diff_mask = None
+        self.row_map = None
+        self.sort_cache = {}
+        self.spatial_grid = None
+        self.sample_rows = None
+        self.stats_sink = None
+        self.set_fresh_spans(None)
+        self.min_value_updated.emit("n/a")
+        self.max_value_updated.emit("n/a")
+        self.stats_updated.emit({})
+
+    # Re-reads a block of cells from the port, returning False if its size changed since it was
+    # loaded, in which case only a full refresh can bring it up to date.
+    # With stale_only the rows earlier refreshes already brought up to date aren't read again.
+    def refresh_range(self, first_row, last_row, first_column, last_column, stale_only=False):
+        if self.source is None:
+            # Values that didn't come from the port, like a cached frame, need a full refresh.
+            return self.port is None
+
+        if self.is_loading() or not self.rows or not self.columns:
+            return True
+
+        # Filtered rows and previews' rows can be far apart, so they're left to a full refresh.
+        if self.row_map is not None or self.sample_rows is not None:
+            return False
+
+        fresh_spans = {}
+        if stale_only and self.fresh_spans is not None:
+            fresh_spans = self.fresh_spans
+
+        reads = []
+        for column in range(first_column, min(last_column + 1, self.columns)):
+            end = min(last_row + 1, self.store.array_length(column))
+            for first, last in column_store.subtract_spans(fresh_spans.get(column, []), first_row, end):
+                reads.append((column, first, last))
+
+        if stale_only and not reads:
+            return True
+
+        evaluation.counter.begin_refresh()
+
+        if self.source.query_sizes() != self.source.sizes:
+            evaluation.counter.end_refresh()
+            return False
+
+        for column, first, last in reads:
+            self.store.write_range(column, first, self.source.read_range(column, first, last - first))
+            self.sort_cache = {}
+            self.spatial_grid = None
+
+        # Only the cells read since the port last changed are up to date. Windowed stores re-read the others
+        # when they're shown, loaded ones keep them along with their stats until they're scrolled to or fully refreshed.
+        if isinstance(self.store, port_source.WindowedStore):
+            self.store.keep_fresh(first_row, last_row, first_column, last_column)
+        else:
+            fresh_spans = dict(fresh_spans)
+            for column, first, last in reads:
+                fresh_spans[column] = column_store.merge_span(fresh_spans.get(column, []), first, last)
+            self.set_fresh_spans(fresh_spans)
+        self.cell_cache.clear()
+
+        self.evaluations_updated.emit(evaluation.counter.end_refresh())
+        self.dataChanged.emit(self.index(first_row, first_column), self.index(last_row, last_column))
+
+        return True
 
-        if data_dict:
-            self.values = data_dict["data"]
-            if self.values:
-                self.rows = max([len(v) for v in self.values])
+    def is_stale(self):
+        return self.fresh_spans is not None
 
-            self.columns = len(self.values)
+    # Sets the spans of rows of each array that are up to date after live refreshes, None when every value is.
+    # Returns whether some values were stale before.
+    def set_fresh_spans(self, fresh_spans):
+        was_stale = self.is_stale()
+        self.fresh_spans = fresh_spans
 
-            self.plug_type = data_dict["plugType"]
-            self.plug_type_updated.emit(self.plug_type)
-            self.length_updated.emit(data_dict["dataLength"])
-            self.min_value_updated.emit(str(data_dict["minValue"]))
-            self.max_value_updated.emit(str(data_dict["maxValue"]))
+        if was_stale != self.is_stale():
+            self.stale_changed.emit(self.is_stale())
+        return was_stale
+
+    def on_chunks_loaded(self):
+        if self.pending_store is not None:
+            return
+
+        columns = self.store.array_count()
+        if columns > self.columns:
+            self.beginInsertColumns(QtCore.QModelIndex(), self.columns, columns - 1)
+            self.columns = columns
+            self.endInsertColumns()
+
+        rows = self.store.max_length()
+        if rows > self.rows:
+            self.beginInsertRows(QtCore.QModelIndex(), self.rows, rows - 1)
+            self.rows = rows
+            self.endInsertRows()
+
+        self.values_appended.emit()
+
+    def on_load_finished(self):
+        if self.pending_store is not None:
+            store = self.pending_store
+            self.pending_store = None
+
+            # Stats from before live refreshes changed some values are updated even if the port is back to them.
+            was_stale = self.set_fresh_spans(None)
+            if not self.apply_store(store) and not was_stale:
+                self.evaluations_updated.emit(evaluation.counter.end_refresh())
+                self.load_finished.emit(False)
+                return
+
+        self.update_stats()
+        self.evaluations_updated.emit(evaluation.counter.end_refresh())
+        self.load_finished.emit(True)
+
+    # Keeps the rows that were read, a refresh keeps the values it was replacing.
+    def on_load_failed(self, msg):
+        self.pending_store = None
+        self.stats_sink = None
+        self.evaluations_updated.emit(evaluation.counter.end_refresh())
+        self.load_failed.emit(msg)
+
+    def update_stats(self):
+        if self.stats_sink is not None:
+            stats = self.stats_sink.get_stats()
+            self.stats_sink = None
         else:
-            self.clear_data(emit_signals=False)
+            stats = port_stats.compute_stats(self.store)
+        self.stats = stats
+        self.min_value_updated.emit(port_stats.format_stat(stats["minValue"]))
+        self.max_value_updated.emit(port_stats.format_stat(stats["maxValue"]))
+        self.stats_updated.emit(stats)
+
+    # Displays values that were already read, like a cached frame, without touching the port.
+    # The model has no source afterwards so refreshing rows won't overwrite them with the current time's values.
+    def show_store(self, bf_graph, plug_name, store):
+        self.cancel_loading()
+
+        if (self.port == (bf_graph, plug_name) and
+                self.sample_rows is None and
+                isinstance(self.store, column_store.ColumnStore) and
+                store.plug_type == self.plug_type):
+            was_stale = self.set_fresh_spans(None)
+            changed = self.apply_store(store) or was_stale
+        else:
+            self.layoutAboutToBeChanged.emit()
+            self.port = (bf_graph, plug_name)
+            self.set_store(store, [store.array_length(i) for i in range(store.array_count())])
+            self.layoutChanged.emit()
+            changed = True
 
-        self.layoutChanged.emit()
+        self.source = None
+
+        if changed:
+            self.update_stats()
+        self.load_finished.emit(changed)
+
+    # Swaps in a freshly loaded store of the same port, only signaling the cells that changed
+    # so the view keeps its scroll position and selection. Returns False if nothing changed.
+    def apply_store(self, store):
+        common_columns = min(self.columns, store.array_count())
+        changed_ranges = []
+
+        for column in range(common_columns):
+            ranges = column_store.find_changed_ranges(self.store, store, column)
+
+            # Rows that only exist in one of the stores changed as well.
+            old_length = self.store.array_length(column)
+            new_length = store.array_length(column)
+            if old_length != new_length:
+                ranges.append([min(old_length, new_length), max(old_length, new_length)])
+
+            changed_ranges.append(ranges)
+
+        sizes_changed = (
+            store.array_count() != self.columns or
+            [self.store.array_length(i) for i in range(common_columns)] != [store.array_length(i) for i in range(common_columns)])
+
+        # Nothing changed, so the row map still fits the values.
+        if not sizes_changed and not any(changed_ranges):
+            return False
+
+        # Rows are about to be signaled by their source index, callers filter the new values again.
+        if self.row_map is not None:
+            self.set_row_map(None)
+
+        self.discard_cached_cells(changed_ranges)
+
+        rows = store.max_length()
+        columns = store.array_count()
+
+        if rows < self.rows:
+            self.beginRemoveRows(QtCore.QModelIndex(), rows, self.rows - 1)
+            self.store = store
+            self.rows = rows
+            self.endRemoveRows()
+
+        if columns < self.columns:
+            self.beginRemoveColumns(QtCore.QModelIndex(), columns, self.columns - 1)
+            self.store = store
+            self.columns = columns
+            self.endRemoveColumns()
+
+        self.store = store
+        self.sort_cache = {}
+        self.spatial_grid = None
+
+        if rows > self.rows:
+            self.beginInsertRows(QtCore.QModelIndex(), self.rows, rows - 1)
+            self.rows = rows
+            self.endInsertRows()
+
+        if columns > self.columns:
+            self.beginInsertColumns(QtCore.QModelIndex(), self.columns, columns - 1)
+            self.columns = columns
+            self.endInsertColumns()
+
+        for column, ranges in enumerate(changed_ranges):
+            for start, end in ranges:
+                end = min(end, self.rows)
+                if start < end:
+                    self.dataChanged.emit(self.index(start, column), self.index(end - 1, column))
+
+        if columns:
+            self.length_updated.emit(store.array_length(0))
+
+        return True
+
+    # Drops the cached texts of the cells in the changed ranges of each column, and of every cell
+    # past them in columns that were added or removed. The other cells keep theirs.
+    def discard_cached_cells(self, changed_ranges):
+        starts = [[start for start, end in ranges] for ranges in changed_ranges]
+
+        for column, row in list(self.cell_cache):
+            if column < len(changed_ranges):
+                index = bisect_right(starts[column], row) - 1
+                if index < 0 or row >= changed_ranges[column][index][1]:
+                    continue
+
+            del self.cell_cache[(column, row)]
@@ -0,0 +1,32 @@
+import maya.cmds as cmds
+
+
+# Counts how many times reading ports made Maya evaluate them.
+# A query on a dirty plug pulls it, so checking the plug right before a query
+# tells whether that query is the one evaluating the graph.
+class EvaluationCounter(object):
+
+    def __init__(self):
+        self.total = 0
+        self.refresh_count = 0
+        self.last_refresh_count = 0
+
+    def begin_refresh(self):
+        self.refresh_count = 0
+
+    def end_refresh(self):
+        self.last_refresh_count = self.refresh_count
+        return self.last_refresh_count
+
+    def check(self, plug):
+        try:
+            dirty = cmds.isDirty(plug)
+        except RuntimeError:
+            return
+
+        if dirty:
+            self.refresh_count += 1
+            self.total += 1
+
+
+counter = EvaluationCounter()
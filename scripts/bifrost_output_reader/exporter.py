@@ -0,0 +1,293 @@
+import os
+import sys
+import csv
+import json
+import array
+import struct
+
+from bifrost_output_reader import port_source
+from bifrost_output_reader import column_store
+
+
+formats = ["csv", "npy", "bin"]
+
+export_chunk_size = 50000
+
+binary_magic = b"BFORDATA"
+binary_version = 1
+
+component_names = ["x", "y", "z", "w"]
+
+
+# Typecode -> NumPy dtype kind
+dtype_kinds = {
+    "b": "i",
+    "h": "i",
+    "i": "i",
+    "l": "i",
+    "q": "i",
+    "f": "f",
+    "d": "f"
+}
+
+
+def get_format(path):
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if extension in formats:
+        return extension
+    raise ValueError("Unsupported export format: {}".format(path))
+
+
+def get_port_file_name(bf_graph, plug_name, export_format):
+    return "{}_{}.{}".format(bf_graph.replace("|", "_").replace(":", "_"), plug_name, export_format)
+
+
+def get_component_names(plug_type, width):
+    if plug_type == "matrix":
+        return ["m{}{}".format(row, column) for row in range(4) for column in range(4)]
+    if width == 1:
+        return ["value"]
+    return component_names[:width]
+
+
+# Yields the port's values one chunk at a time as (column, start, ColumnStore) so
+# nothing but the current chunk is ever held in memory.
+def iter_port_chunks(source, chunk_size=export_chunk_size):
+    for column, size in enumerate(source.sizes):
+        for start in range(0, size, chunk_size):
+            yield column, start, source.read_range(column, start, min(chunk_size, size - start))
+
+
+# Writes one port to a file, the format being picked from the path's extension.
+# Returns the number of elements that were written, or None if the port couldn't be read.
+def export_port(bf_graph, plug_name, path, backend=None, chunk_size=export_chunk_size, progress=None):
+    export_format = get_format(path)
+
+    source = port_source.open_port_source(bf_graph, plug_name, backend=backend)
+    if source is None:
+        return
+
+    return write_source(source, path, export_format, chunk_size, progress)
+
+
+# Writes values that are already in memory, like a selection of cells, the same way as a port.
+def export_store(store, path, chunk_size=export_chunk_size, progress=None):
+    return write_source(port_source.StoreSource(store), path, get_format(path), chunk_size, progress)
+
+
+def write_source(source, path, export_format, chunk_size=export_chunk_size, progress=None):
+    if export_format == "csv":
+        write_csv(source, path, chunk_size, progress)
+    elif export_format == "npy":
+        write_npy(source, path, chunk_size, progress)
+    else:
+        write_binary(source, path, chunk_size, progress)
+
+    return sum(source.sizes)
+
+
+# Writes each port into its own file in the directory, returning the paths that were written.
+def export_ports(bf_graph, plug_names, directory, export_format="npy", backend=None, chunk_size=export_chunk_size, progress=None):
+    paths = []
+
+    for plug_name in plug_names:
+        path = os.path.join(directory, get_port_file_name(bf_graph, plug_name, export_format))
+        if export_port(bf_graph, plug_name, path, backend, chunk_size, progress) is not None:
+            paths.append(path)
+
+    return paths
+
+
+def write_csv(source, path, chunk_size=export_chunk_size, progress=None):
+    layout_typecode, width = column_store.plug_layouts.get(source.plug_type, (None, 1))
+    total = sum(source.sizes)
+    done = 0
+
+    if sys.version_info[0] < 3:
+        csv_file = open(path, "wb")
+    else:
+        csv_file = open(path, "w", newline="")
+
+    with csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(["array", "index"] + get_component_names(source.plug_type, width))
+
+        for column, start, store in iter_port_chunks(source, chunk_size):
+            count = store.total_length()
+            indices = range(start, start + count)
+            components = store.components
+
+            if store.plug_type == "bool":
+                components = [[bool(value) for value in component] for component in components]
+
+            writer.writerows(zip([column] * count, indices, *components))
+
+            done += count
+            if progress is not None:
+                progress(done, total)
+
+
+def get_dtype_descr(typecode, plug_type):
+    if plug_type == "bool":
+        return "|b1"
+
+    itemsize = array.array(typecode).itemsize
+    if itemsize == 1:
+        return "|{}1".format(dtype_kinds[typecode])
+
+    byte_order = "<" if sys.byteorder == "little" else ">"
+    return "{}{}{}".format(byte_order, dtype_kinds[typecode], itemsize)
+
+
+def get_numeric_layout(source):
+    typecode, width = column_store.plug_layouts.get(source.plug_type, (None, 1))
+    if typecode is None:
+        raise ValueError("Type {} can only be exported to csv".format(source.plug_type))
+    return typecode, width
+
+
+# Builds a version 1.0 .npy header so the file can be written without NumPy.
+def get_npy_header(descr, shape):
+    if len(shape) == 1:
+        shape_text = "({},)".format(shape[0])
+    else:
+        shape_text = "({})".format(", ".join([str(size) for size in shape]))
+
+    header = "{{'descr': '{}', 'fortran_order': False, 'shape': {}, }}".format(descr, shape_text)
+
+    # The magic string, version and header length take 10 bytes, and the whole header must
+    # end with a newline on a 64 byte boundary.
+    padding = 64 - (10 + len(header) + 1) % 64
+    header = header + " " * (padding % 64) + "\n"
+
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+# Interleaves a chunk's component buffers into one row-major buffer.
+def interleave(store):
+    if store.width == 1:
+        return store.components[0]
+
+    count = store.total_length()
+    values = array.array(store.typecode, [0]) * (count * store.width)
+
+    for i, component in enumerate(store.components):
+        values[i::store.width] = component
+
+    return values
+
+
+# Every element of every array is written in one (elements, components) array.
+# 2D ports also get an .offsets.npy file next to it with where each array starts.
+def write_npy(source, path, chunk_size=export_chunk_size, progress=None):
+    typecode, width = get_numeric_layout(source)
+    total = sum(source.sizes)
+    done = 0
+
+    shape = (total,) if width == 1 else (total, width)
+    if source.plug_type == "matrix":
+        shape = (total, 4, 4)
+
+    with open(path, "wb") as npy_file:
+        npy_file.write(get_npy_header(get_dtype_descr(typecode, source.plug_type), shape))
+
+        for column, start, store in iter_port_chunks(source, chunk_size):
+            interleave(store).tofile(npy_file)
+
+            done += store.total_length()
+            if progress is not None:
+                progress(done, total)
+
+    if len(source.sizes) > 1:
+        offsets = get_offsets(source.sizes)
+        offsets_path = os.path.splitext(path)[0] + ".offsets.npy"
+
+        with open(offsets_path, "wb") as offsets_file:
+            offsets_file.write(get_npy_header(get_dtype_descr(offsets.typecode, None), (len(offsets),)))
+            offsets.tofile(offsets_file)
+
+
+def get_offsets(sizes):
+    offsets = array.array(column_store.index_typecode, [0])
+    for size in sizes:
+        offsets.append(offsets[-1] + size)
+    return offsets
+
+
+# Layout of the binary format:
+#   magic, version (uint32) and the json header's length (uint32), then the json header
+#   with the plug type, typecode, shape, byte order and offsets of every array.
+#   Each chunk follows with its array, first element and element count (uint32, uint64, uint64),
+#   then its components one after the other.
+def write_binary(source, path, chunk_size=export_chunk_size, progress=None):
+    typecode, width = get_numeric_layout(source)
+    total = sum(source.sizes)
+    done = 0
+
+    header = json.dumps({
+        "plugType": source.plug_type,
+        "typecode": typecode,
+        "itemSize": array.array(typecode).itemsize,
+        "shape": [total, width],
+        "byteOrder": sys.byteorder,
+        "offsets": list(get_offsets(source.sizes))
+    }).encode("utf-8")
+
+    with open(path, "wb") as bin_file:
+        bin_file.write(binary_magic)
+        bin_file.write(struct.pack("<II", binary_version, len(header)))
+        bin_file.write(header)
+
+        for column, start, store in iter_port_chunks(source, chunk_size):
+            count = store.total_length()
+            bin_file.write(struct.pack("<IQQ", column, start, count))
+
+            for component in store.components:
+                component.tofile(bin_file)
+
+            done += count
+            if progress is not None:
+                progress(done, total)
+
+
+def read_binary_header(bin_file):
+    if bin_file.read(len(binary_magic)) != binary_magic:
+        raise ValueError("Not a Bifrost Output Reader binary file")
+
+    version, header_length = struct.unpack("<II", bin_file.read(8))
+    if version > binary_version:
+        raise ValueError("Unsupported binary version: {}".format(version))
+
+    return json.loads(bin_file.read(header_length).decode("utf-8"))
+
+
+# Reads a file written by write_binary back into a ColumnStore.
+def read_binary(path):
+    with open(path, "rb") as bin_file:
+        header = read_binary_header(bin_file)
+
+        store = column_store.ColumnStore(header["plugType"])
+        offsets = header["offsets"]
+        swap = header["byteOrder"] != sys.byteorder
+
+        for size in [end - start for start, end in zip(offsets, offsets[1:])]:
+            store.reserve_array(size)
+
+        chunk_header_size = struct.calcsize("<IQQ")
+
+        while True:
+            chunk_header = bin_file.read(chunk_header_size)
+            if len(chunk_header) < chunk_header_size:
+                break
+
+            column, start, count = struct.unpack("<IQQ", chunk_header)
+            first = offsets[column] + start
+
+            for component in store.components:
+                values = array.array(store.typecode)
+                values.fromfile(bin_file, count)
+                if swap:
+                    values.byteswap()
+                component[first:first + count] = values
+
+    return store
@@ -0,0 +1,209 @@
+from collections import OrderedDict
+
+import maya.cmds as cmds
+from maya.api import OpenMaya
+
+from bifrost_output_reader import core
+from bifrost_output_reader import column_store
+
+
+# Rough size of a value that isn't kept in a typed buffer, like a string or a tuple of bools.
+object_value_size = 64
+
+
+# Keeps the ports' values at sampled frames, dropping the least recently used ones
+# once their total size goes over the memory budget.
+class FrameCache(object):
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def contains(self, bf_graph, plug_name, frame):
+        return (bf_graph, plug_name, float(frame)) in self.entries
+
+    def get(self, bf_graph, plug_name, frame):
+        key = (bf_graph, plug_name, float(frame))
+
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return
+
+        # Most recently used frames are kept at the end.
+        self.entries[key] = entry
+        self.hits += 1
+        return entry[0]
+
+    def put(self, bf_graph, plug_name, frame, store):
+        key = (bf_graph, plug_name, float(frame))
+        self.discard(key)
+
+        size = get_store_size(store)
+        self.entries[key] = (store, size)
+        self.nbytes += size
+
+        # The frame that was just added is kept even if it's bigger than the whole budget.
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            self.evict_oldest()
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry[1]
+
+    def frames(self, bf_graph, plug_name):
+        return sorted([
+            frame for graph, plug, frame in self.entries
+            if graph == bf_graph and plug == plug_name])
+
+    def invalidate(self, bf_graph, plug_name):
+        for key in list(self.entries):
+            if key[:2] == (bf_graph, plug_name):
+                self.discard(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def set_max_bytes(self, max_bytes):
+        self.max_bytes = max_bytes
+
+        while self.nbytes > self.max_bytes and self.entries:
+            self.evict_oldest()
+
+    def evict_oldest(self):
+        key, (store, size) = self.entries.popitem(last=False)
+        self.nbytes -= size
+        self.evictions += 1
+        self.evicted_bytes += size
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+
+        return {
+            "frames": len(self.entries),
+            "bytes": self.nbytes,
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": float(self.hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "evictedBytes": self.evicted_bytes
+        }
+
+
+def get_store_size(store):
+    if store.is_numeric():
+        return store.nbytes()
+    return store.total_length() * object_value_size
+
+
+def get_frame_range(start, end, step=1.0):
+    if step <= 0:
+        raise ValueError("Step must be greater than 0")
+
+    frames = []
+    index = 0
+    frame = float(start)
+
+    # Frames are computed from the index so float steps don't accumulate errors.
+    while frame <= end + 1e-6:
+        frames.append(frame)
+        index += 1
+        frame = start + index * step
+
+    return frames
+
+
+def get_current_frame():
+    return cmds.currentTime(q=True)
+
+
+# Reads the port as it evaluates at the given frame, without changing the scene's current time.
+def read_port_at_frame(bf_graph, plug_name, frame, backend=None):
+    schema = core.get_port_schema(bf_graph, plug_name)
+    if schema is None or schema.attr_type == "bifData":
+        return
+
+    if backend is None:
+        backend = core.get_default_backend()
+
+    if backend == "openmaya" and core.openmaya_reader is not None:
+        context = OpenMaya.MDGContext(OpenMaya.MTime(frame, OpenMaya.MTime.uiUnit()))
+
+        # Every plug evaluated under the guard, including the size queries, uses the frame's context.
+        with OpenMaya.MDGContextGuard(context):
+            store = core.openmaya_reader.read_port(bf_graph, plug_name, schema.element_type)
+
+        if store is not None:
+            if store.plug_type is not None:
+                schema.element_type = store.plug_type
+            return store
+
+    return read_port_at_frame_with_cmds(bf_graph, plug_name, frame, schema)
+
+
+# Falls back on getAttr's time flag, reading each multi plug in one query.
+# The number of arrays of a 2D port is taken at the current time since sizes can't be queried at a frame.
+def read_port_at_frame_with_cmds(bf_graph, plug_name, frame, schema):
+    plug = "{}.{}".format(bf_graph, plug_name)
+    plug_type = schema.element_type
+    sub_plugs = core.get_port_sub_plugs(bf_graph, plug_name)
+
+    if sub_plugs is None:
+        value = cmds.getAttr(plug, time=frame)
+        return column_store.ColumnStore.from_values([[core.serialize_data(value, plug_type)]], plug_type)
+
+    arrays = []
+
+    for sub_plug in sub_plugs:
+        values = cmds.getAttr(sub_plug, time=frame)
+        if values is None:
+            values = []
+        elif type(values) != list:
+            values = [values]
+
+        if values and plug_type is None:
+            plug_type = cmds.getAttr("{}[0]".format(sub_plug), type=True)
+            schema.element_type = plug_type
+
+        width = core.get_type_width(plug_type)
+        count = len(values)
+        if width > 1 and count and type(values[0]) not in (list, tuple):
+            count //= width
+
+        normalized = core.normalize_bulk_values(values, count, plug_type)
+        if normalized is None:
+            normalized = [tuple(value) if type(value) == list else value for value in values]
+
+        arrays.append(normalized)
+
+    return column_store.ColumnStore.from_values(arrays, plug_type)
+
+
+# Reads the port at every frame of the range into the cache, yielding each frame as it's done
+# so callers can report progress or stop early. Frames that are already cached are skipped.
+def sample_frame_range(bf_graph, plug_name, start, end, step=1.0, target=None, backend=None):
+    if target is None:
+        target = cache
+
+    for frame in get_frame_range(start, end, step):
+        if not target.contains(bf_graph, plug_name, frame):
+            store = read_port_at_frame(bf_graph, plug_name, frame, backend=backend)
+            if store is None:
+                return
+            target.put(bf_graph, plug_name, frame, store)
+
+        yield frame
+
+
+cache = FrameCache()
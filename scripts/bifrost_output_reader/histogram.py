@@ -0,0 +1,136 @@
+import math
+from bisect import bisect_right
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from bifrost_output_reader import query
+from bifrost_output_reader import sorting
+
+
+# Must stay even so two neighbouring bins can merge into one when the range doubles.
+default_bin_count = 64
+
+
+# Counts a component's values, or their magnitude, in a fixed number of bins no matter how many there are.
+# Values can be added as they're loaded: when new ones fall outside the range, the range doubles
+# and neighbouring bins merge, so the counts stay exact without going back over older values.
+class Histogram(object):
+
+    def __init__(self, key, bin_count=default_bin_count):
+        self.key = key
+        self.bin_count = bin_count
+        self.counts = [0] * bin_count
+        self.low = None
+        self.high = None
+        self.nan_count = 0
+        self.inf_count = 0
+
+        # Number of the store's elements that were added so far.
+        self.consumed = 0
+
+    def is_empty(self):
+        return self.low is None
+
+    def total(self):
+        return sum(self.counts)
+
+    # Bin i holds the values in [edges[i], edges[i + 1]), the last one holds high as well.
+    # Values are binned by searching these edges so a filter with the same bounds matches the same values.
+    def get_edges(self):
+        width = (self.high - self.low) / self.bin_count
+        return [self.low + index * width for index in range(self.bin_count)] + [self.high]
+
+    def get_bin_range(self, index):
+        edges = self.get_edges()
+        return edges[index], edges[index + 1]
+
+    def add(self, values):
+        if numpy is not None:
+            self.add_numpy(numpy.asarray(values, dtype=numpy.float64))
+        else:
+            self.add_builtin([float(value) for value in values])
+
+    def add_numpy(self, values):
+        finite = numpy.isfinite(values)
+        nan_count = int(numpy.isnan(values).sum())
+        self.nan_count += nan_count
+        self.inf_count += len(values) - int(finite.sum()) - nan_count
+
+        values = values[finite]
+        if not len(values):
+            return
+
+        self.grow(float(values.min()), float(values.max()))
+
+        bins = numpy.searchsorted(numpy.array(self.get_edges()), values, side="right") - 1
+        bins = numpy.minimum(numpy.maximum(bins, 0), self.bin_count - 1)
+
+        for index, count in enumerate(numpy.bincount(bins, minlength=self.bin_count).tolist()):
+            self.counts[index] += count
+
+    def add_builtin(self, values):
+        finite = []
+        for value in values:
+            if math.isnan(value):
+                self.nan_count += 1
+            elif math.isinf(value):
+                self.inf_count += 1
+            else:
+                finite.append(value)
+
+        if not finite:
+            return
+
+        self.grow(min(finite), max(finite))
+
+        edges = self.get_edges()
+        for value in finite:
+            self.counts[min(max(bisect_right(edges, value) - 1, 0), self.bin_count - 1)] += 1
+
+    # Doubles the range until it holds the given values, merging bins by pairs each time.
+    def grow(self, low, high):
+        if self.low is None:
+            if low == high:
+                low -= 0.5
+                high += 0.5
+            self.low = low
+            self.high = high
+            return
+
+        half = self.bin_count // 2
+
+        while low < self.low or high > self.high:
+            width = self.high - self.low
+            merged = [self.counts[i] + self.counts[i + 1] for i in range(0, self.bin_count, 2)]
+
+            if low >= self.low:
+                self.counts = merged + [0] * half
+                self.high = self.low + width * 2
+            else:
+                self.counts = [0] * half + merged
+                self.low = self.high - width * 2
+
+
+def get_values(store, key, start, length):
+    component = query.get_component(key, store.plug_type, store.width)
+    if numpy is not None:
+        return sorting.get_key_values_numpy(store, component, start, length)
+    return sorting.get_key_values(store, component, start, length)
+
+
+# Bins every value of a store at once, the range being their exact min and max.
+def compute_histogram(store, key, bin_count=default_bin_count):
+    histogram = Histogram(key, bin_count)
+    update_histogram(histogram, store)
+    return histogram
+
+
+# Adds the values the store got since the last update, for stores that are still loading.
+def update_histogram(histogram, store):
+    total = store.total_length()
+    if total > histogram.consumed:
+        histogram.add(get_values(store, histogram.key, histogram.consumed, total - histogram.consumed))
+        histogram.consumed = total
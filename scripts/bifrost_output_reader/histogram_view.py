@@ -0,0 +1,91 @@
+from PySide2 import QtGui
+from PySide2 import QtCore
+from PySide2 import QtWidgets
+
+
+# Draws a Histogram's bins as bars. Clicking a bar emits its range.
+class HistogramView(QtWidgets.QWidget):
+
+    # low, high, whether it's the last bin which includes its high value
+    bin_clicked = QtCore.Signal(float, float, bool)
+
+    def __init__(self, parent=None):
+        QtWidgets.QWidget.__init__(self, parent=parent)
+        self.setMouseTracking(True)
+        self.setMinimumHeight(60)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+
+        self.histogram = None
+        self.hovered_bin = None
+
+        self.bar_color = QtGui.QColor(0, 170, 255)
+        self.hover_color = QtGui.QColor(255, 200, 0)
+
+    def sizeHint(self):
+        return QtCore.QSize(200, 80)
+
+    def set_histogram(self, histogram):
+        self.histogram = histogram
+        self.update()
+
+    def get_bin_at(self, x):
+        if self.histogram is None or self.histogram.is_empty() or not self.width():
+            return
+        return min(max(int(x * self.histogram.bin_count / self.width()), 0), self.histogram.bin_count - 1)
+
+    def paintEvent(self, paint_event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), self.palette().color(QtGui.QPalette.Base))
+
+        if self.histogram is None or self.histogram.is_empty():
+            painter.setPen(self.palette().color(QtGui.QPalette.Text))
+            painter.drawText(self.rect(), QtCore.Qt.AlignCenter, "No values to show")
+            painter.end()
+            return
+
+        counts = self.histogram.counts
+        max_count = max(counts) or 1
+        bar_width = self.width() / float(len(counts))
+        height = self.height()
+
+        for index, count in enumerate(counts):
+            if not count:
+                continue
+
+            # Bins with a few values still get a couple of pixels so outliers can be spotted.
+            bar_height = max(int(height * count / float(max_count)), 2)
+
+            color = self.hover_color if index == self.hovered_bin else self.bar_color
+            painter.fillRect(
+                QtCore.QRectF(index * bar_width, height - bar_height, max(bar_width - 1, 1), bar_height), color)
+
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        index = self.get_bin_at(event.pos().x())
+        if index != self.hovered_bin:
+            self.hovered_bin = index
+            self.update()
+
+        if index is None:
+            QtWidgets.QToolTip.hideText()
+            return
+
+        low, high = self.histogram.get_bin_range(index)
+        closing = "]" if index == self.histogram.bin_count - 1 else ")"
+        QtWidgets.QToolTip.showText(
+            event.globalPos(),
+            "[{}, {}{}\n{} values\nClick to filter the rows in this bin".format(low, high, closing, self.histogram.counts[index]),
+            self)
+
+    def leaveEvent(self, event):
+        self.hovered_bin = None
+        self.update()
+
+    def mousePressEvent(self, event):
+        index = self.get_bin_at(event.pos().x())
+        if index is None or event.button() != QtCore.Qt.LeftButton:
+            return
+
+        low, high = self.histogram.get_bin_range(index)
+        self.bin_clicked.emit(low, high, index == self.histogram.bin_count - 1)
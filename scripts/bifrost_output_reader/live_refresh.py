@@ -0,0 +1,76 @@
+from PySide2 import QtCore
+
+from maya.api import OpenMaya
+
+
+# Watches a port for changes while the timeline or the graph's inputs are being tweaked.
+# Bursts of dirty and time change events are throttled to one refresh per interval.
+# inputs_changed is sent right away when the port gets dirty without the time changing,
+# since values read at other frames before that are out of date.
+class LiveRefresher(QtCore.QObject):
+
+    refresh_requested = QtCore.Signal()
+    inputs_changed = QtCore.Signal(str, str)
+
+    def __init__(self, parent=None):
+        super(LiveRefresher, self).__init__(parent)
+        self.bf_graph = None
+        self.plug_name = None
+        self.callback_ids = []
+        self.last_time = None
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(150)
+        self.timer.timeout.connect(self.refresh_requested)
+
+    def is_watching(self):
+        return bool(self.callback_ids)
+
+    def set_interval(self, msecs):
+        self.timer.setInterval(msecs)
+
+    def watch(self, bf_graph, plug_name):
+        self.stop()
+
+        sel = OpenMaya.MSelectionList()
+        sel.add(bf_graph)
+        node = sel.getDependNode(0)
+
+        self.bf_graph = bf_graph
+        self.plug_name = plug_name
+        self.last_time = OpenMaya.MAnimControl.currentTime()
+        self.callback_ids = [
+            OpenMaya.MNodeMessage.addNodeDirtyPlugCallback(node, self.on_plug_dirty),
+            OpenMaya.MDGMessage.addTimeChangeCallback(self.on_time_changed)
+        ]
+
+    def stop(self):
+        if self.callback_ids:
+            OpenMaya.MMessage.removeCallbacks(self.callback_ids)
+        self.callback_ids = []
+        self.bf_graph = None
+        self.plug_name = None
+        self.timer.stop()
+
+    def schedule(self):
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def on_plug_dirty(self, node, plug, client_data):
+        attr_name = plug.partialName(useLongNames=True).split(".")[0].split("[")[0]
+        if attr_name != self.plug_name:
+            return
+
+        # Time dependent ports get dirty when the time changes, which doesn't make other frames stale.
+        current_time = OpenMaya.MAnimControl.currentTime()
+        if current_time != self.last_time:
+            self.last_time = current_time
+        else:
+            self.inputs_changed.emit(self.bf_graph, self.plug_name)
+
+        self.schedule()
+
+    def on_time_changed(self, time, client_data):
+        self.last_time = time
+        self.schedule()
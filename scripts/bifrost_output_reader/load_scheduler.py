@@ -0,0 +1,88 @@
+import time
+from collections import deque
+
+from PySide2 import QtCore
+
+
+# Reads a port in chunks from a timer on the main thread, giving control back to Maya
+# between time slices so the UI stays responsive while large ports stream in.
+class PortLoader(QtCore.QObject):
+
+    chunks_loaded = QtCore.Signal()
+    progress_updated = QtCore.Signal(int, int, float)
+    finished = QtCore.Signal()
+    failed = QtCore.Signal(str)
+
+    def __init__(self, parent=None):
+        super(PortLoader, self).__init__(parent)
+        self.chunk_size = 5000
+        self.time_slice = 0.03
+
+        self.source = None
+        self.store = None
+        self.tasks = deque()
+        self.done = 0
+        self.total = 0
+        self.start_time = 0
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.process)
+
+    def is_running(self):
+        return self.timer.isActive()
+
+    def start(self, source, store):
+        self.cancel()
+
+        self.source = source
+        self.store = store
+        self.done = 0
+        self.total = sum(source.sizes)
+        self.start_time = time.time()
+
+        for column, size in enumerate(source.sizes):
+            self.tasks.append((column, 0, min(self.chunk_size, size)))
+            for start in range(self.chunk_size, size, self.chunk_size):
+                self.tasks.append((column, start, min(self.chunk_size, size - start)))
+
+        self.timer.start()
+
+    def cancel(self):
+        self.timer.stop()
+        self.tasks.clear()
+        self.source = None
+        self.store = None
+
+    def process(self):
+        slice_end = time.time() + self.time_slice
+
+        while self.tasks:
+            column, start, count = self.tasks.popleft()
+
+            if start == 0:
+                self.store.begin_array()
+
+            if count:
+                # The node can be deleted or changed while the port streams in.
+                try:
+                    values = self.source.read_range(column, start, count)
+                except Exception as err:
+                    self.cancel()
+                    self.failed.emit(str(err))
+                    return
+
+                self.store.extend_last_array(values)
+                self.done += count
+
+            if time.time() >= slice_end:
+                break
+
+        self.chunks_loaded.emit()
+        self.progress_updated.emit(self.done, self.total, time.time() - self.start_time)
+
+        if not self.tasks and self.timer.isActive():
+            self.timer.stop()
+            self.source = None
+            self.store = None
+            self.finished.emit()
@@ -0,0 +1,75 @@
+import maya.cmds as cmds
+from maya.api import OpenMaya
+
+from bifrost_output_reader import api_undo
+
+
+# Maya replaces the # with the next free number.
+locator_name = "bifrostLocator#"
+
+point_cloud_name = "bifrostPoints1"
+
+
+# Creates a locator per position or matrix with one modifier, so it's a single undo step.
+# Positions are (x, y, z) and matrices are 16 values in row-major order like Maya's.
+# Returns the new transforms' names.
+def create_locators(values, is_matrix=False):
+    if not values:
+        return []
+
+    modifier = OpenMaya.MDagModifier()
+    transforms = [modifier.createNode("locator") for value in values]
+    modifier.doIt()
+
+    # The nodes already exist at this point, so they're removed again if anything after fails.
+    try:
+        for transform, value in zip(transforms, values):
+            modifier.renameNode(transform, locator_name)
+
+            node = OpenMaya.MFnDependencyNode(transform)
+
+            if is_matrix:
+                set_transform_values(modifier, node, OpenMaya.MTransformationMatrix(OpenMaya.MMatrix(value)))
+            else:
+                set_double3(modifier, node, "translate", ui_to_internal(value))
+
+        modifier.doIt()
+    except Exception:
+        modifier.undoIt()
+        raise
+
+    api_undo.commit(modifier)
+
+    return [OpenMaya.MFnDagNode(transform).partialPathName() for transform in transforms]
+
+
+def set_transform_values(modifier, node, transformation):
+    rotation = transformation.rotation()
+
+    set_double3(modifier, node, "translate", ui_to_internal(transformation.translation(OpenMaya.MSpace.kTransform)))
+    set_double3(modifier, node, "rotate", (rotation.x, rotation.y, rotation.z))
+    set_double3(modifier, node, "scale", transformation.scale(OpenMaya.MSpace.kTransform))
+    set_double3(modifier, node, "shear", transformation.shear(OpenMaya.MSpace.kTransform), ["XY", "XZ", "YZ"])
+
+
+def set_double3(modifier, node, attr, value, suffixes="XYZ"):
+    for axis, component in zip(suffixes, value):
+        modifier.newPlugValueDouble(node.findPlug(attr + axis, False), component)
+
+
+# Plugs are set in internal units (cm) while the port's positions are in the scene's units, like xform's.
+def ui_to_internal(position):
+    return [OpenMaya.MDistance.uiToInternal(component) for component in position]
+
+
+# Creates one particle node holding every position, which is much lighter than a node per point.
+def create_point_cloud(positions):
+    if not positions:
+        return
+
+    return cmds.particle(position=[tuple(position) for position in positions], name=point_cloud_name)[0]
+
+
+# Matrices are row-major, the translation is on the last row.
+def get_translation(matrix):
+    return matrix[12], matrix[13], matrix[14]
@@ -0,0 +1,124 @@
+import maya.cmds as cmds
+from maya.api import OpenMaya
+
+from bifrost_output_reader import column_store
+
+
+# Plug type -> MDataHandle accessor
+plug_accessors = {
+    "bool": "asBool",
+    "char": "asChar",
+    "short": "asShort",
+    "short2": "asShort2",
+    "short3": "asShort3",
+    "long": "asInt",
+    "long2": "asInt2",
+    "long3": "asInt3",
+    "long long int": "asInt64",
+    "float": "asFloat",
+    "float2": "asFloat2",
+    "float3": "asFloat3",
+    "double": "asDouble",
+    "double2": "asDouble2",
+    "double3": "asDouble3",
+    "matrix": "asMatrix"
+}
+
+
+def get_plug(bf_graph, plug_name):
+    sel = OpenMaya.MSelectionList()
+    sel.add(bf_graph)
+    node = OpenMaya.MFnDependencyNode(sel.getDependNode(0))
+    return node.findPlug(plug_name, False)
+
+
+def find_sub_multi_attr(plug):
+    attr = plug.attribute()
+    if not attr.hasFn(OpenMaya.MFn.kCompoundAttribute):
+        return
+
+    compound_attr = OpenMaya.MFnCompoundAttribute(attr)
+    for i in range(compound_attr.numChildren()):
+        child_attr = compound_attr.child(i)
+        if OpenMaya.MFnAttribute(child_attr).array:
+            return child_attr
+
+
+def get_sub_plugs(plug):
+    if not plug.isArray:
+        return [plug]
+
+    sub_multi_attr = find_sub_multi_attr(plug)
+    if sub_multi_attr is None:
+        return [plug]
+
+    return [
+        plug.elementByPhysicalIndex(index).child(sub_multi_attr)
+        for index in range(plug.evaluateNumElements())]
+
+
+def get_element_type(sub_plugs):
+    for sub_plug in sub_plugs:
+        if not sub_plug.isArray:
+            return cmds.getAttr(sub_plug.name(), type=True)
+
+        if sub_plug.evaluateNumElements():
+            return cmds.getAttr(sub_plug.elementByPhysicalIndex(0).name(), type=True)
+
+
+# Reads a port straight into a ColumnStore's typed buffers.
+# Returns None if the port's type isn't supported so the cmds backend can read it instead.
+def read_port(bf_graph, plug_name, plug_type=None):
+    plug = get_plug(bf_graph, plug_name)
+    sub_plugs = get_sub_plugs(plug)
+
+    if plug_type is None:
+        plug_type = get_element_type(sub_plugs)
+
+    if plug_type not in plug_accessors:
+        return
+
+    store = column_store.ColumnStore(plug_type)
+    for sub_plug in sub_plugs:
+        read_into_store(sub_plug, store)
+
+    return store
+
+
+def get_plug_size(plug):
+    if plug.isArray:
+        return plug.evaluateNumElements()
+    return 1
+
+
+# Appends a new array to the store holding `count` elements of the plug, starting at `first`.
+def read_into_store(plug, store, first=0, count=None):
+    accessor = plug_accessors[store.plug_type]
+
+    if count is None:
+        count = get_plug_size(plug) - first
+
+    start = store.reserve_array(count)
+    components = store.components
+
+    for index in range(count):
+        if plug.isArray:
+            element = plug.elementByPhysicalIndex(first + index)
+        else:
+            element = plug
+
+        value = read_value(element, accessor)
+
+        if store.width == 1:
+            components[0][start + index] = value
+        else:
+            for component in range(store.width):
+                components[component][start + index] = value[component]
+
+
+def read_value(plug, accessor):
+    handle = plug.asMDataHandle()
+    try:
+        return getattr(handle, accessor)()
+    finally:
+        plug.destructHandle(handle)
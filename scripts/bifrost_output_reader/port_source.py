@@ -0,0 +1,282 @@
+from collections import OrderedDict
+
+import maya.cmds as cmds
+
+from bifrost_output_reader import core
+from bifrost_output_reader import column_store
+from bifrost_output_reader import evaluation
+
+
+preview_row_count = 10000
+
+preview_block_size = 100
+
+
+# Random access to a port's elements through cmds range queries.
+class CmdsPortSource(object):
+
+    def __init__(self, bf_graph, plug_name, schema):
+        self.bf_graph = bf_graph
+        self.plug_name = plug_name
+        self.plug = "{}.{}".format(bf_graph, plug_name)
+        self.plug_type = schema.element_type
+        self.sub_plugs = core.get_port_sub_plugs(bf_graph, plug_name)
+        self.sizes = [1]
+
+        if self.sub_plugs is not None:
+            self.sizes = [cmds.getAttr(sub_plug, size=True) for sub_plug in self.sub_plugs]
+
+        if self.sub_plugs is not None:
+            if self.plug_type is None:
+                for sub_plug, size in zip(self.sub_plugs, self.sizes):
+                    if size:
+                        self.plug_type = cmds.getAttr("{}[0]".format(sub_plug), type=True)
+                        schema.element_type = self.plug_type
+                        break
+
+    # Queries the current sizes, which can differ from the ones the source was opened with.
+    def query_sizes(self):
+        sub_plugs = core.get_port_sub_plugs(self.bf_graph, self.plug_name)
+        if sub_plugs is None:
+            return [1]
+        return [cmds.getAttr(sub_plug, size=True) for sub_plug in sub_plugs]
+
+    def read_range(self, column, start, count):
+        store = column_store.ColumnStore(self.plug_type)
+        evaluation.counter.check(self.plug)
+
+        if self.sub_plugs is None:
+            store.append_values([core.serialize_data(cmds.getAttr(self.plug), self.plug_type)])
+        else:
+            store.append_values(core.read_plug_range(self.sub_plugs[column], start, start + count, self.plug_type))
+
+        return store
+
+
+# Random access to a port's elements through OpenMaya plugs.
+class OpenMayaPortSource(object):
+
+    def __init__(self, bf_graph, plug_name, schema):
+        self.plug = "{}.{}".format(bf_graph, plug_name)
+        self.root_plug = core.openmaya_reader.get_plug(bf_graph, plug_name)
+        self.sub_plugs = core.openmaya_reader.get_sub_plugs(self.root_plug)
+        self.sizes = [core.openmaya_reader.get_plug_size(sub_plug) for sub_plug in self.sub_plugs]
+        self.plug_type = schema.element_type
+
+        if self.plug_type is None:
+            self.plug_type = core.openmaya_reader.get_element_type(self.sub_plugs)
+            schema.element_type = self.plug_type
+
+    # Queries the current sizes, which can differ from the ones the source was opened with.
+    def query_sizes(self):
+        return [
+            core.openmaya_reader.get_plug_size(sub_plug)
+            for sub_plug in core.openmaya_reader.get_sub_plugs(self.root_plug)]
+
+    def read_range(self, column, start, count):
+        store = column_store.ColumnStore(self.plug_type)
+        evaluation.counter.check(self.plug)
+        core.openmaya_reader.read_into_store(self.sub_plugs[column], store, start, count)
+        return store
+
+
+# Ranged reads over values already in memory, so they can go wherever a port source can.
+class StoreSource(object):
+
+    def __init__(self, store):
+        self.store = store
+        self.plug_type = store.plug_type
+        self.sizes = [store.array_length(i) for i in range(store.array_count())]
+
+    def query_sizes(self):
+        return list(self.sizes)
+
+    def read_range(self, column, start, count):
+        first = self.store.offsets[column] + start
+
+        store = column_store.ColumnStore(self.plug_type)
+        store.components = [component[first:first + count] for component in self.store.components]
+        store.offsets.append(len(store.components[0]))
+        return store
+
+
+# Opens a port for ranged reads, only querying its sizes and type.
+# The size queries are what evaluates the graph, later reads find the plugs clean.
+def open_port_source(bf_graph, plug_name, backend=None):
+    schema = core.get_port_schema(bf_graph, plug_name)
+    if schema is None or schema.attr_type == "bifData":
+        return
+
+    evaluation.counter.check("{}.{}".format(bf_graph, plug_name))
+
+    if backend is None:
+        backend = core.get_default_backend()
+
+    if backend == "openmaya" and core.openmaya_reader is not None:
+        source = OpenMayaPortSource(bf_graph, plug_name, schema)
+        if source.plug_type in core.openmaya_reader.plug_accessors:
+            return source
+
+    return CmdsPortSource(bf_graph, plug_name, schema)
+
+
+# Spreads blocks of neighbouring rows evenly over an array, from its first row to its last,
+# so a preview covers the whole port with a few ranged reads per array.
+# Returns None when the array is short enough to be read whole.
+def get_preview_rows(length, count=preview_row_count, block_size=preview_block_size):
+    if length <= count:
+        return
+
+    block_count = max(count // block_size, 2)
+    rows = []
+
+    for block in range(block_count):
+        start = block * (length - block_size) // (block_count - 1)
+        rows.extend(range(start, start + block_size))
+
+    return rows
+
+
+# Reads every array of a source into a store, or anything taking arrays the way a store does
+# like StreamingStats, in ranges so large ports aren't read in one query.
+def read_all(source, store=None, chunk_size=core.bulk_read_chunk_size):
+    if store is None:
+        store = column_store.ColumnStore(source.plug_type)
+
+    for column, size in enumerate(source.sizes):
+        store.begin_array()
+        for start in range(0, size, chunk_size):
+            store.extend_last_array(source.read_range(column, start, min(chunk_size, size - start)))
+
+    return store
+
+
+# Reads the rows of a preview from every array, rows past the end of shorter arrays being left out.
+def read_preview(source, rows):
+    store = column_store.ColumnStore(source.plug_type)
+
+    for column, size in enumerate(source.sizes):
+        store.begin_array()
+
+        index = 0
+        while index < len(rows) and rows[index] < size:
+            # Neighbouring rows are read as one range.
+            end = index + 1
+            while end < len(rows) and rows[end] == rows[end - 1] + 1 and rows[end] < size:
+                end += 1
+
+            store.extend_last_array(source.read_range(column, rows[index], end - index))
+            index = end
+
+    return store
+
+
+# Exposes the same read interface as a ColumnStore, but only keeps the chunks of rows
+# that were recently asked for, reading missing ones from the port on demand.
+class WindowedStore(object):
+
+    def __init__(self, source, chunk_size=2000, max_chunks=64):
+        self.source = source
+        self.plug_type = source.plug_type
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()
+
+        # Rows that are still up to date in chunks a live refresh only partly re-read.
+        self.fresh_spans = {}
+
+        self.typecode, self.width = column_store.plug_layouts.get(self.plug_type, (None, 1))
+
+    def is_numeric(self):
+        return self.typecode is not None
+
+    def array_count(self):
+        return len(self.source.sizes)
+
+    def array_length(self, index):
+        return self.source.sizes[index]
+
+    def max_length(self):
+        return max(self.source.sizes or [0])
+
+    def total_length(self):
+        return sum(self.source.sizes)
+
+    def get_chunk(self, column, chunk_index):
+        key = (column, chunk_index)
+
+        chunk = self.chunks.pop(key, None)
+        if chunk is None:
+            start = chunk_index * self.chunk_size
+            count = min(self.chunk_size, self.array_length(column) - start)
+            chunk = self.source.read_range(column, start, count)
+
+        # Most recently used chunks are kept at the end.
+        self.chunks[key] = chunk
+
+        while len(self.chunks) > self.max_chunks:
+            self.fresh_spans.pop(self.chunks.popitem(last=False)[0], None)
+
+        return chunk
+
+    def discard_chunk(self, key):
+        self.chunks.pop(key, None)
+        self.fresh_spans.pop(key, None)
+
+    def value(self, column, row):
+        key = (column, row // self.chunk_size)
+
+        # A stale row gets its whole chunk read again.
+        span = self.fresh_spans.get(key)
+        if span is not None and not span[0] <= row < span[1]:
+            self.discard_chunk(key)
+
+        chunk = self.get_chunk(*key)
+        return chunk.value(0, row % self.chunk_size)
+
+    # Overwrites the rows of the cached chunks that overlap the given values.
+    def write_range(self, column, start, store):
+        end = start + store.total_length()
+
+        for chunk_index in range(start // self.chunk_size, (end - 1) // self.chunk_size + 1):
+            chunk = self.chunks.get((column, chunk_index))
+            if chunk is None:
+                continue
+
+            chunk_start = chunk_index * self.chunk_size
+            first = max(start, chunk_start)
+            last = min(end, chunk_start + chunk.total_length())
+
+            for i in range(self.width):
+                chunk.components[i][first - chunk_start:last - chunk_start] = store.components[i][first - start:last - start]
+
+    # Called after a live refresh re-read a block of cells, every other cached row is stale from then on.
+    # Chunks outside of the block are dropped and the ones it overlaps are read again once a stale row is needed.
+    def keep_fresh(self, first_row, last_row, first_column, last_column):
+        spans = {}
+
+        for key in list(self.chunks):
+            column, chunk_index = key
+            chunk_start = chunk_index * self.chunk_size
+            first = max(first_row, chunk_start)
+            last = min(last_row + 1, chunk_start + self.chunk_size)
+
+            if first_column <= column <= last_column and first < last:
+                spans[key] = (first, last)
+            else:
+                del self.chunks[key]
+
+        self.fresh_spans = spans
+
+    # Reads the chunks holding a row in the given arrays, every array by default.
+    def prefetch(self, row, first_column=0, last_column=None):
+        if last_column is None:
+            last_column = self.array_count() - 1
+
+        for column in range(first_column, min(last_column + 1, self.array_count())):
+            if row < self.array_length(column):
+                self.get_chunk(column, row // self.chunk_size)
+
+    def clear(self):
+        self.chunks.clear()
+        self.fresh_spans.clear()
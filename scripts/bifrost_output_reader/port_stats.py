@@ -0,0 +1,317 @@
+import math
+from bisect import bisect_right
+from operator import mul
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+try:
+    string_types = (str, unicode)
+except NameError:
+    string_types = (str,)
+
+float_typecodes = ["f", "d"]
+
+
+def get_empty_stats():
+    return {
+        "minValue": None,
+        "maxValue": None,
+        "mean": None,
+        "stdDev": None,
+        "nanCount": 0,
+        "infCount": 0,
+        "argMin": None,
+        "argMax": None,
+        "argLongest": None
+    }
+
+
+# Computes the stats of every component over all arrays of a ColumnStore.
+# Components are collapsed to a single value for scalar types and tuples for the rest.
+def compute_stats(store):
+    if not store.total_length():
+        return get_empty_stats()
+
+    if not store.is_numeric():
+        return compute_object_stats(store)
+
+    if numpy is not None:
+        component_stats = [compute_component_stats_numpy(buffer) for buffer in store.components]
+    else:
+        component_stats = [compute_component_stats(buffer) for buffer in store.components]
+
+    stats = {"argLongest": None}
+    for key in ["minValue", "maxValue", "mean", "stdDev", "nanCount", "infCount"]:
+        stats[key] = collapse([entry[key] for entry in component_stats])
+
+    for key in ["argMin", "argMax"]:
+        stats[key] = collapse([
+            flat_index_to_cell(store, entry[key])
+            for entry in component_stats])
+
+    if store.plug_type == "bool":
+        stats["minValue"] = to_bool(stats["minValue"])
+        stats["maxValue"] = to_bool(stats["maxValue"])
+
+    return stats
+
+
+def compute_component_stats_numpy(buffer):
+    # Snapshots hold NumPy arrays instead of typed arrays, they're used as is to keep their byte order.
+    if isinstance(buffer, numpy.ndarray):
+        values = buffer
+    else:
+        values = numpy.frombuffer(buffer, dtype=buffer.typecode)
+    indices = None
+    nan_count = 0
+    inf_count = 0
+
+    if values.dtype.kind == "f":
+        finite = numpy.isfinite(values)
+        non_finite_count = len(values) - int(numpy.count_nonzero(finite))
+
+        if non_finite_count:
+            nan_count = int(numpy.count_nonzero(numpy.isnan(values)))
+            inf_count = non_finite_count - nan_count
+            indices = numpy.flatnonzero(finite)
+            values = values[finite]
+
+    if not len(values):
+        return get_non_finite_stats(nan_count, inf_count)
+
+    arg_min = int(values.argmin())
+    arg_max = int(values.argmax())
+
+    stats = {
+        "minValue": values[arg_min].item(),
+        "maxValue": values[arg_max].item(),
+        "mean": float(values.mean(dtype=numpy.float64)),
+        "stdDev": float(values.std(dtype=numpy.float64)),
+        "nanCount": nan_count,
+        "infCount": inf_count,
+        "argMin": arg_min,
+        "argMax": arg_max
+    }
+
+    if indices is not None:
+        stats["argMin"] = int(indices[arg_min])
+        stats["argMax"] = int(indices[arg_max])
+
+    return stats
+
+
+# Fallback without NumPy. Each reduction runs through a builtin so the loops stay in C,
+# and the values only get filtered in Python when they contain NaNs or infinities.
+def compute_component_stats(buffer):
+    values = buffer
+    indices = None
+    nan_count = 0
+    inf_count = 0
+
+    if buffer.typecode in float_typecodes:
+        nan_count = sum(map(math.isnan, buffer))
+        inf_count = sum(map(math.isinf, buffer))
+
+        if nan_count or inf_count:
+            indices = [
+                index for index, value in enumerate(buffer)
+                if not math.isnan(value) and not math.isinf(value)]
+            values = [buffer[index] for index in indices]
+
+    if not len(values):
+        return get_non_finite_stats(nan_count, inf_count)
+
+    count = len(values)
+    min_value = min(values)
+    max_value = max(values)
+    arg_min = values.index(min_value)
+    arg_max = values.index(max_value)
+
+    mean = math.fsum(values) / count
+    variance = max(math.fsum(map(mul, values, values)) / count - mean * mean, 0.0)
+
+    return {
+        "minValue": min_value,
+        "maxValue": max_value,
+        "mean": mean,
+        "stdDev": math.sqrt(variance),
+        "nanCount": nan_count,
+        "infCount": inf_count,
+        "argMin": arg_min if indices is None else indices[arg_min],
+        "argMax": arg_max if indices is None else indices[arg_max]
+    }
+
+
+def get_non_finite_stats(nan_count, inf_count):
+    stats = get_empty_stats()
+    stats["nanCount"] = nan_count
+    stats["infCount"] = inf_count
+    return stats
+
+
+# Strings and unsupported compounds only get a min and max.
+def compute_object_stats(store):
+    stats = get_empty_stats()
+    values = store.components[0]
+
+    if type(values[0]) == tuple:
+        tuple_length = len(values[0])
+        stats["minValue"] = tuple([min([value[i] for value in values]) for i in range(tuple_length)])
+        stats["maxValue"] = tuple([max([value[i] for value in values]) for i in range(tuple_length)])
+    else:
+        stats["minValue"] = min(values)
+        stats["maxValue"] = max(values)
+
+        if isinstance(values[0], string_types):
+            lengths = [len(value) for value in values]
+            stats["argLongest"] = flat_index_to_cell(store, lengths.index(max(lengths)))
+
+    return stats
+
+
+# Accumulates the same stats as compute_stats from chunks of a port, so they stay exact on ports
+# that are never fully held in memory. It's filled like a loader fills a store, through begin_array
+# and extend_last_array, and cells are counted from the start of each array.
+class StreamingStats(object):
+
+    def __init__(self, plug_type):
+        self.plug_type = plug_type
+        self.column = -1
+        self.position = 0
+        self.components = []
+        self.object_stats = None
+        self.longest = -1
+
+    def begin_array(self):
+        self.column += 1
+        self.position = 0
+
+    def extend_last_array(self, store):
+        self.add(store, self.column, self.position)
+        self.position += store.total_length()
+
+    def add(self, store, column, start):
+        if not store.total_length():
+            return
+
+        if not store.is_numeric():
+            self.add_objects(store, column, start)
+            return
+
+        for index, buffer in enumerate(store.components):
+            if numpy is not None:
+                entry = compute_component_stats_numpy(buffer)
+            else:
+                entry = compute_component_stats(buffer)
+
+            if index == len(self.components):
+                self.components.append({
+                    "count": 0, "mean": 0.0, "m2": 0.0, "minValue": None, "maxValue": None,
+                    "argMin": None, "argMax": None, "nanCount": 0, "infCount": 0})
+
+            self.merge(self.components[index], entry, len(buffer), column, start)
+
+    def merge(self, total, entry, length, column, start):
+        total["nanCount"] += entry["nanCount"]
+        total["infCount"] += entry["infCount"]
+
+        count = length - entry["nanCount"] - entry["infCount"]
+        if not count:
+            return
+
+        # Earlier chunks win ties, like argmin and argmax keep the first occurrence.
+        if total["minValue"] is None or entry["minValue"] < total["minValue"]:
+            total["minValue"] = entry["minValue"]
+            total["argMin"] = (column, start + entry["argMin"])
+
+        if total["maxValue"] is None or entry["maxValue"] > total["maxValue"]:
+            total["maxValue"] = entry["maxValue"]
+            total["argMax"] = (column, start + entry["argMax"])
+
+        # Chan's pairwise update merges the chunk's mean and variance without a second pass.
+        new_count = total["count"] + count
+        delta = entry["mean"] - total["mean"]
+        total["mean"] += delta * count / new_count
+        total["m2"] += entry["stdDev"] ** 2 * count + delta * delta * total["count"] * count / new_count
+        total["count"] = new_count
+
+    def add_objects(self, store, column, start):
+        entry = compute_object_stats(store)
+
+        if self.object_stats is None:
+            self.object_stats = entry
+        elif type(entry["minValue"]) == tuple:
+            self.object_stats["minValue"] = tuple(map(min, self.object_stats["minValue"], entry["minValue"]))
+            self.object_stats["maxValue"] = tuple(map(max, self.object_stats["maxValue"], entry["maxValue"]))
+        else:
+            self.object_stats["minValue"] = min(self.object_stats["minValue"], entry["minValue"])
+            self.object_stats["maxValue"] = max(self.object_stats["maxValue"], entry["maxValue"])
+
+        if entry["argLongest"] is not None:
+            length = len(store.components[0][entry["argLongest"][1]])
+            if length > self.longest:
+                self.longest = length
+                self.object_stats["argLongest"] = (column, start + entry["argLongest"][1])
+
+    def get_stats(self):
+        if self.object_stats is not None:
+            return self.object_stats
+
+        if not self.components:
+            return get_empty_stats()
+
+        component_stats = []
+        for total in self.components:
+            entry = get_non_finite_stats(total["nanCount"], total["infCount"])
+            if total["count"]:
+                entry.update({
+                    "minValue": total["minValue"],
+                    "maxValue": total["maxValue"],
+                    "mean": total["mean"],
+                    "stdDev": math.sqrt(max(total["m2"] / total["count"], 0.0)),
+                    "argMin": total["argMin"],
+                    "argMax": total["argMax"]
+                })
+            component_stats.append(entry)
+
+        stats = {"argLongest": None}
+        for key in ["minValue", "maxValue", "mean", "stdDev", "nanCount", "infCount", "argMin", "argMax"]:
+            stats[key] = collapse([entry[key] for entry in component_stats])
+
+        if self.plug_type == "bool":
+            stats["minValue"] = to_bool(stats["minValue"])
+            stats["maxValue"] = to_bool(stats["maxValue"])
+
+        return stats
+
+
+def flat_index_to_cell(store, index):
+    if index is None:
+        return
+    column = bisect_right(store.offsets, index) - 1
+    return column, index - store.offsets[column]
+
+
+def collapse(values):
+    if len(values) == 1:
+        return values[0]
+    return tuple(values)
+
+
+def to_bool(value):
+    if value is None:
+        return
+    return bool(value)
+
+
+# Formats a stat for display, with n/a for components without a finite value.
+def format_stat(value):
+    if value is None:
+        return "n/a"
+    if isinstance(value, tuple):
+        return "({})".format(", ".join(format_stat(entry) for entry in value))
+    return str(value)
@@ -0,0 +1,206 @@
+import re
+import math
+import array
+import operator
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from bifrost_output_reader import column_store
+
+
+component_names = ["x", "y", "z", "w"]
+
+# Maya matrices are row-major, the translation is on the last row.
+translation_names = {"tx": 12, "ty": 13, "tz": 14}
+
+operators = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne
+}
+
+comparison_pattern = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|<|>)\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:e[-+]?\d+)?|nan|[-+]?inf)\s*$", re.IGNORECASE)
+check_pattern = re.compile(r"^\s*(nan|inf|finite)\s*(?:\(\s*(\w+)\s*\))?\s*$", re.IGNORECASE)
+
+# A term's component when it applies to any of them.
+any_component = None
+
+# A term's component when it applies to the length of a vector.
+magnitude = "mag"
+
+
+class QueryError(ValueError):
+    pass
+
+
+# Parses queries like "y < 0", "x > 1 and z <= 2", "nan(y) or mag > 10" into groups of terms.
+# A row matches if all terms of any group match, "and" binding tighter than "or".
+# Terms are (component, operator, value) where component is an index, any_component or magnitude,
+# and operator is one of the comparisons or "nan", "inf" or "finite".
+def parse_query(text, plug_type):
+    typecode, width = column_store.plug_layouts.get(plug_type, (None, 1))
+    if typecode is None:
+        raise QueryError("Type {} can't be filtered".format(plug_type))
+
+    groups = []
+
+    for group_text in re.split(r"\s+or\s+", text.strip(), flags=re.IGNORECASE):
+        terms = []
+
+        for term_text in re.split(r"\s+and\s+", group_text, flags=re.IGNORECASE):
+            terms.append(parse_term(term_text, plug_type, width))
+
+        groups.append(terms)
+
+    return groups
+
+
+def parse_term(text, plug_type, width):
+    match = check_pattern.match(text)
+    if match:
+        component = any_component
+        if match.group(2):
+            component = get_component(match.group(2), plug_type, width)
+        return component, match.group(1).lower(), None
+
+    match = comparison_pattern.match(text)
+    if match:
+        return get_component(match.group(1), plug_type, width), match.group(2), float(match.group(3))
+
+    raise QueryError("Can't understand \"{}\"".format(text.strip()))
+
+
+def get_component(name, plug_type, width):
+    name = name.lower()
+
+    if name in ["value", "v"] and width == 1:
+        return 0
+
+    if name == magnitude and width > 1:
+        return magnitude
+
+    if plug_type == "matrix":
+        if name in translation_names:
+            return translation_names[name]
+
+        match = re.match(r"^m([0-3])([0-3])$", name)
+        if match:
+            return int(match.group(1)) * 4 + int(match.group(2))
+    elif name in component_names[:width]:
+        return component_names.index(name)
+
+    raise QueryError("{} has no component \"{}\"".format(plug_type, name))
+
+
+# The magnitude of a matrix is the length of its translation.
+def get_magnitude_components(components, plug_type):
+    if plug_type == "matrix":
+        return [components[index] for index in sorted(translation_names.values())]
+    return components
+
+
+# Returns the rows where the query matches in any of the store's arrays, in increasing order.
+def filter_rows(store, groups):
+    if numpy is not None:
+        return filter_rows_numpy(store, groups)
+    return filter_rows_builtin(store, groups)
+
+
+def filter_rows_numpy(store, groups):
+    components = [numpy.frombuffer(component, dtype=component.typecode) for component in store.components]
+
+    element_mask = numpy.zeros(store.total_length(), dtype=bool)
+    for terms in groups:
+        group_mask = numpy.ones(store.total_length(), dtype=bool)
+        for term in terms:
+            group_mask &= evaluate_term_numpy(components, term, store.plug_type)
+        element_mask |= group_mask
+
+    row_mask = numpy.zeros(store.max_length(), dtype=bool)
+    for column in range(store.array_count()):
+        start = store.offsets[column]
+        length = store.array_length(column)
+        row_mask[:length] |= element_mask[start:start + length]
+
+    return numpy.flatnonzero(row_mask).astype(numpy.int64)
+
+
+def evaluate_term_numpy(components, term, plug_type=None):
+    component, op, value = term
+
+    if component == magnitude:
+        squares = numpy.zeros(len(components[0]), dtype=numpy.float64)
+        for values in get_magnitude_components(components, plug_type):
+            squares += numpy.square(values, dtype=numpy.float64)
+        candidates = [numpy.sqrt(squares)]
+    elif component is any_component:
+        candidates = components
+    else:
+        candidates = [components[component]]
+
+    mask = numpy.zeros(len(components[0]), dtype=bool)
+
+    for values in candidates:
+        if op == "nan":
+            mask |= numpy.isnan(values) if values.dtype.kind == "f" else False
+        elif op == "inf":
+            mask |= numpy.isinf(values) if values.dtype.kind == "f" else False
+        elif op == "finite":
+            mask |= numpy.isfinite(values) if values.dtype.kind == "f" else True
+        else:
+            # NumPy would compare float32 values in float32, rounding the value, unlike the builtin fallback.
+            if values.dtype == numpy.float32:
+                values = values.astype(numpy.float64)
+            mask |= operators[op](values, value)
+
+    return mask
+
+
+# Fallback without NumPy, testing each element in Python.
+def filter_rows_builtin(store, groups):
+    rows = set()
+
+    for column in range(store.array_count()):
+        start = store.offsets[column]
+
+        for row in range(store.array_length(column)):
+            if row in rows:
+                continue
+
+            values = [component[start + row] for component in store.components]
+            if any([all([evaluate_term(values, term, store.plug_type) for term in terms]) for terms in groups]):
+                rows.add(row)
+
+    return array.array(column_store.index_typecode, sorted(rows))
+
+
+def evaluate_term(values, term, plug_type=None):
+    component, op, value = term
+
+    if component == magnitude:
+        candidates = [math.sqrt(sum([float(component_value) ** 2 for component_value in get_magnitude_components(values, plug_type)]))]
+    elif component is any_component:
+        candidates = values
+    else:
+        candidates = [values[component]]
+
+    for candidate in candidates:
+        if op == "nan":
+            matched = isinstance(candidate, float) and math.isnan(candidate)
+        elif op == "inf":
+            matched = isinstance(candidate, float) and math.isinf(candidate)
+        elif op == "finite":
+            matched = not isinstance(candidate, float) or not (math.isnan(candidate) or math.isinf(candidate))
+        else:
+            matched = operators[op](candidate, value)
+
+        if matched:
+            return True
+
+    return False
@@ -0,0 +1,81 @@
+from maya.api import OpenMaya
+
+
+# What discovery found out about a port so refreshes can skip it.
+class PortSchema(object):
+
+    def __init__(self, attr_type, is_multi, sub_multi_plug, element_type=None):
+        self.attr_type = attr_type
+        self.is_multi = is_multi
+        self.sub_multi_plug = sub_multi_plug
+        self.element_type = element_type
+
+
+# Caches the ports of each Bifrost graph along with their schemas.
+# A graph's entry is dropped as soon as one of its attributes is added or removed,
+# or when the node gets renamed or deleted, so the cache never needs to expire.
+class SchemaCache(object):
+
+    def __init__(self):
+        self.graphs = {}
+
+    def get_entry(self, bf_graph):
+        entry = self.graphs.get(bf_graph)
+
+        if entry is None:
+            entry = {
+                "ports": None,
+                "schemas": {},
+                "callbacks": self.add_callbacks(bf_graph)
+            }
+            self.graphs[bf_graph] = entry
+
+        return entry
+
+    def add_callbacks(self, bf_graph):
+        sel = OpenMaya.MSelectionList()
+        sel.add(bf_graph)
+        node = sel.getDependNode(0)
+
+        return [
+            OpenMaya.MNodeMessage.addAttributeAddedOrRemovedCallback(node, self.on_attribute_added_or_removed, bf_graph),
+            OpenMaya.MNodeMessage.addNameChangedCallback(node, self.on_name_changed, bf_graph),
+            OpenMaya.MNodeMessage.addNodePreRemovalCallback(node, self.on_node_removed, bf_graph)
+        ]
+
+    def get_ports(self, bf_graph):
+        entry = self.graphs.get(bf_graph)
+        if entry is not None:
+            return entry["ports"]
+
+    def set_ports(self, bf_graph, ports):
+        self.get_entry(bf_graph)["ports"] = list(ports)
+
+    def get_schema(self, bf_graph, plug_name):
+        entry = self.graphs.get(bf_graph)
+        if entry is not None:
+            return entry["schemas"].get(plug_name)
+
+    def set_schema(self, bf_graph, plug_name, schema):
+        self.get_entry(bf_graph)["schemas"][plug_name] = schema
+
+    def invalidate(self, bf_graph):
+        entry = self.graphs.pop(bf_graph, None)
+        if entry is not None:
+            OpenMaya.MMessage.removeCallbacks(entry["callbacks"])
+
+    def clear(self):
+        for bf_graph in list(self.graphs):
+            self.invalidate(bf_graph)
+
+    def on_attribute_added_or_removed(self, msg, plug, bf_graph):
+        self.invalidate(bf_graph)
+
+    def on_name_changed(self, node, prev_name, bf_graph):
+        self.invalidate(bf_graph)
+
+    def on_node_removed(self, node, bf_graph):
+        self.invalidate(bf_graph)
+
+
+cache = SchemaCache()
@@ -0,0 +1,144 @@
+import array
+
+try:
+    from itertools import zip_longest
+except ImportError:
+    from itertools import izip_longest as zip_longest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from bifrost_output_reader import column_store
+
+
+# Turns a QItemSelection into (first_row, last_row, first_column, last_column) spans, bounds included.
+# Working on spans avoids building an index per cell, which is millions of objects on big selections.
+def get_spans(item_selection):
+    return [
+        (selection_range.top(), selection_range.bottom(), selection_range.left(), selection_range.right())
+        for selection_range in item_selection]
+
+
+def count_cells(spans):
+    return sum([(last_row - first_row + 1) * (last_column - first_column + 1) for first_row, last_row, first_column, last_column in spans])
+
+
+# Returns the source rows shown by a span of view rows, as a (start, stop) range when no row map is used.
+def get_source_rows(row_map, first_row, last_row):
+    if row_map is None:
+        return first_row, last_row + 1
+    return row_map[first_row:last_row + 1]
+
+
+# Returns the values of each component at the source rows of an array, skipping rows past its end.
+def read_rows(store, column, rows):
+    length = store.array_length(column)
+
+    if isinstance(rows, tuple):
+        start, stop = rows[0], min(rows[1], length)
+        if start >= stop:
+            return [[] for i in range(store.width)]
+
+        # Windowed stores don't hold the values, so they're read from the port in one go.
+        if not hasattr(store, "components"):
+            return store.source.read_range(column, start, stop - start).components
+
+        offset = store.offsets[column]
+        return [to_list(component[offset + start:offset + stop]) for component in store.components]
+
+    if not hasattr(store, "components"):
+        values = [store.value(column, int(row)) for row in rows if row < length]
+        if store.width == 1:
+            return [values]
+        return [list(component) for component in zip(*values)] or [[] for i in range(store.width)]
+
+    offset = store.offsets[column]
+
+    if numpy is not None and store.is_numeric():
+        indices = numpy.asarray(rows, dtype=numpy.int64)
+        indices = indices[indices < length] + offset
+        return [as_numpy(component)[indices].tolist() for component in store.components]
+
+    return [[component[offset + row] for row in rows if row < length] for component in store.components]
+
+
+# NumPy values become Python ones so they print the same as the table's.
+def to_list(values):
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        return values.tolist()
+    return values
+
+
+def as_numpy(component):
+    if isinstance(component, array.array):
+        return numpy.frombuffer(component, dtype=component.typecode)
+    return numpy.asarray(component)
+
+
+# Copies the selected cells into a new store holding one array per column of each span.
+def get_selected_store(store, row_map, spans):
+    selected = column_store.ColumnStore(store.plug_type)
+
+    for first_row, last_row, first_column, last_column in spans:
+        rows = get_source_rows(row_map, first_row, last_row)
+
+        for column in range(first_column, last_column + 1):
+            components = read_rows(store, column, rows)
+
+            for buffer, values in zip(selected.components, components):
+                extend_buffer(buffer, values)
+
+            selected.offsets.append(selected.offsets[-1] + len(components[0]))
+
+    return selected
+
+
+def extend_buffer(buffer, values):
+    if isinstance(buffer, array.array) and isinstance(values, array.array) and buffer.typecode == values.typecode:
+        buffer.extend(values)
+    elif isinstance(buffer, array.array):
+        buffer.extend(array.array(buffer.typecode, values))
+    else:
+        buffer.extend(values)
+
+
+# Returns every value of a store as a list, tuples for types with many components.
+def get_values(store):
+    if store.width == 1:
+        return list(store.components[0])
+    return list(zip(*store.components))
+
+
+# Formats the selection as tab separated rows, one span after the other, the way spreadsheets paste it.
+def get_text(store, row_map, spans, formatter=str):
+    blocks = []
+
+    for first_row, last_row, first_column, last_column in spans:
+        rows = get_source_rows(row_map, first_row, last_row)
+
+        columns = []
+        for column in range(first_column, last_column + 1):
+            components = read_rows(store, column, rows)
+
+            if store.width == 1:
+                values = components[0]
+                if store.plug_type == "bool":
+                    values = [bool(value) for value in values]
+            else:
+                values = zip(*components)
+
+            cells = list(map(formatter, values))
+
+            # Mapped rows past the end of a shorter array are left blank to keep the others aligned.
+            if not isinstance(rows, tuple) and len(cells) < len(rows):
+                length = store.array_length(column)
+                cells = iter(cells)
+                cells = [next(cells) if row < length else "" for row in rows]
+
+            columns.append(cells)
+
+        blocks.append("\n".join(["\t".join(cells) for cells in zip_longest(*columns, fillvalue="")]))
+
+    return "\n".join(blocks)
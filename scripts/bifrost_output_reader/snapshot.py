@@ -0,0 +1,277 @@
+import sys
+import json
+import math
+import array
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from bifrost_output_reader import column_store
+
+
+snapshot_magic = b"BFORSNAP"
+snapshot_version = 1
+
+# Component buffers start on this boundary so they can be mapped as aligned arrays.
+data_alignment = 64
+
+max_reported_mismatches = 100
+
+
+# A store whose component buffers are memory-mapped from a snapshot file, so opening
+# and comparing a snapshot doesn't read it into Python objects.
+# Without NumPy the buffers are read into memory instead.
+class SnapshotStore(column_store.ColumnStore):
+
+    def __init__(self, plug_type, header):
+        super(SnapshotStore, self).__init__(plug_type)
+        self.header = header
+        self.typecode = header["typecode"]
+        self.offsets = array.array(column_store.index_typecode, header["offsets"])
+
+    def value(self, column, row):
+        value = super(SnapshotStore, self).value(column, row)
+
+        if numpy is None or self.plug_type == "bool":
+            return value
+
+        # Turns NumPy scalars back into Python values so they display like the live ones.
+        if self.width == 1:
+            return value.item()
+        return tuple([component.item() for component in value])
+
+
+def take_snapshot(store, path, bf_graph=None, plug_name=None):
+    if not isinstance(store, column_store.ColumnStore) or not store.is_numeric():
+        raise ValueError("Only fully loaded numeric ports can be snapshotted")
+
+    itemsize = array.array(store.typecode).itemsize
+
+    header = {
+        "plugType": store.plug_type,
+        "typecode": store.typecode,
+        "itemSize": itemsize,
+        "width": store.width,
+        "offsets": list(store.offsets),
+        "byteOrder": sys.byteorder,
+        "graph": bf_graph,
+        "port": plug_name
+    }
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix_size = len(snapshot_magic) + struct.calcsize("<II") + len(header_bytes)
+    padding = -prefix_size % data_alignment
+
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(snapshot_magic)
+        snapshot_file.write(struct.pack("<II", snapshot_version, len(header_bytes)))
+        snapshot_file.write(header_bytes)
+        snapshot_file.write(b"\0" * padding)
+
+        for component in store.components:
+            component.tofile(snapshot_file)
+
+
+def read_header(snapshot_file):
+    if snapshot_file.read(len(snapshot_magic)) != snapshot_magic:
+        raise ValueError("Not a Bifrost Output Reader snapshot")
+
+    version, header_length = struct.unpack("<II", snapshot_file.read(struct.calcsize("<II")))
+    if version > snapshot_version:
+        raise ValueError("Unsupported snapshot version: {}".format(version))
+
+    header = json.loads(snapshot_file.read(header_length).decode("utf-8"))
+
+    prefix_size = len(snapshot_magic) + struct.calcsize("<II") + header_length
+    header["dataOffset"] = prefix_size + (-prefix_size % data_alignment)
+
+    return header
+
+
+def load_snapshot(path):
+    with open(path, "rb") as snapshot_file:
+        header = read_header(snapshot_file)
+
+    store = SnapshotStore(header["plugType"], header)
+    total = header["offsets"][-1]
+    component_bytes = total * header["itemSize"]
+
+    if numpy is not None:
+        dtype = numpy.dtype(header["typecode"]).newbyteorder("<" if header["byteOrder"] == "little" else ">")
+
+        store.components = [
+            numpy.memmap(path, dtype=dtype, mode="r", offset=header["dataOffset"] + i * component_bytes, shape=(total,))
+            if total else numpy.zeros(0, dtype=dtype)
+            for i in range(store.width)]
+    else:
+        with open(path, "rb") as snapshot_file:
+            snapshot_file.seek(header["dataOffset"])
+
+            for component in store.components:
+                component.fromfile(snapshot_file, total)
+                if header["byteOrder"] != sys.byteorder:
+                    component.byteswap()
+
+    return store
+
+
+def get_empty_diff():
+    return {
+        "mismatchCount": 0,
+        "maxAbsError": 0,
+        "firstMismatches": [],
+        "lengthMismatches": [],
+        "mask": None,
+        "otherMask": None
+    }
+
+
+# Compares two stores element by element over the rows both of their arrays have.
+# Rows that only one of them has count as mismatches. Returns the number of mismatches,
+# the max abs error per component, the first mismatching (array, row) cells and masks
+# flagging the mismatching elements of each store.
+def compare_stores(store, other, max_mismatches=max_reported_mismatches):
+    if store.width != other.width:
+        raise ValueError("Can't compare {} with {}".format(store.plug_type, other.plug_type))
+
+    diff = get_empty_diff()
+
+    # Segments of (start in store, start in other, length) to compare.
+    segments = []
+    extra_rows = []
+
+    for column in range(min(store.array_count(), other.array_count())):
+        length = store.array_length(column)
+        other_length = other.array_length(column)
+        segments.append((store.offsets[column], other.offsets[column], min(length, other_length)))
+
+        if length != other_length:
+            diff["lengthMismatches"].append(column)
+            extra_rows.append((column, min(length, other_length), length, other_length))
+
+    for column in range(other.array_count(), store.array_count()):
+        extra_rows.append((column, 0, store.array_length(column), 0))
+    for column in range(store.array_count(), other.array_count()):
+        extra_rows.append((column, 0, 0, other.array_length(column)))
+
+    if numpy is not None:
+        compare_numpy(store, other, segments, diff)
+    else:
+        compare_builtin(store, other, segments, diff)
+
+    for column, first, length, other_length in extra_rows:
+        if column < store.array_count():
+            diff["mask"][store.offsets[column] + first:store.offsets[column] + length] = flag_values(length - first)
+        if column < other.array_count():
+            diff["otherMask"][other.offsets[column] + first:other.offsets[column] + other_length] = flag_values(other_length - first)
+        diff["mismatchCount"] += max(length, other_length) - first
+
+    diff["firstMismatches"] = get_first_mismatches(store, diff["mask"], max_mismatches)
+
+    return diff
+
+
+def flag_values(count):
+    if numpy is not None:
+        return True
+    return b"\1" * count
+
+
+def as_numpy(buffer):
+    if isinstance(buffer, numpy.ndarray):
+        return buffer
+    return numpy.frombuffer(buffer, dtype=buffer.typecode)
+
+
+def compare_numpy(store, other, segments, diff):
+    mask = numpy.zeros(store.total_length(), dtype=bool)
+    other_mask = numpy.zeros(other.total_length(), dtype=bool)
+    max_errors = [0.0] * store.width
+
+    for component, other_component, i in zip(store.components, other.components, range(store.width)):
+        values = as_numpy(component)
+        other_values = as_numpy(other_component)
+
+        for start, other_start, length in segments:
+            a = values[start:start + length]
+            b = other_values[other_start:other_start + length]
+
+            differs = a != b
+            if a.dtype.kind == "f":
+                # NaNs on both sides are considered equal.
+                differs &= ~(numpy.isnan(a) & numpy.isnan(b))
+
+            if not differs.any():
+                continue
+
+            mask[start:start + length] |= differs
+            other_mask[other_start:other_start + length] |= differs
+
+            errors = numpy.abs(a[differs].astype(numpy.float64) - b[differs].astype(numpy.float64))
+            errors = errors[numpy.isfinite(errors)]
+            if len(errors):
+                max_errors[i] = max(max_errors[i], float(errors.max()))
+
+    diff["mismatchCount"] = int(numpy.count_nonzero(mask))
+    diff["maxAbsError"] = collapse(max_errors)
+    diff["mask"] = mask
+    diff["otherMask"] = other_mask
+
+
+# Fallback without NumPy, the masks are bytearrays with a non-zero byte per mismatch.
+def compare_builtin(store, other, segments, diff):
+    mask = bytearray(store.total_length())
+    other_mask = bytearray(other.total_length())
+    max_errors = [0.0] * store.width
+
+    for component, other_component, i in zip(store.components, other.components, range(store.width)):
+        for start, other_start, length in segments:
+            for offset in range(length):
+                a = component[start + offset]
+                b = other_component[other_start + offset]
+
+                if a == b or (a != a and b != b):
+                    continue
+
+                mask[start + offset] = 1
+                other_mask[other_start + offset] = 1
+
+                error = abs(float(a) - float(b))
+                if not math.isnan(error) and not math.isinf(error):
+                    max_errors[i] = max(max_errors[i], error)
+
+    diff["mismatchCount"] = sum(1 for flag in mask if flag)
+    diff["maxAbsError"] = collapse(max_errors)
+    diff["mask"] = mask
+    diff["otherMask"] = other_mask
+
+
+def get_first_mismatches(store, mask, count):
+    if numpy is not None:
+        indices = numpy.flatnonzero(mask)[:count].tolist()
+    else:
+        indices = []
+        for index, flag in enumerate(mask):
+            if flag:
+                indices.append(index)
+                if len(indices) == count:
+                    break
+
+    cells = []
+    column = 0
+
+    for index in indices:
+        while index >= store.offsets[column + 1]:
+            column += 1
+        cells.append((column, index - store.offsets[column]))
+
+    return cells
+
+
+def collapse(values):
+    if len(values) == 1:
+        return values[0]
+    return tuple(values)
@@ -0,0 +1,99 @@
+import math
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from bifrost_output_reader import column_store
+from bifrost_output_reader import query
+
+
+def get_sort_keys(plug_type):
+    typecode, width = column_store.plug_layouts.get(plug_type, (None, 1))
+
+    if typecode is None:
+        return []
+    if plug_type == "matrix":
+        return sorted(query.translation_names) + [query.magnitude]
+    if width == 1:
+        return ["value"]
+    return query.component_names[:width] + [query.magnitude]
+
+
+# Returns the rows of an array ordered by one of its components, the length of its vectors
+# or a matrix's translation. NaNs go last, then the rows other arrays have but this one doesn't.
+# Either way equal values keep the order of their rows.
+def compute_permutation(store, column, key, descending=False):
+    start = store.offsets[column]
+    length = store.array_length(column)
+    component = query.get_component(key, store.plug_type, store.width)
+
+    if numpy is not None:
+        values = get_key_values_numpy(store, component, start, length)
+
+        if descending:
+            # Sorting the reversed values then reversing the result orders ties like their rows.
+            # NaNs end up first in their rows' order, so they're moved back to the end.
+            permutation = length - 1 - numpy.argsort(values[::-1], kind="mergesort")[::-1].astype(numpy.int64)
+            nan_count = int(numpy.count_nonzero(numpy.isnan(values))) if values.dtype.kind == "f" else 0
+            permutation = numpy.concatenate([permutation[nan_count:], permutation[:nan_count]])
+        else:
+            permutation = numpy.argsort(values, kind="mergesort").astype(numpy.int64)
+
+        return numpy.concatenate([permutation, numpy.arange(length, store.max_length(), dtype=numpy.int64)])
+
+    values = get_key_values(store, component, start, length)
+    sign = -1.0 if descending else 1.0
+    permutation = sorted(range(length), key=lambda row: (math.isnan(values[row]), sign * values[row]))
+    return array.array(column_store.index_typecode, permutation + list(range(length, store.max_length())))
+
+
+def get_key_values_numpy(store, component, start, length):
+    components = [
+        numpy.frombuffer(buffer, dtype=buffer.typecode)[start:start + length]
+        for buffer in store.components]
+
+    if component != query.magnitude:
+        return components[component]
+
+    squares = numpy.zeros(length, dtype=numpy.float64)
+    for values in query.get_magnitude_components(components, store.plug_type):
+        squares += numpy.square(values, dtype=numpy.float64)
+    return numpy.sqrt(squares)
+
+
+def get_key_values(store, component, start, length):
+    if component != query.magnitude:
+        return [float(value) for value in store.components[component][start:start + length]]
+
+    components = query.get_magnitude_components(store.components, store.plug_type)
+
+    return [
+        math.sqrt(sum([float(values[index]) ** 2 for values in components]))
+        for index in range(start, start + length)]
+
+
+# Keeps the rows of a permutation that are in the increasing rows, in the permutation's order.
+def restrict(permutation, rows, row_count):
+    if numpy is not None:
+        keep = numpy.zeros(row_count, dtype=bool)
+        keep[numpy.asarray(rows, dtype=numpy.int64)] = True
+        return permutation[keep[permutation]]
+
+    keep = set(rows)
+    return array.array(column_store.index_typecode, [row for row in permutation if row in keep])
+
+
+# Returns the index of each row in a permutation, -1 for rows that aren't in it.
+def invert(permutation, row_count):
+    if numpy is not None:
+        lookup = numpy.full(row_count, -1, dtype=numpy.int64)
+        lookup[numpy.asarray(permutation, dtype=numpy.int64)] = numpy.arange(len(permutation), dtype=numpy.int64)
+        return lookup
+
+    lookup = array.array(column_store.index_typecode, [-1]) * row_count
+    for index, row in enumerate(permutation):
+        lookup[row] = index
+    return lookup
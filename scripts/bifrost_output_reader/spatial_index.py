@@ -0,0 +1,261 @@
+import math
+from bisect import bisect_right
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from bifrost_output_reader import query
+
+
+position_types = ["float3", "double3", "short3", "long3", "matrix"]
+
+# Average number of points per cell the grid is sized for.
+points_per_cell = 4
+
+max_resolution = 1024
+
+
+def get_position_components(store):
+    if store.plug_type == "matrix":
+        return [store.components[index] for index in sorted(query.translation_names.values())]
+    return store.components[:3]
+
+
+# Buckets a port's positions, or its matrices' translations, in a uniform grid so nearest and
+# radius queries only measure the points of the cells around them.
+# Points are identified by their index over every array of the store, non-finite ones are left out.
+class SpatialGrid(object):
+
+    def __init__(self, store):
+        self.size = 0
+        self.minimum = [0.0, 0.0, 0.0]
+        self.cell_size = 1.0
+        self.shape = [1, 1, 1]
+
+        components = get_position_components(store)
+
+        if numpy is not None:
+            self.build_numpy(components, store.total_length())
+        else:
+            self.build_builtin(components, store.total_length())
+
+    def set_resolution(self, count, minimum, maximum):
+        extents = [high - low for low, high in zip(minimum, maximum)]
+        spread_extents = [extent for extent in extents if extent > 0]
+
+        # Cells are cubes sized so there's about points_per_cell points per cell,
+        # only counting the axes the points spread on so flat clouds still get fine cells.
+        if spread_extents:
+            volume = 1.0
+            for extent in spread_extents:
+                volume *= extent
+            cell_count = max(count / float(points_per_cell), 1.0)
+            self.cell_size = (volume / cell_count) ** (1.0 / len(spread_extents))
+            self.cell_size = max(self.cell_size, max(spread_extents) / (max_resolution - 1))
+
+        self.minimum = list(minimum)
+        self.shape = [min(max(int(extent / self.cell_size) + 1, 1), max_resolution) for extent in extents]
+
+    def get_cell(self, point):
+        return [int(math.floor((point[axis] - self.minimum[axis]) / self.cell_size)) for axis in range(3)]
+
+    def get_key(self, x, y, z):
+        return x + self.shape[0] * (y + self.shape[1] * z)
+
+    # Clips a box of cells to the grid, returning None if it's outside of it.
+    def clip_box(self, first, last):
+        first = [max(value, 0) for value in first]
+        last = [min(value, size - 1) for value, size in zip(last, self.shape)]
+        if any([low > high for low, high in zip(first, last)]):
+            return
+        return first, last
+
+    # Returns the index of the closest point and its distance, or None if there are no points.
+    def nearest(self, point):
+        if not self.size:
+            return
+
+        cell = [min(max(value, 0), size - 1) for value, size in zip(self.get_cell(point), self.shape)]
+
+        # Grows a box of cells around the point until no cell outside of it can be closer than the best point.
+        ring = 0
+        step = 1
+        best = None
+
+        while True:
+            box = self.clip_box([value - ring for value in cell], [value + ring for value in cell])
+
+            candidate = self.find_closest(box, point)
+            if candidate is not None and (best is None or candidate[1] < best[1]):
+                best = candidate
+
+            outside_distance = self.get_outside_distance(box, point)
+            if outside_distance is None or (best is not None and best[1] <= outside_distance):
+                return best
+
+            ring += step
+            step *= 2
+
+    # Returns the distance from a point to the closest part of the grid outside a box of cells,
+    # or None if the box covers the whole grid.
+    def get_outside_distance(self, box, point):
+        first, last = box
+        grid_low = self.minimum
+        grid_high = [low + size * self.cell_size for low, size in zip(self.minimum, self.shape)]
+
+        distances = []
+
+        for axis in range(3):
+            if first[axis] > 0:
+                high = list(grid_high)
+                high[axis] = grid_low[axis] + first[axis] * self.cell_size
+                distances.append(get_box_distance(point, grid_low, high))
+
+            if last[axis] < self.shape[axis] - 1:
+                low = list(grid_low)
+                low[axis] = grid_low[axis] + (last[axis] + 1) * self.cell_size
+                distances.append(get_box_distance(point, low, grid_high))
+
+        if distances:
+            return min(distances)
+
+    # Returns the indices of the points within a distance of a point, in increasing order.
+    def within_radius(self, point, radius):
+        if not self.size or radius < 0:
+            return []
+
+        box = self.clip_box(
+            self.get_cell([value - radius for value in point]),
+            self.get_cell([value + radius for value in point]))
+        if box is None:
+            return []
+
+        return self.find_within(box, point, radius)
+
+    def build_numpy(self, components, count):
+        points = numpy.empty((count, 3), dtype=numpy.float64)
+        for axis, component in enumerate(components):
+            points[:, axis] = numpy.frombuffer(component, dtype=component.typecode)[:count]
+
+        indices = numpy.flatnonzero(numpy.isfinite(points).all(axis=1))
+        points = points[indices]
+
+        self.size = len(indices)
+        if not self.size:
+            return
+
+        self.set_resolution(self.size, points.min(axis=0).tolist(), points.max(axis=0).tolist())
+
+        cells = numpy.floor((points - numpy.array(self.minimum)) / self.cell_size).astype(numpy.int64)
+        cells = numpy.minimum(numpy.maximum(cells, 0), numpy.array(self.shape) - 1)
+        keys = self.get_key(cells[:, 0], cells[:, 1], cells[:, 2])
+
+        order = numpy.argsort(keys, kind="mergesort")
+        self.keys = keys[order]
+        self.indices = indices[order]
+        self.points = points[order]
+
+    def build_builtin(self, components, count):
+        self.cells = {}
+        self.points = {}
+
+        found = []
+        for index, point in enumerate(zip(*[component[:count] for component in components])):
+            point = [float(value) for value in point]
+            if all([not math.isnan(value) and not math.isinf(value) for value in point]):
+                self.points[index] = point
+                found.append(index)
+
+        self.size = len(found)
+        if not self.size:
+            return
+
+        self.set_resolution(
+            self.size,
+            [min([self.points[index][axis] for index in found]) for axis in range(3)],
+            [max([self.points[index][axis] for index in found]) for axis in range(3)])
+
+        for index in found:
+            cell = [min(max(value, 0), size - 1) for value, size in zip(self.get_cell(self.points[index]), self.shape)]
+            self.cells.setdefault(self.get_key(*cell), []).append(index)
+
+    # Returns the positions, in the sorted points, of the points in a box of cells.
+    # A row of cells along x is a contiguous range of keys, so each one is found with two searches.
+    def get_box_positions_numpy(self, box):
+        first, last = box
+
+        rows = (last[1] - first[1] + 1) * (last[2] - first[2] + 1)
+        if rows >= self.size:
+            return numpy.arange(self.size)
+
+        y, z = numpy.meshgrid(
+            numpy.arange(first[1], last[1] + 1, dtype=numpy.int64),
+            numpy.arange(first[2], last[2] + 1, dtype=numpy.int64))
+        row_keys = self.get_key(0, y.ravel(), z.ravel())
+
+        starts = numpy.searchsorted(self.keys, row_keys + first[0], side="left")
+        stops = numpy.searchsorted(self.keys, row_keys + last[0], side="right")
+        lengths = stops - starts
+
+        total = int(lengths.sum())
+        if not total:
+            return numpy.zeros(0, dtype=numpy.int64)
+
+        # Concatenates the ranges without a loop by offsetting a running count.
+        range_offsets = numpy.repeat(starts - (numpy.cumsum(lengths) - lengths), lengths)
+        return range_offsets + numpy.arange(total)
+
+    def get_box_indices_builtin(self, box):
+        first, last = box
+        indices = []
+
+        for z in range(first[2], last[2] + 1):
+            for y in range(first[1], last[1] + 1):
+                for x in range(first[0], last[0] + 1):
+                    indices.extend(self.cells.get(self.get_key(x, y, z), []))
+
+        return indices
+
+    def find_closest(self, box, point):
+        if numpy is not None:
+            positions = self.get_box_positions_numpy(box)
+            if not len(positions):
+                return
+
+            distances = numpy.square(self.points[positions] - numpy.array(point, dtype=numpy.float64)).sum(axis=1)
+            closest = int(numpy.argmin(distances))
+            return int(self.indices[positions[closest]]), math.sqrt(float(distances[closest]))
+
+        best = None
+        for index in self.get_box_indices_builtin(box):
+            distance = sum([(value - other) ** 2 for value, other in zip(self.points[index], point)])
+            if best is None or distance < best[1]:
+                best = index, distance
+
+        if best is not None:
+            return best[0], math.sqrt(best[1])
+
+    def find_within(self, box, point, radius):
+        if numpy is not None:
+            positions = self.get_box_positions_numpy(box)
+            distances = numpy.square(self.points[positions] - numpy.array(point, dtype=numpy.float64)).sum(axis=1)
+            return numpy.sort(self.indices[positions[distances <= radius * radius]])
+
+        return sorted([
+            index for index in self.get_box_indices_builtin(box)
+            if sum([(value - other) ** 2 for value, other in zip(self.points[index], point)]) <= radius * radius])
+
+
+def get_box_distance(point, low, high):
+    return math.sqrt(sum([max(low_value - value, 0.0, value - high_value) ** 2 for value, low_value, high_value in zip(point, low, high)]))
+
+
+# Splits indices over every array of a store into (column, row) cells.
+def get_cells(store, indices):
+    cells = []
+    for index in indices:
+        column = bisect_right(store.offsets, index) - 1
+        cells.append((column, int(index) - store.offsets[column]))
+    return cells
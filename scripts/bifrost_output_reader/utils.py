@@ -1,25 +1,32 @@
 import sys
 import shiboken2
-from operator import itemgetter
 
 from PySide2 import QtCore
 from PySide2 import QtGui
 from PySide2 import QtWidgets
 
-import maya.cmds as cmds
 import maya.OpenMayaUI as OpenMayaUI
 
+# The reading functions live in core so they can run without a GUI, they're
+# re-exported here for the tool and for scripts that used them from utils.
+from bifrost_output_reader.core import (
+    openmaya_reader,
+    array_types,
+    bulk_read_types,
+    bulk_read_chunk_size,
+    backends,
+    get_ports_from_bf_graph,
+    get_port_schema,
+    get_default_backend,
+    extract_data_from_port,
+    read_port_data,
+    get_port_sub_plugs,
+    read_plug_range,
+    read_plug_range_bulk,
+    normalize_bulk_values,
+    get_type_width,
+    serialize_data)
 
-array_types = [
-    "TdataCompound",
-    "float2",
-    "float3",
-    "double2",
-    "double3",
-    "long2",
-    "long3",
-    "short2",
-    "short3"]
 
 int_color = QtGui.QColor(98, 207, 217)
 float_color = QtGui.QColor(130, 217, 159)
@@ -58,6 +65,10 @@ def get_maya_window():
     return shiboken2.wrapInstance(ptr, QtWidgets.QWidget)
 
 
+def is_valid_widget(widget):
+    return shiboken2.isValid(widget)
+
+
 def wrap_layout(widgets, orientation=QtCore.Qt.Vertical, parent=None):
     if orientation == QtCore.Qt.Horizontal:
         new_layout = QtWidgets.QHBoxLayout()
@@ -86,121 +97,3 @@ def wrap_layout(widgets, orientation=QtCore.Qt.Vertical, parent=None):
                 new_layout.addLayout(widget)
 
     return new_layout
-
-
-def get_ports_from_bf_graph(bf_graph):
-    invalid_attrs = ["message", "mesh", "dirtyFlag"]
-    invalid_attr_types = ["bifData"]
-    attrs = cmds.listAttr(bf_graph, hasData=True, userDefined=True, readOnly=True) or []
-
-    ports = []
-
-    for attr in sorted(attrs):
-        if attr in invalid_attrs or "." in attr:
-            continue
-
-        if cmds.attributeQuery(attr, node=bf_graph, listParent=True):
-            continue
-
-        if cmds.getAttr("{}.{}".format(bf_graph, attr), type=True) in invalid_attr_types:
-            continue
-
-        ports.append(attr)
-
-    return ports
-
-
-def extract_data_from_port(bf_graph, plug_name):
-    data = []
-    plug_type = None
-
-    if not cmds.attributeQuery(plug_name, node=bf_graph, exists=True):
-        return
-
-    plug = "{}.{}".format(bf_graph, plug_name)
-    try:
-        cmds.getAttr(plug)  # Force output to pull data for access.
-    except:
-        pass
-
-    attr_type = cmds.getAttr(plug, type=True)
-    if attr_type == "bifData":
-        return
-
-    # Determine if it's a 2D array.
-    sub_multi_plug = None
-    for sub_plug in cmds.listAttr(plug)[1:]:
-        sub_plug_name = sub_plug.split(".")[-1]
-        if cmds.attributeQuery(sub_plug_name, node=bf_graph, multi=True):
-            sub_multi_plug = sub_plug_name
-            break
-
-    is_multi_plug = cmds.attributeQuery(plug_name, node=bf_graph, multi=True)
-    array_size = cmds.getAttr(plug, size=True)
-
-    if sub_multi_plug:
-        for index in range(array_size):
-            values = []
-            sub_array_size = cmds.getAttr("{}[{}].{}".format(plug, index, sub_multi_plug), size=True)
-            for sub_index in range(sub_array_size):
-                if plug_type is None:
-                    plug_type = cmds.getAttr("{}[{}].{}[{}]".format(plug, index, sub_multi_plug, sub_index), type=True)
-                raw_value = cmds.getAttr("{}[{}].{}[{}]".format(plug, index, sub_multi_plug, sub_index))
-                value = serialize_data(raw_value, plug_type)
-                values.append(value)
-            data.append(values)
-    else:
-        if is_multi_plug:
-            values = []
-            for index in range(array_size):
-                if plug_type is None:
-                    plug_type = cmds.getAttr("{}[{}]".format(plug, index), type=True)
-                value = serialize_data(cmds.getAttr("{}[{}]".format(plug, index)), plug_type)
-                values.append(value)
-            data.append(values)
-        else:
-            plug_type = attr_type
-            value = serialize_data(cmds.getAttr(plug), plug_type)
-            data.append([value])
-
-    data_length = 0
-    min_value = 0
-    max_value = 0
-
-    if len(data[0]):
-        data_length = len(data[0])
-
-        if type(data[0][0]) == tuple:
-            min_value = []
-            max_value = []
-            tuple_length = len(data[0][0])
-
-            for i in range(tuple_length):
-                min_value.append(min(data[0], key=itemgetter(i))[i])
-                max_value.append(max(data[0], key=itemgetter(i))[i])
-
-            min_value = tuple(min_value)
-            max_value = tuple(max_value)
-        else:
-            min_value = min(data[0])
-            max_value = max(data[0])
-
-    return {
-        "data": data,
-        "plugType": plug_type,
-        "dataLength": data_length,
-        "minValue": min_value,
-        "maxValue": max_value
-    }
-
-
-def serialize_data(data, data_type):
-    if data_type in array_types:
-        value = data[0]
-    else:
-        value = data
-
-    if type(value) == list:
-        value = tuple(value)
-
-    return value
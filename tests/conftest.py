@@ -0,0 +1,45 @@
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+
+# The data modules only need maya for reading ports, so a stub is enough to import them outside of Maya.
+try:
+    import maya.cmds
+except ImportError:
+    for name in ["maya", "maya.cmds", "maya.api", "maya.api.OpenMaya"]:
+        sys.modules[name] = types.ModuleType(name)
+    sys.modules["maya"].cmds = sys.modules["maya.cmds"]
+    sys.modules["maya"].api = sys.modules["maya.api"]
+    sys.modules["maya.api"].OpenMaya = sys.modules["maya.api.OpenMaya"]
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from bifrost_output_reader import column_store
+from bifrost_output_reader import port_stats
+from bifrost_output_reader import query
+from bifrost_output_reader import sorting
+from bifrost_output_reader import spatial_index
+from bifrost_output_reader import histogram
+from bifrost_output_reader import snapshot
+
+
+numpy_modules = [column_store, port_stats, query, sorting, spatial_index, histogram, snapshot]
+
+
+# Runs a test with NumPy and with the builtin fallbacks.
+@pytest.fixture(params=["numpy", "builtin"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        if numpy is None:
+            pytest.skip("NumPy isn't installed")
+    else:
+        for module in numpy_modules:
+            monkeypatch.setattr(module, "numpy", None)
+    return request.param
@@ -0,0 +1,58 @@
+import math
+
+from bifrost_output_reader import column_store
+
+
+def test_find_changed_ranges(backend):
+    old_store = column_store.ColumnStore.from_values([list(range(100))], "long")
+    new_values = list(range(100))
+    new_values[5] = -1
+    new_values[42] = -1
+    new_values[43] = -1
+    new_store = column_store.ColumnStore.from_values([new_values], "long")
+
+    assert column_store.find_changed_ranges(old_store, new_store, 0, chunk_size=10) == [[0, 10], [40, 50]]
+
+
+def test_find_changed_ranges_merges_neighbours(backend):
+    old_store = column_store.ColumnStore.from_values([[0.0] * 25], "float")
+    new_store = column_store.ColumnStore.from_values([[0.0] * 9 + [1.0, 1.0] + [0.0] * 14], "float")
+
+    assert column_store.find_changed_ranges(old_store, new_store, 0, chunk_size=10) == [[0, 20]]
+
+
+def test_find_changed_ranges_ignores_same_nans(backend):
+    values = [(float("nan"), 1.0), (2.0, float("nan"))]
+    old_store = column_store.ColumnStore.from_values([values], "double2")
+    new_store = column_store.ColumnStore.from_values([values], "double2")
+
+    assert column_store.find_changed_ranges(old_store, new_store, 0) == []
+
+
+def test_find_changed_ranges_second_array(backend):
+    old_store = column_store.ColumnStore.from_values([[1, 2, 3], [4, 5, 6, 7]], "long")
+    new_store = column_store.ColumnStore.from_values([[1, 2, 3], [4, 5, 9]], "long")
+
+    assert column_store.find_changed_ranges(old_store, new_store, 0, chunk_size=2) == []
+    assert column_store.find_changed_ranges(old_store, new_store, 1, chunk_size=2) == [[2, 3]]
+
+
+def test_subtract_spans():
+    assert column_store.subtract_spans([], 0, 4) == [(0, 4)]
+    assert column_store.subtract_spans([(0, 5), (10, 15)], 3, 20) == [(5, 10), (15, 20)]
+    assert column_store.subtract_spans([(0, 10)], 2, 8) == []
+
+
+def test_merge_span():
+    assert column_store.merge_span([(0, 5), (10, 15)], 5, 10) == [(0, 15)]
+    assert column_store.merge_span([(0, 5)], 7, 9) == [(0, 5), (7, 9)]
+    assert column_store.merge_span([(7, 9)], 0, 5) == [(0, 5), (7, 9)]
+
+
+def test_value():
+    store = column_store.ColumnStore.from_values([[(1.0, 2.0, 3.0)], [(4.0, 5.0, 6.0), (7.0, math.pi, 8.0)]], "double3")
+
+    assert store.array_count() == 2
+    assert store.max_length() == 2
+    assert store.value(1, 1) == (7.0, math.pi, 8.0)
+    assert list(store[0]) == [(1.0, 2.0, 3.0)]
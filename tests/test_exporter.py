@@ -0,0 +1,86 @@
+import csv
+
+import pytest
+
+from bifrost_output_reader import column_store
+from bifrost_output_reader import exporter
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def make_store():
+    return column_store.ColumnStore.from_values(
+        [[(1.0, 2.0, 3.0), (4.0, float("inf"), 6.0)], [], [(-1.5, 0.0, 7.25)]], "float3")
+
+
+def assert_stores_equal(store, other):
+    assert store.plug_type == other.plug_type
+    assert list(store.offsets) == list(other.offsets)
+    assert [list(component) for component in store.components] == [list(component) for component in other.components]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_binary_round_trip(tmp_path, chunk_size):
+    store = make_store()
+    path = str(tmp_path / "values.bin")
+
+    assert exporter.export_store(store, path, chunk_size=chunk_size) == 3
+    assert_stores_equal(exporter.read_binary(path), store)
+
+
+def test_csv_round_trip(tmp_path):
+    store = column_store.ColumnStore.from_values([[True, False], [True]], "bool")
+    path = str(tmp_path / "values.csv")
+
+    exporter.export_store(store, path, chunk_size=1)
+
+    with open(path) as csv_file:
+        rows = list(csv.reader(csv_file))
+
+    assert rows == [["array", "index", "value"], ["0", "0", "True"], ["0", "1", "False"], ["1", "0", "True"]]
+
+
+def test_csv_matrix_header(tmp_path):
+    store = column_store.ColumnStore.from_values([[tuple(range(16))]], "matrix")
+    path = str(tmp_path / "values.csv")
+
+    exporter.export_store(store, path)
+
+    with open(path) as csv_file:
+        header = next(csv.reader(csv_file))
+
+    assert header[2:] == ["m{}{}".format(row, column) for row in range(4) for column in range(4)]
+
+
+@pytest.mark.skipif(numpy is None, reason="NumPy isn't installed")
+def test_npy_round_trip(tmp_path):
+    store = make_store()
+    path = str(tmp_path / "values.npy")
+
+    exporter.export_store(store, path, chunk_size=2)
+
+    values = numpy.load(path)
+    assert values.shape == (3, 3)
+    assert values.dtype == numpy.float32
+    assert values.tolist() == [list(value) for value in zip(*store.components)]
+
+    offsets = numpy.load(str(tmp_path / "values.offsets.npy"))
+    assert offsets.tolist() == [0, 2, 2, 3]
+
+
+@pytest.mark.skipif(numpy is None, reason="NumPy isn't installed")
+def test_npy_matrix_shape(tmp_path):
+    store = column_store.ColumnStore.from_values([[tuple(float(value) for value in range(16))]], "matrix")
+    path = str(tmp_path / "values.npy")
+
+    exporter.export_store(store, path)
+
+    assert numpy.load(path).tolist() == [[[0.0, 1.0, 2.0, 3.0], [4.0, 5.0, 6.0, 7.0], [8.0, 9.0, 10.0, 11.0], [12.0, 13.0, 14.0, 15.0]]]
+
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        exporter.get_format("values.txt")
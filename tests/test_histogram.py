@@ -0,0 +1,58 @@
+import random
+
+from bifrost_output_reader import column_store
+from bifrost_output_reader import histogram
+from bifrost_output_reader import query
+
+
+def test_compute_histogram(backend):
+    store = column_store.ColumnStore.from_values([[0.0, 1.0, 2.0, 3.0, float("nan"), float("inf")]], "double")
+    result = histogram.compute_histogram(store, "value", bin_count=4)
+
+    assert result.counts == [1, 1, 1, 1]
+    assert result.nan_count == 1
+    assert result.inf_count == 1
+    assert (result.low, result.high) == (0.0, 3.0)
+
+
+def test_single_value(backend):
+    store = column_store.ColumnStore.from_values([[2, 2, 2]], "long")
+    result = histogram.compute_histogram(store, "value", bin_count=4)
+
+    assert result.total() == 3
+    assert result.low < 2 < result.high
+
+
+# Values added as a store loads land in bins that hold them, even after the range grew.
+def test_update_histogram_keeps_counts_exact(backend):
+    rng = random.Random(0)
+    values = [rng.uniform(0, 1) for i in range(100)] + [rng.uniform(-50, 80) for i in range(300)]
+
+    result = histogram.Histogram("value", bin_count=8)
+    store = column_store.ColumnStore("double")
+    store.begin_array()
+    for start in range(0, len(values), 50):
+        store.extend_last_array(column_store.ColumnStore.from_values([values[start:start + 50]], "double"))
+        histogram.update_histogram(result, store)
+
+    assert result.consumed == len(values)
+    assert result.total() == len(values)
+    assert result.low <= min(values) and max(values) <= result.high
+
+    edges = result.get_edges()
+    for index, count in enumerate(result.counts):
+        low, high = edges[index], edges[index + 1]
+        in_bin = [value for value in values if low <= value < high or (index == len(result.counts) - 1 and value == high)]
+        assert count == len(in_bin)
+
+
+# A bin's range used as a filter matches as many rows as the bin holds.
+def test_bin_range_matches_filter(backend):
+    rng = random.Random(1)
+    store = column_store.ColumnStore.from_values([[(rng.uniform(-1, 1), 0.0) for i in range(200)]], "double2")
+    result = histogram.compute_histogram(store, "x", bin_count=8)
+
+    for index, count in enumerate(result.counts[:-1]):
+        low, high = result.get_bin_range(index)
+        groups = query.parse_query("x >= {!r} and x < {!r}".format(low, high), "double2")
+        assert len(query.filter_rows(store, groups)) == count
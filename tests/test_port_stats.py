@@ -0,0 +1,85 @@
+import math
+
+import pytest
+
+from bifrost_output_reader import column_store
+from bifrost_output_reader import port_source
+from bifrost_output_reader import port_stats
+
+
+nan = float("nan")
+inf = float("inf")
+
+
+def stream_stats(store, chunk_size):
+    stats = port_stats.StreamingStats(store.plug_type)
+    return port_source.read_all(port_source.StoreSource(store), stats, chunk_size).get_stats()
+
+
+def assert_stats_equal(stats, expected):
+    for key in ["nanCount", "infCount", "argMin", "argMax", "minValue", "maxValue"]:
+        assert stats[key] == expected[key], key
+
+    for key in ["mean", "stdDev"]:
+        assert stats[key] == pytest.approx(expected[key]), key
+
+
+def test_compute_stats(backend):
+    store = column_store.ColumnStore.from_values([[3.0, -1.0, nan], [4.0, inf, 2.0]], "double")
+    stats = port_stats.compute_stats(store)
+
+    assert stats["minValue"] == -1.0
+    assert stats["maxValue"] == 4.0
+    assert stats["argMin"] == (0, 1)
+    assert stats["argMax"] == (1, 0)
+    assert stats["nanCount"] == 1
+    assert stats["infCount"] == 1
+    assert stats["mean"] == pytest.approx(2.0)
+    assert stats["stdDev"] == pytest.approx(math.sqrt(3.5))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 100])
+def test_streaming_stats_match_compute_stats(backend, chunk_size):
+    arrays = [
+        [(1.0, nan), (5.0, 2.0), (-3.0, 8.0), (5.0, inf)],
+        [(0.5, -4.0), (nan, 1.0)],
+        [(2.0, 3.0), (7.0, 3.0), (-3.0, 0.0)]
+    ]
+    store = column_store.ColumnStore.from_values(arrays, "double2")
+
+    assert_stats_equal(stream_stats(store, chunk_size), port_stats.compute_stats(store))
+
+
+def test_streaming_stats_keep_first_occurrence(backend):
+    store = column_store.ColumnStore.from_values([[2, 1, 3], [1, 3, 2]], "long")
+    stats = stream_stats(store, 1)
+
+    assert stats["argMin"] == (0, 1)
+    assert stats["argMax"] == (0, 2)
+
+
+def test_components_without_finite_values(backend):
+    store = column_store.ColumnStore.from_values([[(nan, 1.0), (inf, 2.0)]], "double2")
+
+    for stats in [port_stats.compute_stats(store), stream_stats(store, 1)]:
+        assert stats["minValue"] == (None, 1.0)
+        assert stats["maxValue"] == (None, 2.0)
+        assert stats["mean"][0] is None
+        assert stats["nanCount"] == (1, 0)
+        assert stats["infCount"] == (1, 0)
+        assert port_stats.format_stat(stats["minValue"]) == "(n/a, 1.0)"
+
+
+def test_bool_stats(backend):
+    store = column_store.ColumnStore.from_values([[False, True, True]], "bool")
+
+    for stats in [port_stats.compute_stats(store), stream_stats(store, 2)]:
+        assert stats["minValue"] is False
+        assert stats["maxValue"] is True
+
+
+def test_empty_stats():
+    store = column_store.ColumnStore.from_values([[]], "float")
+
+    assert port_stats.compute_stats(store) == port_stats.get_empty_stats()
+    assert port_stats.format_stat(port_stats.get_empty_stats()["mean"]) == "n/a"
@@ -0,0 +1,59 @@
+import pytest
+
+from bifrost_output_reader import column_store
+from bifrost_output_reader import query
+
+
+nan = float("nan")
+inf = float("inf")
+
+
+def filter_rows(store, text):
+    return [int(row) for row in query.filter_rows(store, query.parse_query(text, store.plug_type))]
+
+
+def make_store():
+    return column_store.ColumnStore.from_values([
+        [(1.0, -2.0, 0.0), (3.0, 4.0, 0.0), (nan, 1.0, 0.0)],
+        [(0.0, 0.0, inf), (-1.0, 5.0, 2.0), (0.5, 0.5, 0.5), (9.0, 9.0, 9.0)]
+    ], "double3")
+
+
+@pytest.mark.parametrize("text, rows", [
+    ("y < 0", [0]),
+    ("x > 0.5 and y > 0", [1, 3]),
+    ("y < 0 or z >= 9", [0, 3]),
+    ("nan(x)", [2]),
+    ("inf", [0]),
+    ("mag > 4.9", [0, 1, 3]),
+    ("X == 0.5", [2]),
+    ("x > 1e1", [])
+])
+def test_filter_rows(backend, text, rows):
+    assert filter_rows(make_store(), text) == rows
+
+
+def test_filter_float_rows_like_doubles(backend):
+    store = column_store.ColumnStore.from_values([[0.1, 0.2]], "float")
+
+    assert filter_rows(store, "value > 0.1") == [0, 1]
+
+
+def test_filter_matrices_by_translation(backend):
+    matrix = [0.0] * 16
+    matrix[13] = 2.0
+    store = column_store.ColumnStore.from_values([[tuple([0.0] * 16), tuple(matrix)]], "matrix")
+
+    assert filter_rows(store, "ty > 1") == [1]
+    assert filter_rows(store, "m31 > 1") == [1]
+
+
+@pytest.mark.parametrize("text, plug_type", [
+    ("w > 0", "float3"),
+    ("x >", "float3"),
+    ("mag > 1", "float"),
+    ("value > 1", "string")
+])
+def test_parse_errors(text, plug_type):
+    with pytest.raises(query.QueryError):
+        query.parse_query(text, plug_type)
@@ -0,0 +1,70 @@
+import pytest
+
+from bifrost_output_reader import column_store
+from bifrost_output_reader import snapshot
+
+
+nan = float("nan")
+
+
+def test_compare_equal_stores(backend):
+    store = column_store.ColumnStore.from_values([[1.0, nan, 3.0]], "double")
+    other = column_store.ColumnStore.from_values([[1.0, nan, 3.0]], "double")
+    diff = snapshot.compare_stores(store, other)
+
+    assert diff["mismatchCount"] == 0
+    assert diff["maxAbsError"] == 0
+    assert diff["firstMismatches"] == []
+    assert diff["lengthMismatches"] == []
+
+
+def test_compare_stores(backend):
+    store = column_store.ColumnStore.from_values([[(1.0, 2.0), (3.0, 4.0)], [(5.0, 6.0)]], "double2")
+    other = column_store.ColumnStore.from_values([[(1.0, 2.5), (3.0, 4.0)], [(5.0, nan)]], "double2")
+    diff = snapshot.compare_stores(store, other)
+
+    assert diff["mismatchCount"] == 2
+    assert diff["maxAbsError"] == (0.0, 0.5)
+    assert diff["firstMismatches"] == [(0, 0), (1, 0)]
+    assert [bool(flag) for flag in diff["mask"]] == [True, False, True]
+    assert [bool(flag) for flag in diff["otherMask"]] == [True, False, True]
+
+
+def test_compare_stores_of_different_lengths(backend):
+    store = column_store.ColumnStore.from_values([[1, 2, 3], [4]], "long")
+    other = column_store.ColumnStore.from_values([[1, 2], [4], [5, 6]], "long")
+    diff = snapshot.compare_stores(store, other)
+
+    assert diff["lengthMismatches"] == [0]
+    assert diff["mismatchCount"] == 3
+    assert diff["firstMismatches"] == [(0, 2)]
+    assert [bool(flag) for flag in diff["mask"]] == [False, False, True, False]
+    assert [bool(flag) for flag in diff["otherMask"]] == [False, False, False, True, True]
+
+
+def test_compare_different_types():
+    store = column_store.ColumnStore.from_values([[1.0]], "float")
+    other = column_store.ColumnStore.from_values([[(1.0, 2.0, 3.0)]], "float3")
+
+    with pytest.raises(ValueError):
+        snapshot.compare_stores(store, other)
+
+
+def test_snapshot_round_trip(backend, tmp_path):
+    store = column_store.ColumnStore.from_values([[(1.0, 2.0, 3.0)], [(4.0, nan, 6.0), (7.0, 8.0, 9.0)]], "float3")
+    path = str(tmp_path / "values.bfsnap")
+
+    snapshot.take_snapshot(store, path, "bifrostGraph1", "points")
+    loaded = snapshot.load_snapshot(path)
+
+    assert loaded.header["graph"] == "bifrostGraph1"
+    assert list(loaded.offsets) == list(store.offsets)
+    assert loaded.value(0, 0) == (1.0, 2.0, 3.0)
+    assert snapshot.compare_stores(store, loaded)["mismatchCount"] == 0
+
+
+def test_snapshot_needs_numeric_store(tmp_path):
+    store = column_store.ColumnStore.from_values([["a"]], "string")
+
+    with pytest.raises(ValueError):
+        snapshot.take_snapshot(store, str(tmp_path / "values.bfsnap"))
@@ -0,0 +1,70 @@
+import pytest
+
+from bifrost_output_reader import column_store
+from bifrost_output_reader import sorting
+
+
+nan = float("nan")
+
+
+def sort_rows(store, column, key, descending=False):
+    return [int(row) for row in sorting.compute_permutation(store, column, key, descending)]
+
+
+def test_sort_ascending_with_nans(backend):
+    store = column_store.ColumnStore.from_values([[3.0, nan, 1.0, 2.0, nan, 1.0]], "double")
+
+    assert sort_rows(store, 0, "value") == [2, 5, 3, 0, 1, 4]
+
+
+def test_sort_descending_with_nans(backend):
+    store = column_store.ColumnStore.from_values([[3.0, nan, 1.0, 2.0, nan, 1.0]], "double")
+
+    assert sort_rows(store, 0, "value", descending=True) == [0, 3, 2, 5, 1, 4]
+
+
+def test_sort_integers_descending(backend):
+    store = column_store.ColumnStore.from_values([[2, 5, 2, -1]], "long")
+
+    assert sort_rows(store, 0, "value", descending=True) == [1, 0, 2, 3]
+
+
+def test_sort_short_array_puts_missing_rows_last(backend):
+    store = column_store.ColumnStore.from_values([[(0.0, 2.0), (0.0, 1.0)], [(0.0, 0.0), (0.0, 0.0), (0.0, 0.0), (0.0, 0.0)]], "float2")
+
+    assert sort_rows(store, 0, "y") == [1, 0, 2, 3]
+
+
+def test_sort_by_magnitude(backend):
+    store = column_store.ColumnStore.from_values([[(3.0, 4.0, 0.0), (1.0, 0.0, 0.0), (0.0, -2.0, 0.0)]], "double3")
+
+    assert sort_rows(store, 0, "mag") == [1, 2, 0]
+
+
+def test_sort_matrices_by_translation(backend):
+    matrices = []
+    for tx in [5.0, -1.0, 2.0]:
+        matrix = [0.0] * 16
+        matrix[12] = tx
+        matrices.append(tuple(matrix))
+    store = column_store.ColumnStore.from_values([matrices], "matrix")
+
+    assert sort_rows(store, 0, "tx") == [1, 2, 0]
+
+
+def test_restrict_and_invert(backend):
+    permutation = sorting.compute_permutation(column_store.ColumnStore.from_values([[4, 3, 2, 1, 0]], "long"), 0, "value")
+    restricted = sorting.restrict(permutation, [0, 2, 3], 5)
+
+    assert [int(row) for row in restricted] == [3, 2, 0]
+    assert [int(index) for index in sorting.invert(restricted, 5)] == [2, -1, 1, 0, -1]
+
+
+@pytest.mark.parametrize("plug_type, keys", [
+    ("float", ["value"]),
+    ("float3", ["x", "y", "z", "mag"]),
+    ("matrix", ["tx", "ty", "tz", "mag"]),
+    ("string", [])
+])
+def test_get_sort_keys(plug_type, keys):
+    assert sorting.get_sort_keys(plug_type) == keys
@@ -0,0 +1,75 @@
+import math
+import random
+
+import pytest
+
+from bifrost_output_reader import column_store
+from bifrost_output_reader import spatial_index
+
+
+def make_points(count, seed=0):
+    rng = random.Random(seed)
+    points = [(rng.uniform(-10, 10), rng.uniform(-5, 5), rng.uniform(0, 1)) for i in range(count)]
+    points[3] = (float("nan"), 0.0, 0.0)
+    points[7] = (float("inf"), 0.0, 0.0)
+    return points
+
+
+def is_finite(point):
+    return all([not math.isnan(value) and not math.isinf(value) for value in point])
+
+
+def get_distance(point, other):
+    return math.sqrt(sum([(value - other_value) ** 2 for value, other_value in zip(point, other)]))
+
+
+def brute_force_nearest(points, query_point):
+    finite = [index for index, point in enumerate(points) if is_finite(point)]
+    return min(finite, key=lambda index: get_distance(points[index], query_point))
+
+
+@pytest.mark.parametrize("query_point", [(0.0, 0.0, 0.5), (9.5, -4.9, 0.1), (100.0, 100.0, 100.0), (-30.0, 2.0, -8.0)])
+def test_nearest_matches_brute_force(backend, query_point):
+    points = make_points(500)
+    store = column_store.ColumnStore.from_values([points[:200], points[200:]], "double3")
+    grid = spatial_index.SpatialGrid(store)
+
+    index, distance = grid.nearest(query_point)
+    expected = brute_force_nearest(points, query_point)
+
+    assert distance == pytest.approx(get_distance(points[expected], query_point))
+    assert get_distance(points[index], query_point) == pytest.approx(distance)
+
+
+@pytest.mark.parametrize("radius", [0.0, 0.5, 3.0, 50.0])
+def test_within_radius_matches_brute_force(backend, radius):
+    points = make_points(500, seed=1)
+    store = column_store.ColumnStore.from_values([points], "double3")
+    grid = spatial_index.SpatialGrid(store)
+    query_point = points[10]
+
+    expected = [
+        index for index, point in enumerate(points)
+        if is_finite(point) and get_distance(point, query_point) <= radius]
+
+    assert [int(index) for index in grid.within_radius(query_point, radius)] == expected
+
+
+def test_flat_points(backend):
+    points = [(float(x), 0.0, 0.0) for x in range(20)]
+    grid = spatial_index.SpatialGrid(column_store.ColumnStore.from_values([points], "float3"))
+
+    assert grid.nearest((7.2, 3.0, 0.0))[0] == 7
+
+
+def test_empty_grid(backend):
+    grid = spatial_index.SpatialGrid(column_store.ColumnStore.from_values([[(float("nan"), 0.0, 0.0)]], "float3"))
+
+    assert grid.nearest((0.0, 0.0, 0.0)) is None
+    assert list(grid.within_radius((0.0, 0.0, 0.0), 1.0)) == []
+
+
+def test_get_cells():
+    store = column_store.ColumnStore.from_values([[(0, 0, 0)] * 3, [], [(0, 0, 0)] * 2], "long3")
+
+    assert spatial_index.get_cells(store, [0, 2, 3, 4]) == [(0, 0), (0, 2), (2, 0), (2, 1)]